@@ -1,4 +1,5 @@
 class BaseAction:
+    __slots__ = ()
     object_type = 'action'
     action_type = ''
 
@@ -10,6 +11,7 @@ class BaseAction:
 
 
 class SetValue(BaseAction):
+    __slots__ = ('name', 'value')
     action_type = 'set_value'
 
     def __init__(self, name, value):
@@ -24,6 +26,7 @@ class SetValue(BaseAction):
 
 
 class RemoveValue(BaseAction):
+    __slots__ = ('name', 'value')
     action_type = 'remove_value'
 
     def __init__(self, name, value):
@@ -38,6 +41,7 @@ class RemoveValue(BaseAction):
 
 
 class Link(BaseAction):
+    __slots__ = ('url',)
     action_type = 'link'
 
     def __init__(self, url):
@@ -50,6 +54,7 @@ class Link(BaseAction):
 
 
 class TogglePanel(BaseAction):
+    __slots__ = ('ref',)
     action_type = 'toggle_panel'
     show_panel_toggle_icon = True
 
@@ -64,6 +69,7 @@ class TogglePanel(BaseAction):
 
 
 class CollapsePanel(BaseAction):
+    __slots__ = ('ref',)
     action_type = 'collapse_panel'
 
     def __init__(self, ref):
@@ -75,9 +81,37 @@ class CollapsePanel(BaseAction):
         })
 
 
-class ClearSearchInput(BaseAction):
+class StatelessAction(BaseAction):
+    """
+    Actions that don't accept any arguments can never differ, so every instantiation
+    returns the same shared instance
+    """
+    __slots__ = ()
+    _instance = None
+    _serialized = None
+
+    def __new__(cls):
+        # Read from the class's own namespace, so that subclasses get their own instance
+        instance = cls.__dict__.get('_instance')
+        if instance is None:
+            instance = super().__new__(cls)
+            cls._instance = instance
+        return instance
+
+    def serialize(self):
+        # Shared by every serialized tree, so it must not be mutated
+        serialized = type(self).__dict__.get('_serialized')
+        if serialized is None:
+            serialized = super().serialize()
+            type(self)._serialized = serialized
+        return serialized
+
+
+class ClearSearchInput(StatelessAction):
+    __slots__ = ()
     action_type = 'clear_search_input'
 
 
-class SubmitForm(BaseAction):
+class SubmitForm(StatelessAction):
+    __slots__ = ()
     action_type = 'submit_form'
@@ -0,0 +1,73 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.db.models.signals import post_delete, post_save
+
+KEY_PREFIX = 'admin_list_controls'
+
+# The (model, cache alias) pairs that have had their invalidation signals connected
+_tracked_models = set()
+
+
+def make_key(*parts):
+    """
+    Returns a cache key for an arbitrary set of parts. The parts are hashed, so that
+    keys are always valid regardless of their content
+    """
+    digest = hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()
+    return '%s:%s' % (KEY_PREFIX, digest)
+
+
+def get_model_version_key(model):
+    return '%s:version:%s' % (KEY_PREFIX, model._meta.label_lower)
+
+
+def get_model_version(model, alias='default'):
+    """
+    Returns a number that changes whenever an instance of the model is saved or deleted.
+    Including it in a cache key allows every entry derived from the model to be
+    invalidated at once
+    """
+    track_model_changes(model, alias)
+    cache = caches[alias]
+    key = get_model_version_key(model)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, get_initial_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def get_initial_version():
+    # Versions start from the current time, so that a version which has been evicted
+    # from the cache is never reused by entries that are still cached
+    return int(time.time() * 1000)
+
+
+def invalidate_model(model, alias='default'):
+    cache = caches[alias]
+    key = get_model_version_key(model)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The version has been evicted, so there are no entries to invalidate
+        cache.add(key, get_initial_version(), timeout=None)
+
+
+def track_model_changes(model, alias='default'):
+    """
+    Connects the signals that invalidate a model's cache entries. Note that bulk
+    operations, such as `QuerySet.update`, do not send signals and rely on the timeouts
+    of the cache entries instead
+    """
+    if (model, alias) in _tracked_models:
+        return
+    _tracked_models.add((model, alias))
+
+    def handle_change(sender, **kwargs):
+        invalidate_model(model, alias)
+
+    dispatch_uid = '%s:%s:%s' % (KEY_PREFIX, model._meta.label_lower, alias)
+    post_save.connect(handle_change, sender=model, weak=False, dispatch_uid=dispatch_uid)
+    post_delete.connect(handle_change, sender=model, weak=False, dispatch_uid=dispatch_uid)
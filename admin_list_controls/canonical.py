@@ -0,0 +1,83 @@
+import hashlib
+from urllib.parse import urlencode
+
+from django.http import QueryDict
+
+
+class EmptyRequest:
+    """
+    Stands in for a request without any GET params, so that controls can determine the
+    value they use when their param is missing
+    """
+    GET = QueryDict()
+
+
+EMPTY_REQUEST = EmptyRequest()
+
+
+class CanonicalState:
+    """
+    The meaning of a request's GET params. Params are sorted by name, and the params of
+    controls are normalized to their cleaned values, with default and empty values
+    removed. Requests with the same canonical state will always produce the same results
+    """
+
+    def __init__(self, params):
+        # A tuple of (name, values) pairs, sorted by name
+        self.params = tuple(sorted(
+            (name, tuple(values)) for name, values in params.items() if values
+        ))
+
+    def __eq__(self, other):
+        return isinstance(other, CanonicalState) and self.params == other.params
+
+    def __hash__(self):
+        return hash(self.params)
+
+    def __repr__(self):
+        return '<CanonicalState %s>' % self.urlencode()
+
+    def urlencode(self):
+        return urlencode([
+            (name, value)
+            for name, values in self.params
+            for value in values
+        ])
+
+    def get_digest(self):
+        return hashlib.sha1(self.urlencode().encode('utf-8')).hexdigest()
+
+
+def normalize_value(value):
+    """
+    Returns a tuple of the strings that represent a cleaned value in a URL
+    """
+    if value is None or value is False or value == '':
+        return ()
+    if value is True:
+        return ('true',)
+    if isinstance(value, (list, tuple)):
+        return tuple(sorted({str(item) for item in value if item not in (None, '')}))
+    return (str(value),)
+
+
+def get_canonical_control_params(index):
+    """
+    Returns a dict of the canonical values of the controls in a prepared tree, keyed by
+    their names. Controls that are unset or using their default value are omitted
+    """
+    params = {}
+    for name, controls in index.by_name.items():
+        filters = [obj for obj in controls if obj.object_type == 'filter']
+        if filters:
+            values = filters[0].get_canonical_value()
+        else:
+            values = ()
+            for obj in controls:
+                if obj.object_type == 'selector' and obj.is_selected:
+                    if not obj.is_default:
+                        values = normalize_value(obj.value)
+                    break
+        if values:
+            params[name] = values
+    return params
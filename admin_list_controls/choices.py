@@ -0,0 +1,323 @@
+import copy
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import EmptyResultSet, ValidationError
+from django.db.models import Case, IntegerField, Value, When
+from .cache import get_model_version, make_key
+from .encoders import JSONListFragment
+
+
+class ChoiceIndex:
+    """
+    The choices of a filter, materialized once and indexed by value so that submitted
+    values and summaries can be resolved without scanning the choices
+    """
+    __slots__ = ('choices', 'labels', 'serialized')
+
+    def __init__(self, choices):
+        self.choices = choices
+        self.labels = dict(choices)
+        # Large choice lists are only encoded once, rather than on every request
+        self.serialized = JSONListFragment(choices)
+
+    def __contains__(self, value):
+        return value in self.labels
+
+    def get_label(self, value):
+        return self.labels.get(value, value)
+
+
+class BaseChoices:
+    """
+    A source of (value, label) pairs for a choice filter
+    """
+
+    def compile(self):
+        pass
+
+    def bind(self):
+        """
+        Returns the source to use for a single request. Sources are shared between
+        requests, so anything memoized for a request must be held by a copy
+        """
+        return self
+
+    def get_choice_index(self):
+        raise NotImplementedError
+
+    def get_valid_values(self, values):
+        """
+        Returns the values that match a choice, in the order they were given
+        """
+        choice_index = self.get_choice_index()
+        return [value for value in values if value in choice_index]
+
+    def get_choices_for_values(self, values):
+        """
+        Returns the (value, label) pairs of the values that match a choice
+        """
+        choice_index = self.get_choice_index()
+        return [
+            (value, choice_index.labels[value])
+            for value in values if value in choice_index
+        ]
+
+    def search(self, term, offset, limit):
+        """
+        Returns up to `limit` choices after `offset`, where the label contains `term`.
+        Choices that start with the term are returned before the other matches
+        """
+        choices = self.get_choice_index().choices
+        term = term.lower()
+        if term:
+            prefix_matches = []
+            other_matches = []
+            for choice in choices:
+                label = str(choice[1]).lower()
+                if label.startswith(term):
+                    prefix_matches.append(choice)
+                elif term in label:
+                    other_matches.append(choice)
+            choices = prefix_matches + other_matches
+        return list(choices[offset:offset + limit])
+
+
+class StaticChoices(BaseChoices):
+    """
+    A sequence or iterable of choices, which is materialized when the tree is compiled
+    """
+
+    def __init__(self, choices):
+        self.choices = choices
+        self._choice_index = None
+
+    def compile(self):
+        self.get_choice_index()
+
+    def get_choice_index(self):
+        if self._choice_index is None:
+            choices = self.choices
+            if not isinstance(choices, (list, tuple)):
+                choices = tuple(choices)
+            self._choice_index = ChoiceIndex(choices)
+        return self._choice_index
+
+
+class CallableChoices(BaseChoices):
+    """
+    A function that returns choices. It is called the first time the choices are used,
+    and again once `cache_timeout` seconds have passed. If no timeout is defined, the
+    function is only called once
+    """
+
+    def __init__(self, func, cache_timeout=None):
+        self.func = func
+        self.cache_timeout = cache_timeout
+        self._choice_index = None
+        self._expires_at = None
+
+    def get_choice_index(self):
+        if self._choice_index is None or (
+            self._expires_at is not None and time.monotonic() >= self._expires_at
+        ):
+            choices = self.func()
+            if not isinstance(choices, (list, tuple)):
+                choices = tuple(choices)
+            self._choice_index = ChoiceIndex(choices)
+            if self.cache_timeout:
+                self._expires_at = time.monotonic() + self.cache_timeout
+        return self._choice_index
+
+
+class QuerysetChoices(BaseChoices):
+    """
+    Choices drawn from a queryset, which is only evaluated when the choices are used.
+
+    The choices are stored in Django's cache for `cache_timeout` seconds, and invalidated
+    whenever an instance of the queryset's model is saved or deleted. As the cache key is
+    derived from the query, filters with identical querysets share a single query.
+    Values are converted to strings, so that they can be compared to submitted values
+    """
+
+    def __init__(
+        self,
+        queryset,
+        value_field='pk',
+        label_field=None,
+        cache_timeout=300,
+        cache_alias='default',
+    ):
+        self.queryset = queryset
+        self.value_field = value_field
+        self.label_field = label_field
+        self.cache_timeout = cache_timeout
+        self.cache_alias = cache_alias
+        self._source_key = None
+        # The (cache key, choice index, expiry) of the loaded choices. They are replaced
+        # as a single tuple, so that concurrent requests never see a partial update
+        self._loaded = (None, None, 0)
+        # Bound copies memoize their cache key for the request, and share the loaded
+        # choices of the source they were bound from
+        self._shared = self
+        self._cache_key = None
+
+    def compile(self):
+        self.get_source_key()
+
+    def bind(self):
+        bound = copy.copy(self)
+        bound._shared = self._shared
+        bound._cache_key = None
+        return bound
+
+    def get_source_key(self):
+        """
+        Identifies the queryset. The query is only compiled once, as it never changes
+        """
+        source_key = self._shared._source_key
+        if source_key is None:
+            try:
+                sql = str(self.queryset.query)
+            except EmptyResultSet:
+                sql = None
+            source_key = (
+                self.queryset.model._meta.label_lower,
+                sql,
+                self.value_field,
+                self.label_field,
+            )
+            self._shared._source_key = source_key
+        return source_key
+
+    def get_cache_key(self):
+        """
+        Derived from the model's version, which bound copies only read once per request
+        """
+        if self._cache_key is not None:
+            return self._cache_key
+        version = get_model_version(self.queryset.model, self.cache_alias)
+        cache_key = make_key('choices', version, *self.get_source_key())
+        if self._shared is not self:
+            self._cache_key = cache_key
+        return cache_key
+
+    def load_choices(self):
+        return self.get_choices_from_queryset(self.queryset.all())
+
+    def get_value(self, obj):
+        if self.value_field == 'pk':
+            return obj.pk
+        return getattr(obj, self.value_field)
+
+    def get_loaded_choice_index(self, cache_key):
+        loaded_key, choice_index, expires_at = self._shared._loaded
+        if loaded_key == cache_key and time.monotonic() < expires_at:
+            return choice_index
+
+    def has_loaded_choices(self, cache_key):
+        return self.get_loaded_choice_index(cache_key) is not None
+
+    def get_choice_index(self):
+        cache_key = self.get_cache_key()
+        choice_index = self.get_loaded_choice_index(cache_key)
+        if choice_index is not None:
+            return choice_index
+
+        cache = caches[self.cache_alias]
+        choices = cache.get(cache_key)
+        if choices is None:
+            choices = self.load_choices()
+            cache.set(cache_key, choices, self.cache_timeout)
+
+        choice_index = ChoiceIndex(choices)
+        if self.cache_timeout is None:
+            expires_at = float('inf')
+        else:
+            expires_at = time.monotonic() + self.cache_timeout
+        self._shared._loaded = (cache_key, choice_index, expires_at)
+        return choice_index
+
+    def get_valid_values(self, values):
+        """
+        If the choices have not been loaded, the values are validated with a lookup
+        against the queryset, rather than by loading every choice
+        """
+        if self.has_loaded_choices(self.get_cache_key()):
+            return super().get_valid_values(values)
+        labels = dict(self.get_choices_for_values(values))
+        return [value for value in values if value in labels]
+
+    def get_choices_for_values(self, values):
+        if self.has_loaded_choices(self.get_cache_key()):
+            return super().get_choices_for_values(values)
+
+        model = self.queryset.model
+        if self.value_field == 'pk':
+            field = model._meta.pk
+        else:
+            field = model._meta.get_field(self.value_field)
+
+        lookup_values = []
+        for value in values:
+            try:
+                lookup_values.append(field.to_python(value))
+            except ValidationError:
+                pass
+        if not lookup_values:
+            return []
+
+        labels = dict(self.get_choices_from_queryset(
+            self.queryset.filter(**{'%s__in' % self.value_field: lookup_values}),
+        ))
+        return [(value, labels[value]) for value in values if value in labels]
+
+    def get_choices_from_queryset(self, queryset):
+        if self.label_field:
+            return [
+                (str(value), label)
+                for value, label in queryset.values_list(self.value_field, self.label_field)
+            ]
+        return [
+            (str(self.get_value(obj)), str(obj))
+            for obj in queryset
+        ]
+
+    def search(self, term, offset, limit):
+        """
+        If a label field is defined, matching choices are queried from the database and
+        cached, rather than loading every choice
+        """
+        if not self.label_field:
+            return super().search(term, offset, limit)
+
+        cache = caches[self.cache_alias]
+        cache_key = make_key('choices_search', self.get_cache_key(), term.lower(), offset, limit)
+        choices = cache.get(cache_key)
+        if choices is None:
+            queryset = self.queryset.all()
+            if not queryset.ordered:
+                # Pages would otherwise be inconsistent
+                queryset = queryset.order_by('pk')
+            if term:
+                ordering = queryset.query.order_by or queryset.model._meta.ordering
+                queryset = queryset.filter(**{
+                    '%s__icontains' % self.label_field: term,
+                }).annotate(
+                    alc_prefix_match=Case(
+                        When(**{'%s__istartswith' % self.label_field: term}, then=Value(0)),
+                        default=Value(1),
+                        output_field=IntegerField(),
+                    ),
+                ).order_by('alc_prefix_match', *ordering)
+            choices = self.get_choices_from_queryset(queryset[offset:offset + limit])
+            cache.set(cache_key, choices, self.cache_timeout)
+        return choices
+
+
+def get_choices_source(choices, cache_timeout=None):
+    if isinstance(choices, BaseChoices):
+        return choices
+    if callable(choices):
+        return CallableChoices(choices, cache_timeout=cache_timeout)
+    return StaticChoices(choices)
@@ -1,22 +1,75 @@
+import warnings
 from collections.abc import Iterable
+from functools import lru_cache
 from django.utils.translation import gettext as _
 
 from .actions import SubmitForm, ClearSearchInput
 from .exceptions import ConfigurationError
 
 
+_slot_names_by_class = {}
+
+
+def get_slot_names(cls):
+    """
+    Returns the names of every slot declared across the class's MRO
+    """
+    try:
+        return _slot_names_by_class[cls]
+    except KeyError:
+        pass
+    slot_names = []
+    for klass in reversed(cls.__mro__):
+        for name in klass.__dict__.get('__slots__', ()):
+            if name not in ('__dict__', '__weakref__') and name not in slot_names:
+                slot_names.append(name)
+    _slot_names_by_class[cls] = slot_names = tuple(slot_names)
+    return slot_names
+
+
 class BaseComponent:
+    # Components are slotted to keep large trees compact. Subclasses should declare their
+    # own `__slots__` for any attributes they add
+    __slots__ = (
+        'style',
+        'extra_classes',
+        'component_id',
+        'children',
+        '_children_defined',
+        '_serialized',
+    )
+
     object_type = ''
-    children = None
     can_have_children = True
-    _children_defined = False
 
     def __init__(self, style=None, extra_classes=''):
         self.style = self.get_default_style()
         if style:
             self.style.update(style)
         self.extra_classes = extra_classes
-        self.component_id = '%s-%s' % (type(self).__name__, id(self))
+        # Assigned from the component's position in its tree, when the tree is compiled
+        # or when the component is first serialized
+        self.component_id = None
+        self.children = None
+        self._children_defined = False
+        # Populated for static subtrees once a tree has been compiled
+        self._serialized = None
+
+    def __copy__(self):
+        # Considerably faster than `copy.copy`'s generic handling of slotted objects
+        cls = type(self)
+        clone = cls.__new__(cls)
+        for name in get_slot_names(cls):
+            try:
+                value = getattr(self, name)
+            except AttributeError:
+                continue
+            setattr(clone, name, value)
+        # Subclasses that don't declare `__slots__` will have a dict
+        instance_dict = getattr(self, '__dict__', None)
+        if instance_dict:
+            clone.__dict__.update(instance_dict)
+        return clone
 
     def __call__(self, *args):
         return self.set_children(*args)
@@ -37,12 +90,22 @@ class BaseComponent:
         return self
 
     def serialize(self):
+        if self.component_id is None:
+            self.component_id = '%s-0' % type(self).__name__
+
         serialized_children = None
         if self.children:
-            serialized_children = [
-                child.serialize()
-                for child in self.children
-            ]
+            serialized_children = []
+            for index, child in enumerate(self.children):
+                # Components added after the tree was compiled derive their ids from
+                # their parent, so that they are stable between requests
+                if getattr(child, 'component_id', False) is None:
+                    child.component_id = '%s-%s:%s' % (
+                        type(child).__name__,
+                        self.component_id.partition('-')[2],
+                        index,
+                    )
+                serialized_children.append(serialize_component(child))
 
         return {
             'component_id': self.component_id,
@@ -58,46 +121,84 @@ class BaseComponent:
         """
         if not self.style:
             return None
-
-        serialized = {}
-        for key, value in self.style.items():
-            if '-' in key:
-                parts = key.split('-')
-                converted = parts[0] + ''.join(part.title() for part in parts[1:])
-                serialized[converted] = value
-            else:
-                serialized[key] = value
-        return serialized
+        try:
+            return _serialize_style_items(tuple(self.style.items()))
+        except TypeError:
+            # Unhashable values can't be memoized
+            return _serialize_style_items.__wrapped__(self.style.items())
 
     def get_default_style(self):
         return {}
 
+    def iter_tree(self):
+        """
+        Lazily yields this component and its descendants in pre-order. The traversal
+        uses an explicit stack, so deeply nested trees can't exhaust the recursion limit
+        """
+        stack = [self]
+        while stack:
+            component = stack.pop()
+            yield component
+            children = component.children
+            if children:
+                # Push in reverse, so that the first child is the next to be popped
+                for child in reversed(children):
+                    if isinstance(child, BaseComponent) or not isinstance(child, Iterable):
+                        stack.append(child)
+                    else:
+                        stack.extend(reversed(list(child)))
+
     def flatten_tree(self):
-        components = [self]
-        if self.children:
-            for child in self.children:
-                if isinstance(child, Iterable):
-                    for nested_child in child:
-                        components += nested_child.flatten_tree()
-                else:
-                    components += child.flatten_tree()
-        return components
+        return list(self.iter_tree())
+
+
+@lru_cache(maxsize=1024)
+def _serialize_style_items(items):
+    """
+    Memoized per distinct style, so the returned dict is shared and must not be mutated
+    """
+    serialized = {}
+    for key, value in items:
+        if '-' in key:
+            parts = key.split('-')
+            converted = parts[0] + ''.join(part.title() for part in parts[1:])
+            serialized[converted] = value
+        else:
+            serialized[key] = value
+    return serialized
+
+
+def serialize_component(component):
+    """
+    Returns the serialized representation of a component, reusing the precomputed
+    representation of a static subtree if one exists. Precomputed representations are
+    shared between requests, so callers must not mutate the returned data
+    """
+    serialized = getattr(component, '_serialized', None)
+    if serialized is not None:
+        return serialized
+    return component.serialize()
 
 
 class ListControls(BaseComponent):
+    __slots__ = ()
     object_type = 'list_controls'
 
 
 class Block(BaseComponent):
+    __slots__ = ()
     object_type = 'block'
 
 
 class Spacer(Block):
+    __slots__ = ()
+
     def get_default_style(self):
         return {'padding-top': '20px'}
 
 
 class Columns(BaseComponent):
+    __slots__ = ('column_count', '_original_children')
     object_type = 'columns'
 
     def __init__(self, column_count=2, **kwargs):
@@ -137,11 +238,13 @@ class Columns(BaseComponent):
 
 
 class Divider(BaseComponent):
+    __slots__ = ()
     object_type = 'divider'
     can_have_children = False
 
 
 class Panel(BaseComponent):
+    __slots__ = ('ref', 'collapsed')
     object_type = 'panel'
 
     def __init__(self, ref=None, collapsed=False, **kwargs):
@@ -157,6 +260,7 @@ class Panel(BaseComponent):
 
 
 class Icon(BaseComponent):
+    __slots__ = ()
     object_type = 'icon'
     can_have_children = False
 
@@ -167,6 +271,7 @@ class Icon(BaseComponent):
 
 
 class Text(BaseComponent):
+    __slots__ = ('content', 'size')
     object_type = 'text'
     can_have_children = False
 
@@ -187,6 +292,7 @@ class Text(BaseComponent):
 
 
 class Button(BaseComponent):
+    __slots__ = ('action',)
     object_type = 'button'
 
     def __init__(self, action=None, **kwargs):
@@ -208,6 +314,14 @@ class Button(BaseComponent):
 
 
 class Summary(BaseComponent):
+    __slots__ = (
+        'reset_label',
+        'summary',
+        'include_search_query',
+        'search_query_name',
+        'search_query_label',
+        'search_query_value',
+    )
     object_type = 'summary'
 
     def __init__(
@@ -232,9 +346,27 @@ class Summary(BaseComponent):
             self.search_query_value = request.GET.get(self.search_query_name)
 
     def derive_from_components(self, components):
+        """
+        Deprecated, use `derive_from_index`. Indexes the components and delegates to it
+        """
+        warnings.warn(
+            '`Summary.derive_from_components` is deprecated, use `derive_from_index`',
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        from .tree import ListControlsIndex
+        self.derive_from_index(ListControlsIndex(None, components=list(components)))
+    # Views call `derive_from_index` rather than the alias, unless a subclass overrides it
+    derive_from_components.is_deprecated_alias = True
+
+    def derive_from_index(self, index):
+        # Build a new list rather than appending to the existing one, as the initial
+        # value is shared by every request that uses a compiled tree
+        summary = []
+
         # Include the content of the built-in search field
         if self.include_search_query and self.search_query_value:
-            self.summary.append({
+            summary.append({
                 'name': self.search_query_name,
                 'label': self.search_query_label,
                 'value': self.search_query_value,
@@ -244,13 +376,17 @@ class Summary(BaseComponent):
                 ]
             })
 
-        for component in components:
-            if hasattr(component, 'serialize_summary'):
-                summaries = component.serialize_summary()
-                if isinstance(summaries, dict):
-                    summaries = [summaries]
-                if summaries:
-                    self.summary += summaries
+        # Only the controls that differ from their unset values are summarized
+        for component in index.summarized:
+            if not component.has_summary():
+                continue
+            summaries = component.serialize_summary()
+            if isinstance(summaries, dict):
+                summaries = [summaries]
+            if summaries:
+                summary += summaries
+
+        self.summary = summary
 
     def serialize(self):
         return dict(super().serialize(), **{
@@ -0,0 +1,149 @@
+from functools import total_ordering
+
+from django.utils.formats import number_format
+from django.utils.html import format_html
+
+EXACT = 'exact'
+CAPPED = 'capped'
+DEFERRED = 'deferred'
+COUNT_STRATEGIES = (EXACT, CAPPED, DEFERRED)
+
+# The GET param used to fetch a deferred count
+COUNT_VAR = 'alc_count'
+
+
+def count_up_to(queryset, limit):
+    """
+    Counts the results of a queryset, stopping at `limit`. The count is performed on
+    a LIMITed subquery, so the database can stop scanning once enough rows are found
+    """
+    return queryset.order_by()[:limit].count()
+
+
+class CountStrategyQuerySetMixin:
+    """
+    Replaces a queryset's `count` with a cheaper approximation. This allows the
+    modeladmin's result count and paginator to be used without changing how they
+    call `count`
+    """
+    count_strategy = EXACT
+    count_limit = None
+    # A count that is already known, such as one read from a cache. It is not retained
+    # by copies of the queryset, as they may be filtered differently
+    known_count = None
+    _approximate_count = None
+
+    def _clone(self):
+        clone = super()._clone()
+        clone.count_strategy = self.count_strategy
+        clone.count_limit = self.count_limit
+        return clone
+
+    def count(self):
+        if self.known_count is not None and not self.query.is_sliced:
+            return self.known_count
+        # Sliced querysets are already limited, which is also how the approximations
+        # are calculated
+        if self.count_strategy == EXACT or self.count_limit is None or self.query.is_sliced:
+            return super().count()
+        # The modeladmin counts the same queryset for its result count and paginator
+        if self._approximate_count is None:
+            self._approximate_count = count_up_to(self, self.count_limit)
+        return self._approximate_count
+
+
+_count_strategy_queryset_classes = {}
+
+
+def with_count_strategy(queryset, count_strategy, count_limit=None):
+    """
+    Returns a copy of the queryset, where `count` only counts up to `count_limit`
+    results, unless the strategy is `exact`
+    """
+    queryset = _chain_with_count_mixin(queryset)
+    queryset.count_strategy = count_strategy
+    queryset.count_limit = count_limit
+    return queryset
+
+
+def with_known_count(queryset, count):
+    """
+    Returns a copy of the queryset, where `count` returns a count that is already known
+    """
+    queryset = _chain_with_count_mixin(queryset)
+    queryset.known_count = count
+    return queryset
+
+
+def _chain_with_count_mixin(queryset):
+    queryset_class = type(queryset)
+    if issubclass(queryset_class, CountStrategyQuerySetMixin):
+        return queryset._chain()
+
+    cls = _count_strategy_queryset_classes.get(queryset_class)
+    if cls is None:
+        cls = type(
+            'CountStrategy%s' % queryset_class.__name__,
+            (CountStrategyQuerySetMixin, queryset_class),
+            {},
+        )
+        _count_strategy_queryset_classes[queryset_class] = cls
+    queryset = queryset._chain()
+    queryset.__class__ = cls
+    return queryset
+
+
+@total_ordering
+class ResultCount:
+    """
+    A result count to display in place of an exact number. Capped counts are displayed
+    as a lower bound (eg: "10,000+"), while deferred counts render an element which is
+    filled in by the UI once the count has been fetched from `url`. Truth and comparisons
+    use the counted value, so that it can stand in for an int
+    """
+
+    def __init__(self, value, is_capped=False, is_deferred=False, url=None):
+        self.value = value
+        self.is_capped = is_capped
+        self.is_deferred = is_deferred
+        self.url = url
+
+    def get_display_value(self):
+        if self.is_deferred:
+            return '…'
+        display_value = number_format(self.value, force_grouping=True)
+        if self.is_capped:
+            return '%s+' % display_value
+        return display_value
+
+    def __str__(self):
+        # Templates, such as the modeladmin's result count, render the count with `str`
+        return self.__html__()
+
+    def __html__(self):
+        if self.is_deferred:
+            return format_html(
+                '<span class="alc__result-count" data-alc-deferred-count-url="{}">{}</span>',
+                self.url,
+                self.get_display_value(),
+            )
+        return format_html('{}', self.get_display_value())
+
+    def __int__(self):
+        return self.value
+
+    def __bool__(self):
+        return bool(self.value)
+
+    def __eq__(self, other):
+        if isinstance(other, ResultCount):
+            other = other.value
+        return self.value == other
+
+    def __lt__(self, other):
+        if isinstance(other, ResultCount):
+            other = other.value
+        return self.value < other
+
+    def __hash__(self):
+        return hash(self.value)
@@ -0,0 +1,161 @@
+import json
+import re
+import uuid
+
+from .exceptions import ConfigurationError
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# Characters that could allow encoded data to break out of an inline <script> element
+SCRIPT_ESCAPES = {
+    ord('<'): '\\u003C',
+    ord('>'): '\\u003E',
+    ord('&'): '\\u0026',
+    ord('\u2028'): '\\u2028',
+    ord('\u2029'): '\\u2029',
+}
+
+
+def escape_for_script(encoded):
+    return encoded.translate(SCRIPT_ESCAPES)
+
+
+class BaseFragment:
+    """
+    Serialized data that never changes, such as the representation of a static subtree.
+    Its escaped encoding is computed once per backend, and then spliced into each payload
+    that contains it
+    """
+    __slots__ = ()
+    base_type = None
+
+    def encode(self, encoder):
+        encoded = self._encoded.get(encoder.name)
+        if encoded is None:
+            encoded = escape_for_script(encoder.dumps(self.base_type(self)))
+            self._encoded[encoder.name] = encoded
+        return encoded
+
+
+class JSONFragment(BaseFragment, dict):
+    __slots__ = ('_encoded',)
+    base_type = dict
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._encoded = {}
+
+
+class JSONListFragment(BaseFragment, list):
+    __slots__ = ('_encoded',)
+    base_type = list
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._encoded = {}
+
+
+class BaseEncoder:
+    name = ''
+
+    def dumps(self, obj):
+        raise NotImplementedError
+
+    def encode(self, obj):
+        """
+        Returns a JSON string that is safe to inline in a <script> element. Any fragments
+        within the serialized tree are spliced in without being encoded again
+        """
+        fragments = []
+        nonce = uuid.uuid4().hex
+        skeleton = self._replace_fragments(obj, fragments, nonce)
+        encoded = escape_for_script(self.dumps(skeleton))
+        if not fragments:
+            return encoded
+        return re.sub(
+            r'"__alc_fragment_%s_(\d+)__"' % nonce,
+            lambda match: fragments[int(match.group(1))].encode(self),
+            encoded,
+        )
+
+    def _replace_fragments(self, obj, fragments, nonce):
+        """
+        Returns a shallow copy of a serialized tree where fragments have been replaced by
+        placeholder strings. Only dicts and the `children` of components are visited
+        """
+        if isinstance(obj, BaseFragment):
+            fragments.append(obj)
+            return '__alc_fragment_%s_%s__' % (nonce, len(fragments) - 1)
+        if isinstance(obj, dict):
+            replaced = dict(obj)
+            for key, value in obj.items():
+                if isinstance(value, (dict, BaseFragment)):
+                    replaced[key] = self._replace_fragments(value, fragments, nonce)
+            children = obj.get('children')
+            if children:
+                replaced['children'] = [
+                    self._replace_fragments(child, fragments, nonce)
+                    for child in children
+                ]
+            return replaced
+        return obj
+
+
+class StdlibEncoder(BaseEncoder):
+    name = 'json'
+
+    def dumps(self, obj):
+        return json.dumps(obj, separators=(',', ':'))
+
+
+class OrjsonEncoder(BaseEncoder):
+    name = 'orjson'
+
+    def dumps(self, obj):
+        return orjson.dumps(obj).decode('utf-8')
+
+
+class UjsonEncoder(BaseEncoder):
+    name = 'ujson'
+
+    def dumps(self, obj):
+        return ujson.dumps(obj, ensure_ascii=False, escape_forward_slashes=False)
+
+
+ENCODERS = {
+    StdlibEncoder.name: StdlibEncoder(),
+    OrjsonEncoder.name: OrjsonEncoder(),
+    UjsonEncoder.name: UjsonEncoder(),
+}
+
+AVAILABLE_BACKENDS = {
+    'json': True,
+    'orjson': orjson is not None,
+    'ujson': ujson is not None,
+}
+
+
+def get_encoder(backend='json'):
+    """
+    Returns the encoder for a backend. The `auto` backend uses the fastest backend that
+    is installed, falling back to python's `json` module
+    """
+    if backend == 'auto':
+        for name in ('orjson', 'ujson', 'json'):
+            if AVAILABLE_BACKENDS[name]:
+                return ENCODERS[name]
+    if backend not in ENCODERS:
+        raise ConfigurationError('Unknown JSON encoder backend "%s"' % backend)
+    if not AVAILABLE_BACKENDS[backend]:
+        raise ConfigurationError(
+            'The JSON encoder backend "%s" requires the `%s` package' % (backend, backend)
+        )
+    return ENCODERS[backend]
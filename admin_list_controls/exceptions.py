@@ -1,2 +1,10 @@
 class ConfigurationError(Exception):
     pass
+
+
+class PayloadBudgetExceeded(Exception):
+    pass
+
+
+class PayloadBudgetWarning(UserWarning):
+    pass
@@ -1,12 +1,38 @@
+from urllib.parse import urlencode
+
+from django.db.models import Q
 from .components import BaseComponent
 from .actions import RemoveValue, SubmitForm
+from .canonical import EMPTY_REQUEST, normalize_value
+from .choices import QuerysetChoices, get_choices_source
+from .exceptions import ConfigurationError
+
+
+# The GET params used by the endpoint that serves remote choices
+REMOTE_CHOICES_VAR = 'alc_choices'
+REMOTE_CHOICES_TERM_VAR = 'alc_term'
+REMOTE_CHOICES_PAGE_VAR = 'alc_page'
 
 
 class BaseFilter(BaseComponent):
+    __slots__ = (
+        'name',
+        'label',
+        '_apply_to_queryset',
+        'default_value',
+        'summary_label',
+        'exclude_default_value_from_summary',
+        'field',
+        'lookup',
+        'apply_default_value',
+        'facet_counts',
+        'cleaned_value',
+        'counts',
+    )
     object_type = 'filter'
     filter_type = ''
-    name = None
-    cleaned_value = None
+    default_lookup = 'exact'
+    supports_facet_counts = False
     can_have_children = False
 
     def __init__(
@@ -17,15 +43,35 @@ class BaseFilter(BaseComponent):
         default_value=None,
         summary_label=None,
         exclude_default_value_from_summary=True,
+        field=None,
+        lookup=None,
+        apply_default_value=True,
+        facet_counts=False,
         **kwargs,
     ):
         super().__init__(**kwargs)
+        if facet_counts:
+            if not self.supports_facet_counts:
+                raise ConfigurationError(
+                    '%s does not support facet counts' % type(self).__name__
+                )
+            if field is None or apply_to_queryset is not None:
+                raise ConfigurationError(
+                    'Facet counts can only be used by filters that define a `field` '
+                    'rather than an `apply_to_queryset` function'
+                )
         self.name = name
         self.label = label
         self._apply_to_queryset = apply_to_queryset
         self.default_value = default_value
         self.summary_label = summary_label
         self.exclude_default_value_from_summary = exclude_default_value_from_summary
+        self.field = field
+        self.lookup = lookup
+        self.apply_default_value = apply_default_value
+        self.facet_counts = facet_counts
+        self.cleaned_value = None
+        self.counts = None
 
     def handle_request(self, request):
         self.cleaned_value = self.clean(request)
@@ -35,11 +81,87 @@ class BaseFilter(BaseComponent):
     def clean(self, request):
         return request.GET.get(self.name)
 
+    def get_unset_value(self):
+        """
+        Returns the value that the filter would have if its param was missing
+        """
+        value = self.clean(EMPTY_REQUEST)
+        if value is None:
+            value = self.default_value
+        return value
+
+    def get_canonical_value(self):
+        """
+        Returns a tuple of the strings that represent the filter's value in a canonical
+        URL. It is empty if the param can be omitted without changing the value. An empty
+        value that differs from the unset value, such as "Any" when the default is a
+        choice, is represented by an empty string
+        """
+        values = normalize_value(self.cleaned_value)
+        if values == normalize_value(self.get_unset_value()):
+            return ()
+        return values or ('',)
+
+    @property
+    def is_declarative(self):
+        """
+        Declarative filters define a `field` rather than an `apply_to_queryset` function,
+        which allows the view to combine them into a single query
+        """
+        return self.field is not None and self._apply_to_queryset is None
+
+    def is_active(self):
+        if not self.cleaned_value:
+            return False
+        if not self.apply_default_value and self.cleaned_value == self.default_value:
+            return False
+        return True
+
+    def get_lookup(self):
+        return self.lookup or self.default_lookup
+
+    def get_query(self):
+        """
+        Returns a Q object for an active declarative filter, otherwise None
+        """
+        if not self.is_declarative or not self.is_active():
+            return None
+        return self.get_query_for_value(self.cleaned_value)
+
+    def get_query_for_value(self, value, lookup=None):
+        return Q(**{
+            '%s__%s' % (self.field, lookup or self.get_lookup()): value,
+        })
+
+    def get_facet_queries(self):
+        """
+        Returns a list of (value, query) pairs, one for each option that is counted when
+        facet counts are enabled
+        """
+        return []
+
+    def set_counts(self, counts):
+        self.counts = counts
+
     def apply_to_queryset(self, queryset):
-        if self._apply_to_queryset and self.cleaned_value:
+        if not self.is_active():
+            return queryset
+        if self._apply_to_queryset:
             return self._apply_to_queryset(queryset, self.cleaned_value)
+        query = self.get_query()
+        if query is not None:
+            return queryset.filter(query)
         return queryset
 
+    def has_summary(self):
+        """
+        Returns True if the filter's value should be summarized, which is only the case
+        when it differs from the unset value (unless defaults are included)
+        """
+        if not self.exclude_default_value_from_summary:
+            return bool(self.cleaned_value)
+        return bool(self.get_canonical_value())
+
     def serialize_summary(self):
         if self.exclude_default_value_from_summary and self.cleaned_value == self.default_value:
             return
@@ -67,16 +189,22 @@ class BaseFilter(BaseComponent):
         return value
 
     def serialize(self):
-        return dict(super().serialize(), **{
+        serialized = dict(super().serialize(), **{
             'filter_type': self.filter_type,
             'name': self.name,
             'label': self.label,
             'value': self.cleaned_value,
         })
+        if self.facet_counts:
+            # Pairs, rather than an object, as the values are not necessarily strings
+            serialized['counts'] = list(self.counts.items()) if self.counts else None
+        return serialized
 
 
 class TextFilter(BaseFilter):
+    __slots__ = ()
     filter_type = 'text'
+    default_lookup = 'icontains'
 
     def clean(self, *args, **kwargs):
         value = super().clean(*args, **kwargs)
@@ -86,7 +214,12 @@ class TextFilter(BaseFilter):
 
 
 class BooleanFilter(BaseFilter):
+    __slots__ = ()
     filter_type = 'boolean'
+    supports_facet_counts = True
+
+    def get_facet_queries(self):
+        return [(True, self.get_query_for_value(True))]
 
     def clean(self, *args, **kwargs):
         value = super().clean(*args, **kwargs)
@@ -94,52 +227,175 @@ class BooleanFilter(BaseFilter):
 
 
 class BaseChoiceFilter(BaseFilter):
-    def __init__(self, choices, *args, **kwargs):
+    __slots__ = (
+        'choices',
+        'choices_source',
+        'remote_choices',
+        'remote_choices_page_size',
+        '_selected_choices',
+    )
+    supports_facet_counts = True
+    supports_remote_choices = False
+
+    def __init__(
+        self,
+        choices=None,
+        *args,
+        choices_queryset=None,
+        choices_value_field='pk',
+        choices_label_field=None,
+        choices_cache_timeout=None,
+        remote_choices=False,
+        remote_choices_page_size=50,
+        **kwargs,
+    ):
+        """
+        `choices` can be a sequence of (value, label) pairs, any other iterable of pairs
+        or a callable that returns them. Sequences and iterables are materialized once,
+        while callables are called when the choices are first used and again after
+        `choices_cache_timeout` seconds.
+
+        Alternatively, `choices_queryset` draws the choices from the `choices_value_field`
+        and `choices_label_field` of a queryset. If no label field is defined, the string
+        representation of each object is used.
+
+        With `remote_choices`, only the selected choices are serialized and the UI
+        fetches pages of matching choices as the user types
+        """
         super().__init__(*args, **kwargs)
 
+        if remote_choices:
+            if not self.supports_remote_choices:
+                raise ConfigurationError(
+                    '%s does not support remote choices' % type(self).__name__
+                )
+            if self.facet_counts:
+                raise ConfigurationError('Facet counts cannot be used with remote choices')
+
+        if choices_queryset is not None:
+            if choices is not None:
+                raise ConfigurationError('Define either `choices` or `choices_queryset`, not both')
+            choices = QuerysetChoices(
+                choices_queryset,
+                value_field=choices_value_field,
+                label_field=choices_label_field,
+                cache_timeout=300 if choices_cache_timeout is None else choices_cache_timeout,
+            )
+        elif choices is None:
+            raise ConfigurationError('Choice filters require `choices` or `choices_queryset`')
+
         self.choices = choices
+        self.choices_source = get_choices_source(choices, cache_timeout=choices_cache_timeout)
+        self.remote_choices = remote_choices
+        self.remote_choices_page_size = remote_choices_page_size
+        self._selected_choices = None
+
+    def compile(self):
+        if not self.remote_choices:
+            self.choices_source.compile()
+
+    def handle_request(self, request):
+        self.choices_source = self.choices_source.bind()
+        super().handle_request(request)
+        self._selected_choices = None
+
+    def get_choices(self):
+        return self.get_choice_index().choices
+
+    def get_choice_index(self):
+        return self.choices_source.get_choice_index()
 
     def clean(self, request):
-        whitelisted_values = [choice[0] for choice in self.choices]
         value = request.GET.get(self.name)
-        if value in whitelisted_values:
+        if value is not None and self.choices_source.get_valid_values([value]):
             return value
         elif self.default_value:
             return self.default_value
 
+    def get_selected_values(self):
+        value = self.cleaned_value
+        if isinstance(value, list):
+            return value
+        return [value] if value else []
+
+    def get_selected_choices(self):
+        if self._selected_choices is None:
+            self._selected_choices = self.choices_source.get_choices_for_values(
+                self.get_selected_values(),
+            )
+        return self._selected_choices
+
+    def get_remote_choices(self, term, page):
+        """
+        Returns a page of the choices that match the search term
+        """
+        page_size = self.remote_choices_page_size
+        # An extra choice is requested to determine if there is a next page
+        choices = self.choices_source.search(term, page * page_size, page_size + 1)
+        return {
+            'choices': choices[:page_size],
+            'page': page,
+            'has_more': len(choices) > page_size,
+        }
+
     def serialize(self):
+        if self.remote_choices:
+            return dict(super().serialize(), **{
+                'choices': self.get_selected_choices(),
+                'remote_choices_url': '?' + urlencode({REMOTE_CHOICES_VAR: self.name}),
+            })
         return dict(super().serialize(), **{
-            'choices': self.choices,
+            'choices': self.get_choice_index().serialized,
         })
 
     def get_summary_display_value_for_value(self, value):
         """
         Returns the corresponding display value for the raw value
         """
-        choice_dict = dict(self.choices)
-        return choice_dict.get(value, value)
+        if self.remote_choices:
+            return dict(self.get_selected_choices()).get(value, value)
+        return self.get_choice_index().get_label(value)
+
+    def get_facet_queries(self):
+        # Options are counted individually, even if the filter accepts multiple values
+        lookup = self.get_lookup()
+        if lookup == 'in':
+            lookup = 'exact'
+
+        facet_queries = []
+        for value, _ in self.get_choice_index().choices:
+            if value in ('', None):
+                # Blank choices, such as "Any", match every result
+                facet_queries.append((value, Q()))
+            else:
+                facet_queries.append((value, self.get_query_for_value(value, lookup)))
+        return facet_queries
 
 
 class RadioFilter(BaseChoiceFilter):
+    __slots__ = ()
     filter_type = 'radio'
 
 
 class ChoiceFilter(BaseChoiceFilter):
+    __slots__ = ('multiple',)
     filter_type = 'choice'
+    supports_remote_choices = True
 
-    def __init__(self, choices, multiple=False, *args, **kwargs):
+    def __init__(self, choices=None, multiple=False, *args, **kwargs):
         super().__init__(choices=choices, *args, **kwargs)
 
         self.multiple = multiple
 
+    def get_lookup(self):
+        if self.lookup:
+            return self.lookup
+        return 'in' if self.multiple else self.default_lookup
+
     def clean(self, request):
         if self.multiple:
-            whitelisted_values = [choice[0] for choice in self.choices]
             values = request.GET.getlist(self.name)
-            cleaned_values = [
-                value for value in values
-                if value in whitelisted_values
-            ]
+            cleaned_values = self.choices_source.get_valid_values(values) if values else []
             if cleaned_values:
                 return cleaned_values
             elif self.default_value:
@@ -148,6 +404,13 @@ class ChoiceFilter(BaseChoiceFilter):
                 return []
         return super().clean(request)
 
+    def has_summary(self):
+        # Every selected value of a multiple choice filter is summarized, including
+        # those that match the default
+        if self.multiple:
+            return bool(self.cleaned_value)
+        return super().has_summary()
+
     def serialize_summary(self):
         if self.multiple:
             summaries = []
@@ -0,0 +1,65 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from django.utils.module_loading import import_string
+from admin_list_controls.profiling import format_profile, profile_index_view
+
+
+class Command(BaseCommand):
+    help = (
+        "Explains and times the queries of a modeladmin's list controls, applying each "
+        "active control in isolation and cumulatively, and reports the controls that "
+        "cause full table scans or sorts"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'model_admin',
+            help='The dotted path to a ModelAdmin class, eg: shop.wagtail_hooks.ProductAdmin',
+        )
+        parser.add_argument(
+            '--params', default='',
+            help='The query string of the index view, eg: "product_type=cake&sort=name"',
+        )
+        parser.add_argument(
+            '--user',
+            help='The username of the user to run the view as. Defaults to the first superuser',
+        )
+        parser.add_argument(
+            '--limit', type=int,
+            help="The number of results fetched for each query. Defaults to the view's page size",
+        )
+        parser.add_argument('--plans', action='store_true', help='Include the query plans')
+        parser.add_argument('--json', action='store_true', help='Output the profile as JSON')
+
+    def handle(self, *args, **options):
+        try:
+            model_admin = import_string(options['model_admin'])()
+        except ImportError as e:
+            raise CommandError(e)
+
+        User = get_user_model()
+        if options['user']:
+            user = User._default_manager.filter(**{
+                User.USERNAME_FIELD: options['user'],
+            }).first()
+        else:
+            user = User._default_manager.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('No user found to run the view as')
+
+        params = options['params'].lstrip('?')
+        request = RequestFactory().get('/?%s' % params if params else '/')
+        request.user = user
+
+        try:
+            entries = profile_index_view(model_admin, request, limit=options['limit'])
+        except ValueError as e:
+            raise CommandError(e)
+
+        if options['json']:
+            self.stdout.write(json.dumps([entry.serialize() for entry in entries], indent=2))
+        else:
+            self.stdout.write(format_profile(entries, show_plans=options['plans']))
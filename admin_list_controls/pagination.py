@@ -0,0 +1,221 @@
+import base64
+import binascii
+import json
+import operator
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, Model, Q
+from django.db.models.constants import LOOKUP_SEP
+
+# The GET param that holds the position of a keyset page
+CURSOR_VAR = 'alc_cursor'
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(ordering, values, direction):
+    data = json.dumps(
+        {'o': ordering, 'v': values, 'd': direction},
+        cls=DjangoJSONEncoder,
+        separators=(',', ':'),
+    )
+    return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor):
+    """
+    Returns the (ordering, values, direction) of a cursor, or raises a ValueError if
+    the cursor is malformed
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError('Malformed cursor')
+    if (
+        not isinstance(data, dict)
+        or not isinstance(data.get('o'), list)
+        or not isinstance(data.get('v'), list)
+        or data.get('d') not in (NEXT, PREVIOUS)
+    ):
+        raise ValueError('Malformed cursor')
+    return data['o'], data['v'], data['d']
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class KeysetPaginator:
+    """
+    Paginates a queryset by seeking past the last result of the previous page, rather
+    than skipping results with an OFFSET, so that every page costs the same to fetch.
+
+    The queryset must be ordered by field names, and if the ordering does not include
+    the primary key it is appended as a tie-breaker. Nulls in nullable fields are ordered
+    as if they were larger than every other value, on every backend, so that the seek
+    can match them
+    """
+
+    def __init__(self, queryset, per_page):
+        self.ordering = self.get_ordering(queryset)
+        if self.ordering is None:
+            raise ValueError('Keyset pagination requires a queryset ordered by field names')
+        self.nullable = [
+            self.is_nullable(queryset.model, field.lstrip('-')) for field in self.ordering
+        ]
+        self.queryset = queryset.order_by(*[
+            self.get_order_by(field, nullable)
+            for field, nullable in zip(self.ordering, self.nullable)
+        ])
+        self.per_page = per_page
+
+    @staticmethod
+    def get_ordering(queryset):
+        """
+        Returns the queryset's ordering with a unique tie-breaker, or None if it cannot
+        be used for keyset pagination
+        """
+        ordering = list(queryset.query.order_by)
+        if not ordering:
+            ordering = list(queryset.model._meta.ordering)
+        for field in ordering:
+            if not isinstance(field, str) or field == '?':
+                return None
+
+        pk_name = queryset.model._meta.pk.name
+        if not {'pk', '-pk', pk_name, '-' + pk_name} & set(ordering):
+            ordering.append('pk')
+        return ordering
+
+    @staticmethod
+    def is_nullable(model, field):
+        """
+        Returns True if a field, or any relation that leads to it, can be null. Names
+        that are not model fields, such as annotations, are assumed to be nullable
+        """
+        opts = model._meta
+        for name in field.split(LOOKUP_SEP):
+            if name == 'pk':
+                model_field = opts.pk
+            else:
+                try:
+                    model_field = opts.get_field(name)
+                except FieldDoesNotExist:
+                    return True
+            if model_field.null or model_field.many_to_many or model_field.one_to_many:
+                return True
+            if model_field.related_model is not None:
+                opts = model_field.related_model._meta
+        return False
+
+    @staticmethod
+    def get_order_by(field, nullable):
+        if not nullable:
+            return field
+        if field.startswith('-'):
+            return F(field[1:]).desc(nulls_first=True)
+        return F(field).asc(nulls_last=True)
+
+    def page(self, cursor=None):
+        values = None
+        direction = NEXT
+        if cursor:
+            try:
+                ordering, values, direction = decode_cursor(cursor)
+            except ValueError:
+                values = None
+            else:
+                # Cursors from a different ordering would seek to an arbitrary position
+                if ordering != self.ordering or len(values) != len(self.ordering):
+                    values = None
+                    direction = NEXT
+
+        queryset = self.queryset
+        if values is not None:
+            is_previous = direction == PREVIOUS
+            queryset = queryset.filter(self.get_seek_query(values, reverse=is_previous))
+            if is_previous:
+                queryset = queryset.reverse()
+
+        results = list(queryset[:self.per_page + 1])
+        has_more = len(results) > self.per_page
+        results = results[:self.per_page]
+
+        if values is not None and direction == PREVIOUS:
+            results.reverse()
+            has_previous = has_more
+            has_next = True
+        else:
+            has_previous = values is not None
+            has_next = has_more
+
+        next_cursor = None
+        previous_cursor = None
+        if results:
+            if has_next:
+                next_cursor = encode_cursor(
+                    self.ordering, self.get_values(results[-1]), NEXT,
+                )
+            if has_previous:
+                previous_cursor = encode_cursor(
+                    self.ordering, self.get_values(results[0]), PREVIOUS,
+                )
+        return KeysetPage(results, next_cursor=next_cursor, previous_cursor=previous_cursor)
+
+    def get_seek_query(self, values, reverse=False):
+        """
+        Matches the results after `values` in the ordering, or before them if `reverse`.
+        Nulls are larger than every other value, so they follow a value in ascending
+        order and precede it in descending order
+        """
+        conditions = []
+        equal_to_previous_fields = {}
+        for field, nullable, value in zip(self.ordering, self.nullable, values):
+            descending = field.startswith('-')
+            field = field.lstrip('-')
+            seek_larger = descending == reverse
+            if value is not None:
+                condition = Q(**{'%s__%s' % (field, 'gt' if seek_larger else 'lt'): value})
+                if seek_larger and nullable:
+                    condition |= Q(**{'%s__isnull' % field: True})
+                conditions.append(Q(**equal_to_previous_fields) & condition)
+                equal_to_previous_fields[field] = value
+            else:
+                # Nothing is larger than a null, while every other value is smaller
+                if not seek_larger:
+                    conditions.append(Q(
+                        **equal_to_previous_fields,
+                        **{'%s__isnull' % field: False},
+                    ))
+                equal_to_previous_fields['%s__isnull' % field] = True
+        if not conditions:
+            return Q(pk__in=[])
+        return reduce(operator.or_, conditions)
+
+    def get_values(self, obj):
+        return [self.get_value(obj, field.lstrip('-')) for field in self.ordering]
+
+    def get_value(self, obj, field):
+        value = obj
+        for name in field.split(LOOKUP_SEP):
+            if value is None:
+                break
+            value = value.pk if name == 'pk' else getattr(value, name)
+        if isinstance(value, Model):
+            value = value.pk
+        return value
@@ -0,0 +1,221 @@
+import json
+
+from .encoders import BaseFragment, JSONFragment, escape_for_script
+
+# The categories that the keys of a serialized component are counted under. Any other
+# key, and the JSON syntax around them, is counted as `other`
+PAYLOAD_CATEGORIES = {
+    'choices': 'choices',
+    'action': 'actions',
+    'summary': 'summary',
+    'counts': 'counts',
+    'style': 'styles',
+}
+
+
+class ReferenceTable:
+    """
+    An append-only list of unique values, where each value is referred to by its index
+    """
+
+    def __init__(self, values=None, indexes=None):
+        self.values = values or []
+        self.indexes = indexes or {}
+
+    def add(self, value):
+        key = json.dumps(value, sort_keys=True)
+        index = self.indexes.get(key)
+        if index is None:
+            index = len(self.values)
+            self.values.append(value)
+            self.indexes[key] = index
+        return index
+
+    def copy(self):
+        return ReferenceTable(list(self.values), dict(self.indexes))
+
+
+class PayloadCompactor:
+    """
+    Rewrites serialized trees so that each distinct action and style is only included
+    once, in a table that components refer to by index. The input is never mutated, as
+    parts of it may be shared between requests
+    """
+
+    def __init__(self, actions=None, styles=None, compacted_fragments=None):
+        self.actions = actions or ReferenceTable()
+        self.styles = styles or ReferenceTable()
+        # Maps the ids of fragments to their compacted equivalents
+        self.compacted_fragments = compacted_fragments or {}
+
+    def copy(self):
+        return PayloadCompactor(
+            actions=self.actions.copy(),
+            styles=self.styles.copy(),
+            compacted_fragments=self.compacted_fragments,
+        )
+
+    def compact_fragment(self, fragment):
+        """
+        Compacts a fragment ahead of time, so that the compacted fragment can be reused
+        by every copy of this compactor
+        """
+        self.compacted_fragments[id(fragment)] = JSONFragment(self.compact(fragment))
+
+    def compact(self, serialized):
+        compacted_fragment = self.compacted_fragments.get(id(serialized))
+        if compacted_fragment is not None:
+            return compacted_fragment
+
+        compacted = dict(serialized)
+        style = serialized.get('style')
+        if style:
+            compacted['style'] = self.styles.add(style)
+        action = serialized.get('action')
+        if action:
+            compacted['action'] = self.compact_actions(action)
+        summary = serialized.get('summary')
+        if summary:
+            compacted['summary'] = [
+                dict(obj, action=self.compact_actions(obj['action'])) if obj.get('action') else obj
+                for obj in summary
+            ]
+        children = serialized.get('children')
+        if children:
+            compacted['children'] = [self.compact(child) for child in children]
+        return compacted
+
+    def compact_actions(self, actions):
+        return [self.actions.add(action) for action in actions]
+
+    def get_payload(self, serialized):
+        return {
+            'admin_list_controls': self.compact(serialized),
+            'action_table': self.actions.values,
+            'style_table': self.styles.values,
+        }
+
+
+class ComponentSize:
+    """
+    The encoded size of a serialized component. `total_bytes` includes its descendants,
+    while `own_bytes` and `categories` only count the component itself
+    """
+    __slots__ = ('component_id', 'object_type', 'label', 'depth', 'total_bytes', 'own_bytes', 'categories')
+
+    def __init__(self, component_id, object_type, label, depth):
+        self.component_id = component_id
+        self.object_type = object_type
+        self.label = label
+        self.depth = depth
+        self.total_bytes = 0
+        self.own_bytes = 0
+        self.categories = {}
+
+    def serialize(self):
+        return {
+            'component_id': self.component_id,
+            'object_type': self.object_type,
+            'label': self.label,
+            'depth': self.depth,
+            'total_bytes': self.total_bytes,
+            'own_bytes': self.own_bytes,
+            'categories': self.categories,
+        }
+
+
+class PayloadSize:
+    """
+    A breakdown of the encoded size of an initial state, by component and by category.
+    Sizes are measured with the encoder used for the payload, so their sum matches the
+    encoded payload
+    """
+
+    def __init__(self, payload, encoder):
+        self.encoder = encoder
+        self.components = []
+        # The top-level keys of the payload, such as the tree and the tables of a compact
+        # payload
+        self.sections = {}
+        total_bytes = 2
+        for key, value in payload.items():
+            if isinstance(value, dict) and 'object_type' in value:
+                value_bytes = self.measure_component(value, 0)
+            else:
+                value_bytes = self.measure_value(value)
+            self.sections[key] = value_bytes
+            total_bytes += self.measure_key(key) + value_bytes
+        self.total_bytes = total_bytes + max(len(payload) - 1, 0)
+
+    @property
+    def categories(self):
+        categories = {}
+        for component in self.components:
+            for category, size in component.categories.items():
+                categories[category] = categories.get(category, 0) + size
+        return categories
+
+    def measure_key(self, key):
+        # The key, its quotes and the colon
+        return len(self.encoder.dumps(key)) + 1
+
+    def measure_value(self, value):
+        if isinstance(value, BaseFragment):
+            return len(value.encode(self.encoder))
+        return len(escape_for_script(self.encoder.dumps(value)))
+
+    def measure_component(self, serialized, depth):
+        label = serialized.get('name') or serialized.get('ref')
+        size = ComponentSize(
+            serialized.get('component_id'), serialized.get('object_type'), label, depth,
+        )
+        self.components.append(size)
+
+        # Braces and the commas between the keys
+        categories = {'other': 2 + max(len(serialized) - 1, 0)}
+        children_bytes = 0
+        for key, value in serialized.items():
+            categories['other'] += self.measure_key(key)
+            if key == 'children' and value:
+                # Brackets and the commas between the children
+                categories['other'] += 2 + len(value) - 1
+                for child in value:
+                    if isinstance(child, dict) and 'object_type' in child:
+                        children_bytes += self.measure_component(child, depth + 1)
+                    else:
+                        children_bytes += self.measure_value(child)
+            else:
+                category = PAYLOAD_CATEGORIES.get(key, 'other')
+                categories[category] = categories.get(category, 0) + self.measure_value(value)
+
+        size.categories = categories
+        size.own_bytes = sum(categories.values())
+        size.total_bytes = size.own_bytes + children_bytes
+        return size.total_bytes
+
+    def get_largest(self, count=10):
+        """
+        Returns the components with the largest `own_bytes`
+        """
+        return sorted(self.components, key=lambda size: size.own_bytes, reverse=True)[:count]
+
+    def serialize(self):
+        return {
+            'total_bytes': self.total_bytes,
+            'sections': self.sections,
+            'categories': self.categories,
+            'components': [component.serialize() for component in self.components],
+        }
+
+    def format(self, count=10):
+        lines = ['%s bytes in total (%s)' % (self.total_bytes, ', '.join(
+            '%s: %s' % item for item in sorted(self.categories.items(), key=lambda item: -item[1])
+        ))]
+        for component in self.get_largest(count):
+            lines.append('  %s%s: %s bytes (%s bytes including children)' % (
+                component.component_id,
+                ' "%s"' % component.label if component.label else '',
+                component.own_bytes,
+                component.total_bytes,
+            ))
+        return '\n'.join(lines)
@@ -0,0 +1,231 @@
+import re
+import time
+
+from django.core.exceptions import EmptyResultSet
+from django.db import NotSupportedError, connections
+from django.http import HttpResponse
+
+BASE = 'base'
+ISOLATED = 'isolated'
+CUMULATIVE = 'cumulative'
+INDEX = 'index'
+
+
+class ProfileEntry:
+    """
+    The query plan and timings of a queryset, with one or more controls applied
+    """
+
+    def __init__(self, label, mode, sql, plan, issues, page_seconds, count_seconds, new_issues=None):
+        self.label = label
+        self.mode = mode
+        self.sql = sql
+        self.plan = plan
+        self.issues = issues
+        # The issues that are missing from the plan this entry was compared to
+        self.new_issues = issues if new_issues is None else new_issues
+        self.page_seconds = page_seconds
+        self.count_seconds = count_seconds
+
+    def serialize(self):
+        return {
+            'label': self.label,
+            'mode': self.mode,
+            'sql': self.sql,
+            'plan': self.plan,
+            'issues': self.issues,
+            'new_issues': self.new_issues,
+            'page_seconds': self.page_seconds,
+            'count_seconds': self.count_seconds,
+        }
+
+
+def find_plan_issues(vendor, plan):
+    """
+    Returns descriptions of the full table scans and sorts in a query plan. Plans from
+    backends other than SQLite, PostgreSQL and MySQL are not inspected
+    """
+    issues = []
+    for line in plan.splitlines():
+        if vendor == 'sqlite':
+            match = re.search(r'\bSCAN (?:TABLE )?"?(\w+)"?', line)
+            if match and ' USING ' not in line:
+                issues.append('full scan of %s' % match.group(1))
+            match = re.search(r'USE TEMP B-TREE FOR (.+)$', line)
+            if match:
+                issues.append('temporary B-tree for %s' % match.group(1).strip())
+        elif vendor == 'postgresql':
+            match = re.search(r'\bSeq Scan on "?(\w+)"?', line)
+            if match:
+                issues.append('full scan of %s' % match.group(1))
+            if re.match(r'\s*(?:->\s*)?(?:Incremental )?Sort\s+\(', line):
+                issues.append('sort')
+        elif vendor == 'mysql':
+            columns = line.split(' ')
+            if 'ALL' in columns[3:5]:
+                issues.append('full scan of %s' % columns[2])
+            if 'Using filesort' in line:
+                issues.append('filesort')
+            if 'Using temporary' in line:
+                issues.append('temporary table')
+    return issues
+
+
+def get_new_issues(issues, previous_issues):
+    """
+    Returns the issues that are not accounted for by the issues of a previous plan
+    """
+    remaining = list(previous_issues)
+    new_issues = []
+    for issue in issues:
+        if issue in remaining:
+            remaining.remove(issue)
+        else:
+            new_issues.append(issue)
+    return new_issues
+
+
+class ListControlsProfiler:
+    """
+    Explains and times the queries of an index view's active controls. Each control
+    is applied to the base queryset in isolation, then cumulatively in the order of the
+    tree, followed by the view's final queryset. The issues of each isolated entry are
+    compared to the base entry's, and those of each cumulative entry to the previous one's
+    """
+
+    def __init__(self, view, base_queryset, limit=None):
+        self.view = view
+        self.base_queryset = base_queryset
+        self.limit = limit or view.items_per_page
+        self.connection = connections[base_queryset.db]
+
+    def get_sql(self, queryset):
+        try:
+            return str(queryset.query)
+        except EmptyResultSet:
+            return None
+
+    def get_active_controls(self):
+        """
+        Returns the controls that change the base queryset, along with a label
+        describing each of them
+        """
+        base_sql = self.get_sql(self.base_queryset)
+        controls = []
+        index = self.view.get_list_controls_index()
+        for obj in index.get_by_capability('apply_to_queryset'):
+            queryset = obj.apply_to_queryset(self.base_queryset)
+            if queryset is self.base_queryset or self.get_sql(queryset) == base_sql:
+                continue
+            if obj.object_type == 'filter':
+                value = obj.cleaned_value
+            else:
+                value = obj.value
+            controls.append(('%s %s=%s' % (obj.object_type, obj.name, value), obj))
+        return controls
+
+    def profile(self):
+        base = self.profile_queryset('no controls', BASE, self.base_queryset)
+        entries = [base]
+
+        controls = self.get_active_controls()
+        for label, obj in controls:
+            entries.append(self.profile_queryset(
+                label, ISOLATED, obj.apply_to_queryset(self.base_queryset), compared_to=base,
+            ))
+
+        queryset = self.base_queryset
+        previous = base
+        for label, obj in controls:
+            queryset = obj.apply_to_queryset(queryset)
+            previous = self.profile_queryset(
+                '+ %s' % label, CUMULATIVE, queryset, compared_to=previous,
+            )
+            entries.append(previous)
+
+        entries.append(self.profile_queryset(
+            'index view', INDEX, self.view.queryset, compared_to=previous,
+        ))
+        return entries
+
+    def profile_queryset(self, label, mode, queryset, compared_to=None):
+        sql = self.get_sql(queryset)
+        if sql is None:
+            # The query matches nothing, so it is never executed
+            return ProfileEntry(label, mode, None, None, [], 0, 0)
+
+        try:
+            plan = queryset.explain()
+        except NotSupportedError:
+            plan = None
+        issues = find_plan_issues(self.connection.vendor, plan) if plan else []
+
+        start = time.perf_counter()
+        list(queryset[:self.limit])
+        page_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        queryset.order_by().count()
+        count_seconds = time.perf_counter() - start
+
+        new_issues = None
+        if compared_to is not None:
+            new_issues = get_new_issues(issues, compared_to.issues)
+        return ProfileEntry(
+            label, mode, sql, plan, issues, page_seconds, count_seconds, new_issues=new_issues,
+        )
+
+
+def profile_index_view(model_admin, request, limit=None):
+    """
+    Runs a modeladmin's index view for the request, and returns the profile of its list
+    controls rather than rendering a response
+    """
+    profiles = []
+
+    class ProfilingIndexView(model_admin.index_view_class):
+        def apply_list_controls_to_queryset(self, queryset):
+            self._profiling_base_queryset = queryset
+            return super().apply_list_controls_to_queryset(queryset)
+
+        def get(self, request, *args, **kwargs):
+            profiler = ListControlsProfiler(self, self._profiling_base_queryset, limit=limit)
+            profiles.append(profiler.profile())
+            return HttpResponse()
+
+    response = ProfilingIndexView.as_view(model_admin=model_admin)(request)
+    if not profiles:
+        raise ValueError(
+            'The index view responded with a status of %s' % response.status_code,
+        )
+    return profiles[0]
+
+
+def format_profile(entries, show_plans=False):
+    lines = ['%-10s %10s %10s  %s' % ('mode', 'page (ms)', 'count (ms)', 'controls')]
+    for entry in entries:
+        lines.append('%-10s %10.2f %10.2f  %s' % (
+            entry.mode, entry.page_seconds * 1000, entry.count_seconds * 1000, entry.label,
+        ))
+        for issue in entry.issues:
+            if entry.mode != BASE and issue not in entry.new_issues:
+                issue = '%s (inherited)' % issue
+            lines.append('%34s- %s' % ('', issue))
+        if show_plans and entry.plan:
+            for line in entry.plan.splitlines():
+                lines.append('%36s%s' % ('', line))
+
+    # Only the issues that a control adds to the plan it was compared to are flagged, as
+    # the base queryset may already scan or sort
+    flagged = [
+        entry for entry in entries
+        if entry.mode in (ISOLATED, CUMULATIVE) and entry.new_issues
+    ]
+    lines.append('')
+    if flagged:
+        lines.append('Controls that cause scans or sorts:')
+        for entry in flagged:
+            lines.append('  %s: %s' % (entry.label, ', '.join(entry.new_issues)))
+    else:
+        lines.append('No controls cause scans or sorts')
+    return '\n'.join(lines)
@@ -0,0 +1,110 @@
+import operator
+from functools import reduce
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Q
+from django.db.models.constants import LOOKUP_SEP
+
+
+def combine_queries(queries):
+    """
+    ANDs Q objects together, dropping any duplicates
+    """
+    unique_queries = []
+    for query in queries:
+        if query not in unique_queries:
+            unique_queries.append(query)
+    return reduce(operator.and_, unique_queries)
+
+
+def spans_multi_valued_relation(model, field):
+    """
+    Returns True if a field path, eg: `variants__size`, follows a many-to-many or
+    reverse foreign key relation
+    """
+    opts = model._meta
+    for name in field.split(LOOKUP_SEP):
+        try:
+            model_field = opts.get_field(name)
+        except FieldDoesNotExist:
+            # A lookup or transform
+            return False
+        if not model_field.is_relation or model_field.related_model is None:
+            return False
+        if model_field.many_to_many or model_field.one_to_many:
+            return True
+        opts = model_field.related_model._meta
+    return False
+
+
+def get_filter_queries(model, queries):
+    """
+    Returns the Q objects to apply in successive `filter` calls. Conditions in a single
+    call must all be met by the same row of a multi-valued relation, whereas separate
+    calls allow each to be met by a different row. So the queries of filters on
+    single-valued fields are combined into one, and each query that spans a multi-valued
+    relation is applied on its own, as if the filters were applied one after another.
+
+    `queries` is a list of (filter, query) pairs for the active declarative filters
+    """
+    combined = []
+    separate = []
+    for obj, query in queries:
+        if spans_multi_valued_relation(model, obj.field):
+            if query not in separate:
+                separate.append(query)
+        else:
+            combined.append(query)
+    if combined:
+        return [combine_queries(combined)] + separate
+    return separate
+
+
+def count_facets(queryset, facet_filters, queries):
+    """
+    Counts every option of the facet filters in a single aggregate query. Each option is
+    counted against the queryset with every other filter's query applied, so that the
+    counts match the results a user would see after selecting the option.
+
+    `queries` is a list of (filter, query) pairs for the active declarative filters.
+    Returns a list of {value: count} dicts, in the same order as `facet_filters`
+    """
+    model = queryset.model
+    fields = [obj.field for obj in facet_filters] + [obj.field for obj, _ in queries]
+    # Joins against multi-valued relations would otherwise count rows more than once
+    distinct = any(LOOKUP_SEP in field for field in fields)
+
+    def get_condition(obj, query):
+        # Conditions on multi-valued relations are matched in a subquery, so that each
+        # can be met by a different related row, as in the results
+        if query and spans_multi_valued_relation(model, obj.field):
+            return Q(pk__in=model._base_manager.filter(query).values('pk'))
+        return query
+
+    conditions_by_filter = [(obj, get_condition(obj, query)) for obj, query in queries]
+
+    aggregates = {}
+    options = []
+    for i, facet_filter in enumerate(facet_filters):
+        other_conditions = [
+            condition for obj, condition in conditions_by_filter if obj is not facet_filter
+        ]
+        for j, (value, query) in enumerate(facet_filter.get_facet_queries()):
+            alias = 'alc_facet_%s_%s' % (i, j)
+            conditions = [
+                condition for condition in other_conditions + [get_condition(facet_filter, query)]
+                if condition
+            ]
+            aggregates[alias] = Count(
+                'pk',
+                filter=combine_queries(conditions) if conditions else None,
+                distinct=distinct,
+            )
+            options.append((alias, i, value))
+
+    facet_counts = [{} for _ in facet_filters]
+    if aggregates:
+        results = queryset.aggregate(**aggregates)
+        for alias, i, value in options:
+            facet_counts[i][value] = results[alias]
+    return facet_counts
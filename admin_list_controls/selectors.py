@@ -3,12 +3,20 @@ from .components import BaseComponent, Button, Text
 
 
 class BaseSelector(BaseComponent):
+    __slots__ = (
+        'value',
+        'is_default',
+        'name',
+        'is_selected',
+        'summary_label',
+        'summary_value',
+        '_apply_to_queryset',
+        'cleaned_value',
+        '_original_children',
+        '_summary',
+    )
     object_type = 'selector'
     selector_type = ''
-    name = None
-    cleaned_value = None
-    summary_label = None
-    summary_value = None
 
     def __init__(
         self,
@@ -28,6 +36,8 @@ class BaseSelector(BaseComponent):
         self.summary_label = summary_label
         self.summary_value = summary_value
         self._apply_to_queryset = apply_to_queryset
+        self.cleaned_value = None
+        self._summary = None
 
     def handle_request(self, request):
         self.cleaned_value = self.clean(request)
@@ -70,36 +80,57 @@ class BaseSelector(BaseComponent):
             ),
         ]
 
+    def compile(self):
+        self._summary = self.build_summary()
+
+    def build_summary(self):
+        """
+        The summary of a selector never changes, so it can be built once when the tree
+        is compiled
+        """
+        label = self.summary_label
+        if not label:
+            label = self.name.title()
+
+        value = self.summary_value
+        if value is None:
+            value = ' '.join(
+                component.content
+                for component in self.iter_tree()
+                if isinstance(component, Text)
+            ).strip()
+            if not value:
+                value = self.value
+
+        return {
+            'name': self.name,
+            'label': label,
+            'value': value,
+            'action': [
+                RemoveValue(name=self.name, value=self.value).serialize(),
+                SubmitForm().serialize(),
+            ],
+        }
+
+    def has_summary(self):
+        return self.is_selected and not self.is_default
+
     def serialize_summary(self):
         if self.is_selected and not self.is_default:
-            label = self.summary_label
-            if not label:
-                label = self.name.title()
-
-            value = self.summary_value
-            if value is None:
-                value = ''
-                for component in self.flatten_tree():
-                    if isinstance(component, str):
-                        value += component + ' '
-                    elif isinstance(component, Text):
-                        value += component.content + ' '
-                value = value.strip()
-                if not value:
-                    value = self.cleaned_value
-
-            return {
-                'name': self.name,
-                'label': label,
-                'value': value,
-                'action': [
-                    RemoveValue(name=self.name, value=self.cleaned_value).serialize(),
-                    SubmitForm().serialize(),
-                ],
-            }
+            if self._summary is None:
+                self._summary = self.build_summary()
+            return self._summary
 
 
 class LayoutSelector(BaseSelector):
+    __slots__ = (
+        'template',
+        'only',
+        'defer',
+        'select_related',
+        'prefetch_related',
+        'annotations',
+    )
     selector_type = 'layout'
     DEFAULT_NAME = 'layout'
 
@@ -111,8 +142,20 @@ class LayoutSelector(BaseSelector):
         name=DEFAULT_NAME,
         summary_label='Layout',
         summary_value=None,
+        only=None,
+        defer=None,
+        select_related=None,
+        prefetch_related=None,
+        annotations=None,
         **kwargs,
     ):
+        """
+        `only`, `defer`, `select_related` and `prefetch_related` are sequences of
+        lookups that are passed to the queryset methods of the same name, and
+        `annotations` is a dict of expressions that are passed to `annotate`. They are
+        applied to the results when the layout is selected, so that each layout fetches
+        the data that its template displays
+        """
         super().__init__(
             name=name,
             value=value,
@@ -123,9 +166,40 @@ class LayoutSelector(BaseSelector):
         )
 
         self.template = template
+        self.only = self._as_tuple(only)
+        self.defer = self._as_tuple(defer)
+        self.select_related = self._as_tuple(select_related)
+        self.prefetch_related = self._as_tuple(prefetch_related)
+        self.annotations = annotations
+
+    @staticmethod
+    def _as_tuple(lookups):
+        if lookups is None:
+            return None
+        if isinstance(lookups, str):
+            return (lookups,)
+        return tuple(lookups)
+
+    def shape_queryset(self, queryset):
+        """
+        Applies the layout's `only`, `defer`, `select_related`, `prefetch_related` and
+        `annotations` to the queryset of results
+        """
+        if self.annotations:
+            queryset = queryset.annotate(**self.annotations)
+        if self.select_related:
+            queryset = queryset.select_related(*self.select_related)
+        if self.prefetch_related:
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+        if self.only:
+            queryset = queryset.only(*self.only)
+        if self.defer:
+            queryset = queryset.defer(*self.defer)
+        return queryset
 
 
 class SortSelector(BaseSelector):
+    __slots__ = ('ordering', 'tie_breaker')
     selector_type = 'sort'
     DEFAULT_NAME = 'sort'
 
@@ -137,8 +211,15 @@ class SortSelector(BaseSelector):
         name=DEFAULT_NAME,
         summary_label='Sort',
         summary_value=None,
+        ordering=None,
+        tie_breaker='pk',
         **kwargs,
     ):
+        """
+        `ordering` is an alternative to `apply_to_queryset`, a sequence of field names that
+        are passed to `order_by`. The `tie_breaker` should be a unique field, which is
+        appended to the ordering so that results are always in a deterministic order
+        """
         super().__init__(
             name=name,
             value=value,
@@ -149,3 +230,22 @@ class SortSelector(BaseSelector):
         )
 
         self._apply_to_queryset = apply_to_queryset
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        self.ordering = ordering
+        self.tie_breaker = tie_breaker
+
+    def get_ordering(self):
+        ordering = list(self.ordering)
+        if self.tie_breaker and self.tie_breaker.lstrip('-') not in [
+            field.lstrip('-') for field in ordering
+        ]:
+            ordering.append(self.tie_breaker)
+        return ordering
+
+    def apply_to_queryset(self, queryset):
+        if self.ordering and not self._apply_to_queryset:
+            if self.is_selected:
+                return queryset.order_by(*self.get_ordering())
+            return queryset
+        return super().apply_to_queryset(queryset)
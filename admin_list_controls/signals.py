@@ -0,0 +1,9 @@
+from django.dispatch import Signal
+
+# Sent once an index view's response has been rendered, with the arguments:
+#  - `view`: the view instance
+#  - `request`: the request
+#  - `timings`: a dict of the seconds spent in each phase of the request
+#  - `state`: the canonical state of the request's params, as a query string
+#  - `payload_bytes`: the size of the encoded initial state
+list_controls_timed = Signal()
@@ -3,11 +3,13 @@ import {SET_VALUE} from '../../constants';
 import {store} from '../../state';
 import c from "classnames";
 import {submit_form} from "../../index";
+import {get_counts, label_with_count} from "./counts";
 
 export function BooleanFilter({control}) {
     const [value, set_value] = useState(control.value);
 
     const input_id = `alc__filter-${control.component_id}-${control.name}`;
+    const counts = get_counts(control);
     return (
         <div
             className={c('alc__filter', 'alc__filter--boolean', control.extra_classes)}
@@ -19,7 +21,11 @@ export function BooleanFilter({control}) {
                 submit_form();
             }}>
                 {control.label
-                    ? <label className="alc__filter__label" htmlFor={input_id}>{control.label}</label>
+                    ? (
+                        <label className="alc__filter__label" htmlFor={input_id}>
+                            {label_with_count(control.label, counts, true)}
+                        </label>
+                    )
                     : null
                 }
                 <div className="alc__filter__input-wrap">
@@ -5,14 +5,17 @@ import {SET_VALUE} from '../../constants';
 import {store} from '../../state';
 import c from "classnames";
 import {submit_form} from "../../index";
+import {get_counts, label_with_count} from "./counts";
+import {use_remote_choices} from "./remote_choices";
 
 export function ChoiceFilter({control}) {
     const choices = [];
     const value_to_choice = Object.create(null);
+    const counts = get_counts(control);
     _.forEach(control.choices, choice => {
         const choice_obj = {
             value: choice[0],
-            label: choice[1],
+            label: label_with_count(choice[1], counts, choice[0]),
         };
         choices.push(choice_obj);
         value_to_choice[choice[0]] = choice_obj;
@@ -28,6 +31,20 @@ export function ChoiceFilter({control}) {
     }
     const [value, set_value] = useState(initial_value);
 
+    // Filters with remote choices only include their selected choices in the initial
+    // state, and fetch the others as the user searches
+    const remote = use_remote_choices(control);
+    let remote_props = {};
+    if (control.remote_choices_url) {
+        remote_props = {
+            isLoading: remote.is_loading,
+            filterOption: null,
+            onInputChange: remote.on_input_change,
+            onMenuOpen: remote.on_menu_open,
+            onMenuScrollToBottom: remote.on_menu_scroll_to_bottom,
+        };
+    }
+
     const select_ref = React.createRef();
 
     return (
@@ -54,9 +71,10 @@ export function ChoiceFilter({control}) {
                         className="alc__filter__input"
                         value={value}
                         isMulti={control.multiple}
-                        options={choices}
+                        options={control.remote_choices_url ? remote.options : choices}
                         isClearable
                         ref={select_ref}
+                        {...remote_props}
                         onChange={selected => {
                             set_value(selected);
                             let selected_value;
@@ -0,0 +1,16 @@
+// Facet counts are serialized as [value, count] pairs, as their values are not
+// necessarily strings
+export function get_counts(control) {
+    const counts = new Map();
+    if (control.counts) {
+        control.counts.forEach(([value, count]) => counts.set(value, count));
+    }
+    return counts;
+}
+
+export function label_with_count(label, counts, value) {
+    if (!counts.has(value)) {
+        return label;
+    }
+    return `${label} (${counts.get(value).toLocaleString()})`;
+}
@@ -3,9 +3,11 @@ import {SET_VALUE} from '../../constants';
 import {store} from '../../state';
 import c from "classnames";
 import {submit_form} from "../../index";
+import {get_counts, label_with_count} from "./counts";
 
 export function RadioFilter({control}) {
     const [value, set_value] = useState(control.value);
+    const counts = get_counts(control);
 
     return (
         <div
@@ -44,7 +46,7 @@ export function RadioFilter({control}) {
                                         className="alc__filter__radio-choice__input"
                                     />
                                     <span className="alc__filter__radio-choice__text">
-                                        {choice[1]}
+                                        {label_with_count(choice[1], counts, choice[0])}
                                     </span>
                                 </label>
                             </div>
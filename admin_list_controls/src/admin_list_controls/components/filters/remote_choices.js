@@ -0,0 +1,65 @@
+import {useRef, useState} from "react";
+
+const TERM_VAR = 'alc_term';
+const PAGE_VAR = 'alc_page';
+const SEARCH_DELAY = 250;
+
+// Fetches pages of choices from the server, for filters with too many choices to
+// include in the initial state
+export function use_remote_choices(control) {
+    const [state, set_state] = useState({options: [], is_loading: false});
+    const request = useRef({term: null, page: 0, has_more: false, pending_url: null, timeout: null});
+
+    function load(term, page) {
+        const url = `${control.remote_choices_url}&${TERM_VAR}=${encodeURIComponent(term)}&${PAGE_VAR}=${page}`;
+        request.current = {...request.current, term, page, pending_url: url};
+        set_state(state => ({
+            options: page === 0 ? [] : state.options,
+            is_loading: true,
+        }));
+
+        fetch(url, {credentials: 'same-origin', headers: {'Accept': 'application/json'}})
+            .then(response => response.json())
+            .then(data => {
+                // Ignore responses that have been superseded by a newer search
+                if (request.current.pending_url !== url) {
+                    return;
+                }
+                request.current = {...request.current, has_more: data.has_more, pending_url: null};
+                const options = data.choices.map(([value, label]) => ({value, label}));
+                set_state(state => ({
+                    options: page === 0 ? options : state.options.concat(options),
+                    is_loading: false,
+                }));
+            })
+            .catch(() => {
+                if (request.current.pending_url === url) {
+                    request.current = {...request.current, pending_url: null};
+                    set_state(state => ({...state, is_loading: false}));
+                }
+            });
+    }
+
+    return {
+        options: state.options,
+        is_loading: state.is_loading,
+        on_input_change(term, {action}) {
+            if (action !== 'input-change') {
+                return;
+            }
+            clearTimeout(request.current.timeout);
+            request.current.timeout = setTimeout(() => load(term, 0), SEARCH_DELAY);
+        },
+        on_menu_open() {
+            if (request.current.term === null) {
+                load('', 0);
+            }
+        },
+        on_menu_scroll_to_bottom() {
+            const {term, page, has_more, pending_url} = request.current;
+            if (has_more && !pending_url) {
+                load(term, page + 1);
+            }
+        },
+    };
+}
@@ -32,8 +32,25 @@ $(() => {
         mount();
     });
     mount();
+
+    load_deferred_counts();
 });
 
+// Views that defer their result count render a placeholder, which is filled in once
+// the count has been fetched
+function load_deferred_counts() {
+    document.querySelectorAll('[data-alc-deferred-count-url]').forEach(element => {
+        fetch(element.dataset.alcDeferredCountUrl, {
+            credentials: 'same-origin',
+            headers: {'Accept': 'application/json'},
+        })
+            .then(response => response.json())
+            .then(data => {
+                element.textContent = data.display;
+            });
+    });
+}
+
 function mount(cb) {
     ReactDOM.render(<Root />, ui_root);
     ReactDOM.render(<BoundInputs />, input_root, cb);
@@ -65,6 +65,8 @@ function get_initial_state() {
     const initial_state = window.admin_list_controls_initial_state;
     const controls = initial_state.admin_list_controls;
 
+    resolve_references(controls, initial_state);
+
     const controls_by_ref = Object.create(null);
     const values = Object.create(null);
     const collapsed_panels_by_ref = Object.create(null);
@@ -100,6 +102,29 @@ function get_initial_state() {
     });
 }
 
+// Compact payloads replace actions and styles with indexes into lookup tables
+function resolve_references(controls, {action_table, style_table}) {
+    if (!action_table && !style_table) {
+        return;
+    }
+    const resolve_actions = actions => actions.map(action => (
+        _.isNumber(action) ? action_table[action] : action
+    ));
+    traverse_controls(controls, control => {
+        if (style_table && _.isNumber(control.style)) {
+            control.style = style_table[control.style];
+        }
+        if (action_table && control.action) {
+            control.action = resolve_actions(control.action);
+        }
+        if (action_table && control.summary) {
+            control.summary = control.summary.map(obj => (
+                obj.action ? _.assign({}, obj, {action: resolve_actions(obj.action)}) : obj
+            ));
+        }
+    });
+}
+
 function traverse_controls(control, cb) {
     cb(control);
     if (control.children) {
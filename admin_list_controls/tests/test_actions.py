@@ -1,5 +1,6 @@
 from django.test import TestCase
-from admin_list_controls.actions import BaseAction, SetValue, SubmitForm, TogglePanel, Link
+from admin_list_controls.actions import BaseAction, SetValue, SubmitForm, TogglePanel, Link, \
+    ClearSearchInput
 from admin_list_controls.tests.utils import BaseTestCase
 
 
@@ -23,3 +24,9 @@ class TestActions(BaseTestCase):
                 'value': 'test_value',
             },
         )
+
+    def test_stateless_actions_are_shared(self):
+        self.assertIs(SubmitForm(), SubmitForm())
+        self.assertIs(ClearSearchInput(), ClearSearchInput())
+        self.assertIsNot(SubmitForm(), ClearSearchInput())
+        self.assertEqual(SubmitForm().serialize()['action_type'], 'submit_form')
@@ -0,0 +1,66 @@
+from django.test import RequestFactory, TestCase
+from admin_list_controls.canonical import CanonicalState, get_canonical_control_params
+from admin_list_controls.components import ListControls
+from admin_list_controls.filters import BooleanFilter, ChoiceFilter, RadioFilter, TextFilter
+from admin_list_controls.selectors import SortSelector
+from admin_list_controls.tree import CompiledListControls
+
+
+class TestCanonical(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.compiled = CompiledListControls(ListControls()(
+            TextFilter(name='text'),
+            BooleanFilter(name='boolean'),
+            RadioFilter(
+                name='radio',
+                choices=[('', 'Any'), ('foo', 'Foo'), ('bar', 'Bar')],
+                default_value='',
+            ),
+            ChoiceFilter(
+                name='choice',
+                choices=[('foo', 'Foo'), ('bar', 'Bar')],
+                multiple=True,
+                default_value='foo',
+            ),
+            RadioFilter(
+                name='product_type',
+                choices=[('', 'Any'), ('bread', 'Bread'), ('cake', 'Cake')],
+                default_value='cake',
+            ),
+            SortSelector(value='name', is_default=True)('Name'),
+            SortSelector(value='-name')('Name (descending)'),
+        ))
+
+    def get_canonical_state(self, url):
+        index = self.compiled.bind().index
+        request = self.factory.get(url)
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(request)
+        for obj in index.get_by_name('sort'):
+            if obj.is_selected:
+                break
+        else:
+            for obj in index.get_by_name('sort'):
+                obj.is_selected = obj.is_default
+        return CanonicalState(get_canonical_control_params(index))
+
+    def test_equivalent_urls_have_the_same_state(self):
+        state = self.get_canonical_state('/?choice=bar&choice=foo&text=a&sort=-name')
+        self.assertEqual(state.urlencode(), 'choice=bar&choice=foo&sort=-name&text=a')
+        for url in (
+            '/?sort=-name&text=a&choice=foo&choice=bar&radio=&boolean=',
+            '/?text=a&choice=foo&choice=bar&choice=bar&choice=woz&sort=-name',
+        ):
+            self.assertEqual(self.get_canonical_state(url), state)
+
+    def test_defaults_are_omitted(self):
+        for url in ('/', '/?sort=name', '/?choice=foo', '/?radio=&text=', '/?sort=woz'):
+            self.assertEqual(self.get_canonical_state(url).urlencode(), '')
+        self.assertEqual(self.get_canonical_state('/?boolean=on').urlencode(), 'boolean=true')
+
+    def test_empty_values_that_differ_from_the_default_are_kept(self):
+        self.assertEqual(self.get_canonical_state('/?product_type=cake').urlencode(), '')
+        state = self.get_canonical_state('/?product_type=')
+        self.assertEqual(state.urlencode(), 'product_type=')
+        self.assertNotEqual(state, self.get_canonical_state('/'))
@@ -0,0 +1,124 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from shop.models import Product
+from admin_list_controls.cache import get_model_version
+from admin_list_controls.choices import CallableChoices, QuerysetChoices
+from admin_list_controls.filters import ChoiceFilter
+
+
+class TestChoices(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.bread = Product.objects.create(name='Bread')
+        self.cake = Product.objects.create(name='Cake')
+
+    def test_queryset_choices_are_lazy_and_shared(self):
+        with self.assertNumQueries(0):
+            filter_ = ChoiceFilter(
+                name='product',
+                choices_queryset=Product.objects.order_by('name'),
+                choices_label_field='name',
+            )
+            filter_.compile()
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                filter_.get_choices(),
+                [(str(self.bread.pk), 'Bread'), (str(self.cake.pk), 'Cake')],
+            )
+            filter_.get_choices()
+
+        # Filters with the same queryset share the cached choices
+        other_filter = ChoiceFilter(
+            name='other_product',
+            choices_queryset=Product.objects.order_by('name'),
+            choices_label_field='name',
+        )
+        with self.assertNumQueries(0):
+            self.assertEqual(len(other_filter.get_choices()), 2)
+
+    def test_queryset_choices_are_invalidated_by_changes(self):
+        choices = QuerysetChoices(Product.objects.order_by('name'))
+        self.assertEqual(len(choices.get_choice_index().choices), 2)
+        Product.objects.create(name='Drink')
+        self.assertEqual(
+            [label for _, label in choices.get_choice_index().choices],
+            ['Bread', 'Cake', 'Drink'],
+        )
+        self.bread.delete()
+        self.assertEqual(len(choices.get_choice_index().choices), 2)
+
+    def test_queryset_choices_validate_values_without_loading_choices(self):
+        filter_ = ChoiceFilter(
+            name='product',
+            choices_queryset=Product.objects.all(),
+            multiple=True,
+        )
+        url = '/?product=%s&product=foo&product=0' % self.cake.pk
+        with self.assertNumQueries(1):
+            filter_.handle_request(self.factory.get(url))
+        self.assertEqual(filter_.cleaned_value, [str(self.cake.pk)])
+        self.assertFalse(filter_.choices_source.has_loaded_choices(
+            filter_.choices_source.get_cache_key(),
+        ))
+
+        # Once loaded, the choices are used instead
+        filter_.get_choices()
+        with self.assertNumQueries(0):
+            filter_.handle_request(self.factory.get(url))
+        self.assertEqual(filter_.cleaned_value, [str(self.cake.pk)])
+
+    def test_queryset_choices_read_the_model_version_once_per_request(self):
+        filter_ = ChoiceFilter(
+            name='product',
+            choices_queryset=Product.objects.all(),
+            multiple=True,
+        )
+        self.assertFalse(filter_.choices_source.has_loaded_choices(None))
+        filter_.compile()
+
+        url = '/?product=%s' % self.cake.pk
+        with mock.patch(
+            'admin_list_controls.choices.get_model_version',
+            wraps=get_model_version,
+        ) as get_version:
+            for _ in range(2):
+                filter_.handle_request(self.factory.get(url))
+                filter_.get_choices()
+                filter_.serialize()
+                filter_.serialize_summary()
+        self.assertEqual(get_version.call_count, 2)
+
+    def test_callable_choices_expire(self):
+        calls = []
+
+        def get_choices():
+            calls.append(1)
+            return [('foo', 'Foo')]
+
+        choices = CallableChoices(get_choices, cache_timeout=10)
+        with mock.patch('admin_list_controls.choices.time.monotonic', return_value=100):
+            choices.get_choice_index()
+            choices.get_choice_index()
+        self.assertEqual(len(calls), 1)
+        with mock.patch('admin_list_controls.choices.time.monotonic', return_value=111):
+            choices.get_choice_index()
+        self.assertEqual(len(calls), 2)
+
+    def test_search_orders_prefix_matches_first(self):
+        Product.objects.create(name='Shortbread')
+        for choices in (
+            QuerysetChoices(Product.objects.order_by('name'), label_field='name'),
+            QuerysetChoices(Product.objects.order_by('name')),
+        ):
+            self.assertEqual(
+                [label for _, label in choices.search('BREAD', 0, 10)],
+                ['Bread', 'Shortbread'],
+            )
+            self.assertEqual([label for _, label in choices.search('', 1, 1)], ['Cake'])
+
+        choices = QuerysetChoices(Product.objects.order_by('name'), label_field='name')
+        with self.assertNumQueries(0):
+            choices.search('BREAD', 0, 10)
@@ -1,3 +1,4 @@
+import copy
 from admin_list_controls.components import ListControls, Block, Spacer, Columns, Divider, Panel, \
     Icon, Text, Button, Summary
 from admin_list_controls.tests.utils import BaseTestCase
@@ -220,3 +221,44 @@ class TestComponents(BaseTestCase):
             },
             serialized['children'][1],
         )
+
+    def test_flatten_tree(self):
+        first, second, third, fourth = Text('1'), Text('2'), Text('3'), Text('4')
+        block = Block()(second, [third, fourth])
+        root = ListControls()(first, block)
+        self.assertEqual(root.flatten_tree(), [root, first, block, second, third, fourth])
+        self.assertEqual(list(root.iter_tree()), root.flatten_tree())
+
+    def test_flatten_tree_does_not_recurse(self):
+        root = parent = Block()
+        for _ in range(5000):
+            child = Block()
+            parent.set_children(child)
+            parent = child
+        self.assertEqual(len(root.flatten_tree()), 5001)
+
+    def test_components_are_copied_with_their_slots(self):
+        text = Text('test', style={'color': 'red'})
+        self.assertFalse(hasattr(text, '__dict__'))
+        copied = copy.copy(text)
+        self.assertIsNot(copied, text)
+        self.assertEqual(copied.serialize(), text.serialize())
+
+        class CustomText(Text):
+            pass
+
+        custom_text = CustomText('test')
+        custom_text.custom_attribute = 'foo'
+        copied = copy.copy(custom_text)
+        self.assertEqual(copied.content, 'test')
+        self.assertEqual(copied.custom_attribute, 'foo')
+
+    def test_style_serialization_is_memoized(self):
+        first = Block(style={'margin-left': '5px'}).serialize()['style']
+        second = Block(style={'margin-left': '5px'}).serialize()['style']
+        self.assertEqual(first, {'marginLeft': '5px'})
+        self.assertIs(first, second)
+        self.assertEqual(
+            Block(style={'font-family': ['a', 'b']}).serialize()['style'],
+            {'fontFamily': ['a', 'b']},
+        )
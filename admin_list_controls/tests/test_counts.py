@@ -0,0 +1,46 @@
+from django.test import TestCase
+from shop.models import Product
+from admin_list_controls.counts import (
+    CAPPED, EXACT, ResultCount, count_up_to, with_count_strategy,
+)
+
+
+class TestCounts(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Product.objects.create(name='product %s' % i)
+
+    def test_count_up_to(self):
+        with self.assertNumQueries(1) as context:
+            self.assertEqual(count_up_to(Product.objects.order_by('name'), 3), 3)
+        self.assertIn('LIMIT 3', context.captured_queries[0]['sql'])
+        self.assertEqual(count_up_to(Product.objects.all(), 10), 5)
+
+    def test_count_strategies(self):
+        queryset = with_count_strategy(Product.objects.filter(name__startswith='product'), CAPPED, 4)
+        self.assertIsInstance(queryset, type(Product.objects.all()))
+        with self.assertNumQueries(1):
+            self.assertEqual(queryset.count(), 4)
+            self.assertEqual(queryset.count(), 4)
+        # The strategy is retained by copies of the queryset, and can be reverted
+        self.assertEqual(queryset.filter(name='product 1').count(), 1)
+        self.assertEqual(queryset.order_by('-name').count(), 4)
+        self.assertEqual(with_count_strategy(queryset, EXACT).count(), 5)
+
+    def test_result_count_display(self):
+        self.assertEqual(str(ResultCount(10000, is_capped=True)), '10,000+')
+        self.assertEqual(str(ResultCount(1234)), '1,234')
+        self.assertIn(
+            'data-alc-deferred-count-url="?q=foo&amp;alc_count=1"',
+            ResultCount(0, is_deferred=True, url='?q=foo&alc_count=1').__html__(),
+        )
+
+    def test_result_count_behaves_like_its_value(self):
+        self.assertFalse(ResultCount(0))
+        self.assertTrue(ResultCount(10000, is_capped=True))
+        self.assertEqual(ResultCount(5), 5)
+        self.assertEqual(ResultCount(5), ResultCount(5, is_capped=True))
+        self.assertNotEqual(ResultCount(5), 6)
+        self.assertLess(ResultCount(5), 6)
+        self.assertGreater(ResultCount(5), 4)
+        self.assertLessEqual(ResultCount(5), ResultCount(5))
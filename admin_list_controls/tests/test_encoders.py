@@ -0,0 +1,57 @@
+import json
+from unittest import skipUnless
+from admin_list_controls.components import ListControls, Panel, Text
+from admin_list_controls.encoders import get_encoder, JSONFragment, AVAILABLE_BACKENDS
+from admin_list_controls.exceptions import ConfigurationError
+from admin_list_controls.filters import ChoiceFilter
+from admin_list_controls.tests.utils import BaseTestCase
+
+
+class TestEncoders(BaseTestCase):
+    def test_script_sequences_are_escaped(self):
+        encoded = get_encoder('json').encode({'content': '</script><script>alert(1)&\u2028'})
+        self.assertNotIn('<', encoded)
+        self.assertNotIn('>', encoded)
+        self.assertNotIn('&', encoded)
+        self.assertNotIn('\u2028', encoded)
+        self.assertEqual(
+            json.loads(encoded),
+            {'content': '</script><script>alert(1)&\u2028'},
+        )
+
+    def test_fragments_are_spliced_into_the_payload(self):
+        fragment = JSONFragment(Panel()(Text('<b>static</b>')).serialize())
+        serialized = ListControls()(Text('dynamic')).serialize()
+        serialized['children'].append(fragment)
+        payload = {'admin_list_controls': serialized}
+
+        encoder = get_encoder('json')
+        encoded = encoder.encode(payload)
+        self.assertEqual(json.loads(encoded), json.loads(json.dumps(payload)))
+        self.assertIn(fragment.encode(encoder), encoded)
+        self.assertNotIn('__alc_fragment_', encoded)
+        # Fragments are only encoded once per backend
+        self.assertIs(fragment.encode(encoder), fragment.encode(encoder))
+
+        root_fragment = JSONFragment(serialized)
+        self.assertEqual(json.loads(encoder.encode(root_fragment)), json.loads(json.dumps(serialized)))
+
+    def test_choices_are_encoded_as_fragments(self):
+        filter_ = ChoiceFilter(name='test', choices=(('a', '<A>'), ('b', 'B')))
+        encoder = get_encoder('json')
+        encoded = encoder.encode({'children': [filter_.serialize()]})
+        self.assertIn(filter_.serialize()['choices'].encode(encoder), encoded)
+        self.assertEqual(json.loads(encoded)['children'][0]['choices'], [['a', '<A>'], ['b', 'B']])
+
+    @skipUnless(AVAILABLE_BACKENDS['orjson'], 'orjson is not installed')
+    def test_orjson_backend(self):
+        payload = {'content': '</script>', 'children': [JSONFragment({'a': (1, 2)})]}
+        self.assertEqual(
+            json.loads(get_encoder('orjson').encode(payload)),
+            json.loads(get_encoder('json').encode(payload)),
+        )
+        self.assertEqual(get_encoder('auto').name, 'orjson')
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ConfigurationError):
+            get_encoder('foo')
@@ -1,7 +1,9 @@
 from django.test import RequestFactory
+from django.db.models import Q
 from django_webtest import WebTest
 from admin_list_controls.filters import BaseFilter, TextFilter, BooleanFilter, ChoiceFilter, \
     RadioFilter
+from admin_list_controls.exceptions import ConfigurationError
 from admin_list_controls.tests.utils import BaseTestCase
 
 
@@ -126,3 +128,73 @@ class TestFilters(BaseTestCase, WebTest):
         self.assertEqual(filter_.cleaned_value, ['foo', 'bar'])
         filter_.handle_request(self.factory.get('/?test_name=foo&test_name=bar&test_name=woz'))
         self.assertEqual(filter_.cleaned_value, ['foo', 'bar'])
+
+    def test_choices_from_iterables_and_callables(self):
+        calls = []
+
+        def get_choices():
+            calls.append(1)
+            return (choice for choice in [('foo', 'Foo'), ('bar', 'Bar')])
+
+        for choices in (get_choices, get_choices()):
+            filter_ = ChoiceFilter(
+                name='test_name',
+                label='test_label',
+                choices=choices,
+                multiple=True,
+            )
+            filter_.handle_request(self.factory.get('/?test_name=foo&test_name=woz'))
+            self.assertEqual(filter_.cleaned_value, ['foo'])
+            filter_.handle_request(self.factory.get('/?test_name=bar'))
+            self.assertEqual(filter_.cleaned_value, ['bar'])
+            self.assertEqual(filter_.get_summary_display_value_for_value('bar'), 'Bar')
+            self.assertEqual(filter_.serialize()['choices'], [('foo', 'Foo'), ('bar', 'Bar')])
+        self.assertEqual(len(calls), 2)
+
+    def test_declarative_filter_queries(self):
+        filter_ = TextFilter(name='test_name', field='name')
+        self.assertTrue(filter_.is_declarative)
+        filter_.handle_request(self.factory.get('/'))
+        self.assertIsNone(filter_.get_query())
+        filter_.handle_request(self.factory.get('/?test_name=foo'))
+        self.assertEqual(filter_.get_query(), Q(name__icontains='foo'))
+
+        filter_ = ChoiceFilter(
+            name='test_name',
+            choices=[('foo', 'Foo'), ('bar', 'Bar')],
+            multiple=True,
+            field='product_type',
+        )
+        filter_.handle_request(self.factory.get('/?test_name=foo&test_name=bar'))
+        self.assertEqual(filter_.get_query(), Q(product_type__in=['foo', 'bar']))
+
+        filter_ = BooleanFilter(name='test_name', field='is_featured', lookup='exact')
+        filter_.handle_request(self.factory.get('/?test_name=1'))
+        self.assertEqual(filter_.get_query(), Q(is_featured__exact=True))
+
+        filter_ = BaseFilter(
+            name='test_name',
+            field='name',
+            apply_to_queryset=lambda queryset, value: queryset,
+        )
+        self.assertFalse(filter_.is_declarative)
+
+    def test_filters_can_skip_their_default_value(self):
+        filter_ = RadioFilter(
+            name='test_name',
+            choices=[('foo', 'Foo'), ('bar', 'Bar')],
+            default_value='foo',
+            field='product_type',
+            apply_default_value=False,
+        )
+        filter_.handle_request(self.factory.get('/'))
+        self.assertFalse(filter_.is_active())
+        self.assertIsNone(filter_.get_query())
+        filter_.handle_request(self.factory.get('/?test_name=bar'))
+        self.assertEqual(filter_.get_query(), Q(product_type__exact='bar'))
+
+    def test_facet_counts_require_a_declarative_filter(self):
+        with self.assertRaises(ConfigurationError):
+            BooleanFilter(name='test_name', facet_counts=True)
+        with self.assertRaises(ConfigurationError):
+            TextFilter(name='test_name', field='name', facet_counts=True)
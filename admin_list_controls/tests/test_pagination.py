@@ -0,0 +1,65 @@
+from django.test import TestCase
+from shop.models import Product
+from admin_list_controls.pagination import KeysetPaginator, encode_cursor
+
+
+class TestPagination(TestCase):
+    def setUp(self):
+        for i in range(7):
+            # Duplicate names ensure that the tie-breaker is used
+            Product.objects.create(name='product %s' % (i // 2), items_available=i)
+
+    def collect_pages(self, queryset, per_page):
+        paginator = KeysetPaginator(queryset, per_page)
+        pages = [paginator.page()]
+        while pages[-1].has_next():
+            pages.append(paginator.page(pages[-1].next_cursor))
+        return paginator, pages
+
+    def test_pages_match_the_queryset(self):
+        queryset = Product.objects.order_by('-name')
+        paginator, pages = self.collect_pages(queryset, 3)
+        self.assertEqual(paginator.ordering, ['-name', 'pk'])
+        self.assertEqual(
+            [product.pk for page in pages for product in page.object_list],
+            list(queryset.order_by('-name', 'pk').values_list('pk', flat=True)),
+        )
+        self.assertEqual([len(page.object_list) for page in pages], [3, 3, 1])
+        self.assertFalse(pages[0].has_previous())
+
+        # Previous pages are the same as the pages that led to them
+        for i in range(len(pages) - 1, 0, -1):
+            previous_page = paginator.page(pages[i].previous_cursor)
+            self.assertEqual(previous_page.object_list, pages[i - 1].object_list)
+            self.assertEqual(previous_page.has_previous(), i > 1)
+            self.assertTrue(previous_page.has_next())
+
+    def test_nullable_orderings_return_every_result_once(self):
+        for i in range(5):
+            Product.objects.create(name='null %s' % (i // 2), items_available=None)
+        for ordering in (['items_available'], ['-items_available'], ['-items_available', 'name']):
+            queryset = Product.objects.order_by(*ordering)
+            for per_page in (1, 2, 3):
+                paginator, pages = self.collect_pages(queryset, per_page)
+                pks = [product.pk for page in pages for product in page.object_list]
+                self.assertEqual(sorted(pks), sorted(queryset.values_list('pk', flat=True)))
+
+                # Walking back from the last page returns the same pages
+                for i in range(len(pages) - 1, 0, -1):
+                    previous_page = paginator.page(pages[i].previous_cursor)
+                    self.assertEqual(previous_page.object_list, pages[i - 1].object_list)
+
+    def test_pages_are_fetched_without_offsets(self):
+        paginator, pages = self.collect_pages(Product.objects.order_by('name', '-pk'), 2)
+        with self.assertNumQueries(1) as context:
+            paginator.page(pages[-1].previous_cursor)
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'])
+
+    def test_invalid_cursors_return_the_first_page(self):
+        paginator = KeysetPaginator(Product.objects.order_by('name'), 3)
+        first_page = paginator.page()
+        for cursor in ('foo', encode_cursor(['items_available', 'pk'], [1, 1], 'n')):
+            self.assertEqual(paginator.page(cursor).object_list, first_page.object_list)
+
+    def test_unsupported_orderings(self):
+        self.assertIsNone(KeysetPaginator.get_ordering(Product.objects.order_by('?')))
@@ -0,0 +1,96 @@
+import copy
+from django.test import RequestFactory
+from admin_list_controls.actions import SubmitForm, RemoveValue
+from admin_list_controls.components import ListControls, Button, Panel, Summary
+from admin_list_controls.filters import ChoiceFilter
+from admin_list_controls.encoders import get_encoder
+from admin_list_controls.payloads import PayloadCompactor, PayloadSize
+from admin_list_controls.tree import CompiledListControls
+from admin_list_controls.tests.utils import BaseTestCase
+
+
+class TestPayloads(BaseTestCase):
+    def test_actions_and_styles_are_deduplicated(self):
+        serialized = ListControls()(
+            Button(action=SubmitForm(), style={'color': 'red'})('One'),
+            Button(action=[RemoveValue('a', 'b'), SubmitForm()], style={'color': 'red'})('Two'),
+        ).serialize()
+        original = copy.deepcopy(serialized)
+
+        payload = PayloadCompactor().get_payload(serialized)
+        self.assertEqual(serialized, original)
+        self.assertEqual(payload['action_table'], [
+            SubmitForm().serialize(),
+            RemoveValue('a', 'b').serialize(),
+        ])
+        self.assertEqual(payload['style_table'], [{'color': 'red'}])
+        first, second = payload['admin_list_controls']['children']
+        self.assertEqual(first['action'], [0])
+        self.assertEqual(second['action'], [1, 0])
+        self.assertEqual(first['style'], 0)
+        self.assertEqual(second['style'], 0)
+
+    def test_compact_state(self):
+        compiled = CompiledListControls(ListControls()(
+            Panel()(Button(action=SubmitForm())('Static')),
+            ChoiceFilter(name='test', choices=[('a', 'A'), ('b', 'B')], multiple=True),
+            Summary(),
+        ))
+        state = compiled.bind()
+        index = state.index
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(RequestFactory().get('/?test=a&test=b'))
+        for obj in index.get_by_capability('derive_from_index'):
+            obj.derive_from_index(index)
+
+        payload = state.serialize_compact()
+        panel, choice_filter, summary = payload['admin_list_controls']['children']
+        self.assertEqual(panel['children'][0]['action'], [0])
+        self.assertEqual(
+            [obj['action'] for obj in summary['summary']],
+            [[1, 0], [2, 0]],
+        )
+        self.assertEqual(len(payload['action_table']), 3)
+        # The compacted static subtrees are shared between requests
+        self.assertIs(panel, compiled.bind().serialize_compact()['admin_list_controls']['children'][0])
+
+    def test_payload_size(self):
+        compiled = CompiledListControls(ListControls()(
+            Panel(ref='panel', style={'color': 'red'})(
+                Button(action=SubmitForm())('<Static>'),
+                ChoiceFilter(name='test', choices=[('a', 'A'), ('b', 'B')], multiple=True),
+            ),
+            Summary(),
+        ))
+        state = compiled.bind()
+        index = state.index
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(RequestFactory().get('/?test=a'))
+        for obj in index.get_by_capability('derive_from_index'):
+            obj.derive_from_index(index)
+
+        encoder = get_encoder('json')
+        for payload in ({'admin_list_controls': state.serialize()}, state.serialize_compact()):
+            payload_size = PayloadSize(payload, encoder)
+            self.assertEqual(payload_size.total_bytes, len(encoder.encode(payload)))
+
+            root, panel, button, text, choice_filter, summary = payload_size.components
+            self.assertEqual((panel.label, panel.depth), ('panel', 1))
+            self.assertEqual(choice_filter.label, 'test')
+            self.assertEqual(
+                panel.total_bytes,
+                panel.own_bytes + button.total_bytes + choice_filter.total_bytes,
+            )
+            self.assertEqual(root.total_bytes, payload_size.sections['admin_list_controls'])
+            self.assertEqual(
+                [component.own_bytes for component in payload_size.get_largest(3)],
+                sorted([component.own_bytes for component in payload_size.components], reverse=True)[:3],
+            )
+            self.assertEqual(
+                choice_filter.categories['choices'],
+                len(encoder.dumps([['a', 'A'], ['b', 'B']])),
+            )
+            self.assertIn('summary', payload_size.categories)
+            self.assertIn('actions', button.categories)
+
+        self.assertEqual(list(payload_size.sections), ['admin_list_controls', 'action_table', 'style_table'])
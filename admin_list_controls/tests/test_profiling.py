@@ -0,0 +1,119 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import RequestFactory, TestCase
+from shop.models import Product
+from shop.wagtail_hooks import ProductAdmin
+from admin_list_controls.profiling import (
+    BASE, CUMULATIVE, INDEX, ISOLATED, ProfileEntry, find_plan_issues, format_profile,
+    get_new_issues, profile_index_view,
+)
+
+User = get_user_model()
+
+
+class TestProfiling(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(
+            username='test',
+            email='test@example.com',
+            password='test',
+        )
+        Product.objects.create(name='bread', product_type=Product.BREAD)
+        Product.objects.create(name='cake', product_type=Product.CAKE, is_featured=True)
+
+    def test_find_plan_issues(self):
+        self.assertEqual(
+            find_plan_issues('sqlite', '2 0 0 SCAN TABLE shop_product\n9 0 0 USE TEMP B-TREE FOR ORDER BY'),
+            ['full scan of shop_product', 'temporary B-tree for ORDER BY'],
+        )
+        self.assertEqual(
+            find_plan_issues('sqlite', '3 0 0 SCAN shop_product USING INDEX shop_product_name'),
+            [],
+        )
+        self.assertEqual(
+            find_plan_issues('postgresql', (
+                'Sort  (cost=1.1..1.2 rows=1 width=8)\n'
+                '  Sort Key: name\n'
+                '  ->  Seq Scan on shop_product  (cost=0.00..1.01 rows=1 width=8)'
+            )),
+            ['sort', 'full scan of shop_product'],
+        )
+        self.assertEqual(
+            find_plan_issues(
+                'mysql',
+                '1 SIMPLE shop_product None ALL None None None None 2 50.0 Using where; Using filesort',
+            ),
+            ['full scan of shop_product', 'filesort'],
+        )
+        self.assertEqual(find_plan_issues('oracle', 'TABLE ACCESS FULL'), [])
+
+    def test_profile_index_view(self):
+        request = RequestFactory().get('/?product_type=cake&sort=-items_available&radio_filter=plum')
+        request.user = self.superuser
+        entries = profile_index_view(ProductAdmin(), request)
+
+        self.assertEqual(
+            [(entry.mode, entry.label) for entry in entries],
+            [
+                (BASE, 'no controls'),
+                (ISOLATED, 'selector sort=-items_available'),
+                (ISOLATED, 'filter product_type=cake'),
+                (CUMULATIVE, '+ selector sort=-items_available'),
+                (CUMULATIVE, '+ filter product_type=cake'),
+                (INDEX, 'index view'),
+            ],
+        )
+        self.assertIn('temporary B-tree for ORDER BY', entries[1].issues)
+        self.assertIn('full scan of shop_product', entries[2].issues)
+        self.assertIn('"product_type" = cake', entries[2].sql)
+
+    def test_issues_of_the_base_plan_are_not_flagged(self):
+        # The base queryset already scans the table, so only the sort is caused by a control
+        request = RequestFactory().get('/?product_type=cake&sort=-items_available')
+        request.user = self.superuser
+        entries = profile_index_view(ProductAdmin(), request)
+
+        self.assertIn('full scan of shop_product', entries[0].issues)
+        self.assertIn('full scan of shop_product', entries[2].issues)
+        self.assertEqual(entries[1].new_issues, ['temporary B-tree for ORDER BY'])
+        self.assertEqual(entries[2].new_issues, [])
+        self.assertEqual(entries[3].new_issues, ['temporary B-tree for ORDER BY'])
+        self.assertEqual(entries[4].new_issues, [])
+
+        output = format_profile(entries)
+        flagged = output.split('Controls that cause scans or sorts:\n')[1]
+        self.assertEqual(flagged.splitlines(), [
+            '  selector sort=-items_available: temporary B-tree for ORDER BY',
+            '  + selector sort=-items_available: temporary B-tree for ORDER BY',
+        ])
+
+    def test_get_new_issues(self):
+        self.assertEqual(
+            get_new_issues(['full scan of a', 'full scan of a', 'sort'], ['full scan of a']),
+            ['full scan of a', 'sort'],
+        )
+        self.assertEqual(get_new_issues(['full scan of a'], ['full scan of a', 'sort']), [])
+
+    def test_format_profile_without_new_issues(self):
+        base = ProfileEntry('no controls', BASE, 'SELECT', 'SCAN a', ['full scan of a'], 0, 0)
+        entry = ProfileEntry(
+            'filter a=1', ISOLATED, 'SELECT', 'SCAN a', ['full scan of a'], 0, 0, new_issues=[],
+        )
+        output = format_profile([base, entry])
+        self.assertIn('- full scan of a (inherited)', output)
+        self.assertIn('No controls cause scans or sorts', output)
+
+    def test_profile_command(self):
+        stdout = StringIO()
+        call_command(
+            'profile_list_controls', 'shop.wagtail_hooks.ProductAdmin',
+            params='?is_featured=1', stdout=stdout,
+        )
+        output = stdout.getvalue()
+        self.assertIn('filter is_featured=True', output)
+        # The base queryset already scans the table, so the filter is not flagged
+        flagged = output.split('Controls that cause scans or sorts:\n')[1]
+        self.assertNotIn('is_featured', flagged)
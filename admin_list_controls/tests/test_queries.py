@@ -0,0 +1,94 @@
+from django.db.models import Q
+from django.test import RequestFactory, TestCase
+from shop.models import Product, ProductVariant
+from admin_list_controls.filters import BooleanFilter, RadioFilter, TextFilter
+from admin_list_controls.queries import (
+    combine_queries, count_facets, get_filter_queries, spans_multi_valued_relation,
+)
+
+
+class TestQueries(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        Product.objects.create(name='foo', product_type=Product.BREAD, is_featured=True)
+        Product.objects.create(name='foo', product_type=Product.CAKE)
+        Product.objects.create(name='bar', product_type=Product.CAKE, is_featured=True)
+
+    def test_combine_queries_drops_duplicates(self):
+        self.assertEqual(
+            combine_queries([Q(name='foo'), Q(is_featured=True), Q(name='foo')]),
+            Q(name='foo') & Q(is_featured=True),
+        )
+
+    def test_spans_multi_valued_relation(self):
+        self.assertTrue(spans_multi_valued_relation(Product, 'variants__size'))
+        self.assertTrue(spans_multi_valued_relation(Product, 'variants__product__name'))
+        self.assertFalse(spans_multi_valued_relation(Product, 'name'))
+        self.assertFalse(spans_multi_valued_relation(Product, 'name__lower'))
+        self.assertFalse(spans_multi_valued_relation(ProductVariant, 'product__name'))
+
+    def test_queries_across_multi_valued_relations_are_kept_apart(self):
+        name_filter = TextFilter(name='name', field='name')
+        featured_filter = BooleanFilter(name='is_featured', field='is_featured')
+        size_filter = TextFilter(name='size', field='variants__size')
+        colour_filter = TextFilter(name='colour', field='variants__colour')
+        queries = [
+            (size_filter, Q(variants__size='large')),
+            (name_filter, Q(name='foo')),
+            (colour_filter, Q(variants__colour='red')),
+            (featured_filter, Q(is_featured=True)),
+        ]
+        self.assertEqual(get_filter_queries(Product, queries), [
+            Q(name='foo') & Q(is_featured=True),
+            Q(variants__size='large'),
+            Q(variants__colour='red'),
+        ])
+        self.assertEqual(get_filter_queries(Product, queries[:1]), [Q(variants__size='large')])
+        self.assertEqual(get_filter_queries(Product, []), [])
+
+    def test_facets_across_multi_valued_relations_match_any_related_row(self):
+        foo = Product.objects.get(name='foo', product_type=Product.BREAD)
+        ProductVariant.objects.create(product=foo, size='large', colour='blue')
+        ProductVariant.objects.create(product=foo, size='small', colour='red')
+
+        featured_filter = BooleanFilter(name='is_featured', field='is_featured', facet_counts=True)
+        size_filter = TextFilter(name='size', field='variants__size', lookup='exact')
+        colour_filter = TextFilter(name='colour', field='variants__colour', lookup='exact')
+        request = self.factory.get('/?size=large&colour=red')
+        filters = [featured_filter, size_filter, colour_filter]
+        for filter_ in filters:
+            filter_.handle_request(request)
+        queries = [(filter_, filter_.get_query()) for filter_ in filters]
+
+        featured_counts, = count_facets(Product.objects.all(), [featured_filter], queries)
+        self.assertEqual(featured_counts, {True: 1})
+
+    def test_facets_are_counted_in_one_query(self):
+        product_type_filter = RadioFilter(
+            name='product_type',
+            choices=(('', 'Any'),) + Product.PRODUCT_TYPE_CHOICES,
+            field='product_type',
+            facet_counts=True,
+        )
+        featured_filter = BooleanFilter(name='is_featured', field='is_featured', facet_counts=True)
+        name_filter = TextFilter(name='name', field='name')
+
+        request = self.factory.get('/?product_type=cake&is_featured=1&name=foo')
+        filters = [product_type_filter, featured_filter, name_filter]
+        for filter_ in filters:
+            filter_.handle_request(request)
+        queries = [(filter_, filter_.get_query()) for filter_ in filters]
+
+        with self.assertNumQueries(1):
+            product_type_counts, featured_counts = count_facets(
+                Product.objects.all(),
+                [product_type_filter, featured_filter],
+                queries,
+            )
+        # Each filter's options are counted with every other filter applied
+        self.assertEqual(product_type_counts, {'': 1, 'bread': 1, 'cake': 0, 'drink': 0})
+        self.assertEqual(featured_counts, {True: 0})
+
+    def test_no_facets(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(count_facets(Product.objects.all(), [], []), [])
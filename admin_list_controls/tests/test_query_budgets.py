@@ -0,0 +1,77 @@
+import itertools
+import os
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import RequestFactory
+from shop.models import Product
+from shop.wagtail_hooks import ProductAdmin
+from admin_list_controls.tests.utils import BaseTestCase, QueryBudgetMixin, normalize_sql
+
+User = get_user_model()
+
+FILTER_PARAMS = (
+    '',
+    'text_filter=bread',
+    'product_type=cake',
+    'is_featured=1&product_type=drink',
+    'q=bread',
+)
+SORT_PARAMS = ('', 'sort=-items_available')
+LAYOUT_PARAMS = ('', 'layout=grid')
+
+
+class TestQueryBudgets(QueryBudgetMixin, BaseTestCase):
+    """
+    Renders the test project's product index with every combination of filters, sorts
+    and layouts, and checks their queries against the recorded budgets
+    """
+    query_budget_path = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+    query_budget_tables = (Product._meta.db_table,)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.superuser = User.objects.create_superuser(
+            username='test',
+            email='test@example.com',
+            password='test',
+        )
+        product_types = [value for value, _ in Product.PRODUCT_TYPE_CHOICES]
+        Product.objects.bulk_create([
+            Product(
+                name='%s %s' % (product_types[i % 3], i),
+                items_available=i,
+                product_type=product_types[i % 3],
+                is_featured=i % 2 == 0,
+            )
+            for i in range(12)
+        ])
+
+    def render_index(self, url):
+        request = RequestFactory().get(url)
+        request.user = self.superuser
+        response = ProductAdmin().index_view(request)
+        response.render()
+        self.assertEqual(response.status_code, 200)
+
+    def test_index_query_budgets(self):
+        for params in itertools.product(FILTER_PARAMS, SORT_PARAMS, LAYOUT_PARAMS):
+            query_string = '&'.join(param for param in params if param)
+            with self.subTest(query_string):
+                # Every scenario starts from a cold cache, so that its queries are
+                # independent of the others
+                caches['default'].clear()
+                self.assertWithinQueryBudget(
+                    'index?%s' % query_string,
+                    lambda: self.render_index('/?%s' % query_string),
+                )
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql(
+                'SELECT "t1"."id" FROM "t1"\n  WHERE ("t1"."name" LIKE \'%it\'\'s%\' '
+                'AND "t1"."id" IN (1, 2, 3) AND "t1"."count" > 10.5) LIMIT 21'
+            ),
+            'SELECT "t1"."id" FROM "t1" WHERE ("t1"."name" LIKE ? AND "t1"."id" IN (...) '
+            'AND "t1"."count" > ?) LIMIT ?',
+        )
@@ -0,0 +1,64 @@
+from django.test import RequestFactory
+from admin_list_controls.components import ListControls, Summary, Text
+from admin_list_controls.filters import ChoiceFilter
+from admin_list_controls.selectors import LayoutSelector, SortSelector
+from admin_list_controls.tree import CompiledListControls
+from admin_list_controls.tests.utils import BaseTestCase
+from shop.models import Product
+
+
+class TestSelectors(BaseTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_selector_summary(self):
+        selector = SortSelector(value='name')('Sort by ', Text('name', size=Text.LARGE))
+        selector.handle_request(self.factory.get('/?sort=name'))
+        selector.prepare_children()
+        summary = selector.serialize_summary()
+        self.assertEqual(summary['label'], 'Sort')
+        self.assertEqual(summary['value'], 'Sort by  name')
+        self.assertEqual(summary['action'][0]['value'], 'name')
+
+        selector.handle_request(self.factory.get('/'))
+        self.assertIsNone(selector.serialize_summary())
+
+        selector = SortSelector(value='name', summary_value='Name')
+        selector.handle_request(self.factory.get('/?sort=name'))
+        self.assertEqual(selector.serialize_summary()['value'], 'Name')
+
+    def test_summaries_are_resolved_when_compiled(self):
+        compiled = CompiledListControls(ListControls()(
+            SortSelector(value='name')('Name'),
+            ChoiceFilter(name='choice', choices=(('a', 'Apple'),), multiple=True),
+            Summary(),
+        ))
+        summaries = []
+        for _ in range(2):
+            index = compiled.bind().index
+            for obj in index.get_by_capability('handle_request'):
+                obj.handle_request(self.factory.get('/?sort=name&choice=a'))
+            for obj in index.get_by_capability('derive_from_index'):
+                obj.derive_from_index(index)
+            summaries.append(index.get_by_object_type('summary')[0].summary)
+
+        self.assertEqual([obj['value'] for obj in summaries[0]], ['Name', 'a'])
+        self.assertEqual(summaries[0][1]['display_value'], 'Apple')
+        self.assertIs(summaries[0][0], summaries[1][0])
+
+    def test_layout_queryset_shaping(self):
+        selector = LayoutSelector(
+            value='grid',
+            select_related='foo',
+            prefetch_related=('bar', 'woz'),
+            defer=['items_available'],
+        )
+        self.assertEqual(selector.select_related, ('foo',))
+        self.assertEqual(selector.prefetch_related, ('bar', 'woz'))
+
+        queryset = LayoutSelector(value='grid', defer=['items_available']).shape_queryset(
+            Product.objects.all(),
+        )
+        self.assertEqual(queryset.query.deferred_loading, ({'items_available'}, True))
+        queryset = LayoutSelector(value='list').shape_queryset(Product.objects.all())
+        self.assertEqual(str(queryset.query), str(Product.objects.all().query))
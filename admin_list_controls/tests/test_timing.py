@@ -0,0 +1,34 @@
+import time
+
+from django.test import TestCase
+from admin_list_controls.timing import PhaseTimer
+
+
+class TestPhaseTimer(TestCase):
+    def test_phases_are_accumulated(self):
+        timer = PhaseTimer()
+        with timer.phase('prepare'):
+            pass
+        timer.add('handle_request', 0.002)
+        timer.add('prepare', 0.5)
+        timer.start('render')
+        timer.stop('render')
+        # Phases that were never started are ignored
+        timer.stop('encode')
+
+        self.assertEqual(list(timer.durations), ['prepare', 'handle_request', 'render'])
+        self.assertGreaterEqual(timer.durations['prepare'], 0.5)
+        self.assertTrue(timer.get_server_timing().startswith('alc-prepare;dur=500.'))
+        self.assertIn(', alc-handle-request;dur=2.00, alc-render;dur=', timer.get_server_timing())
+
+    def test_nested_phases_are_not_counted_twice(self):
+        timer = PhaseTimer()
+        with timer.phase('context'):
+            with timer.phase('queryset'):
+                time.sleep(0.05)
+        with timer.phase('queryset'):
+            pass
+
+        self.assertEqual(list(timer.durations), ['context', 'queryset'])
+        self.assertGreaterEqual(timer.durations['queryset'], 0.05)
+        self.assertLess(timer.durations['context'], 0.05)
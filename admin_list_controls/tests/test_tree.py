@@ -0,0 +1,144 @@
+from unittest import mock
+from django.test import RequestFactory
+from admin_list_controls.components import ListControls, Panel, Text, Summary
+from admin_list_controls.filters import ChoiceFilter, TextFilter
+from admin_list_controls.selectors import SortSelector
+from admin_list_controls.tree import CompiledListControls
+from admin_list_controls.tests.utils import BaseTestCase
+
+
+class TestTree(BaseTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def build_tree(self):
+        return ListControls()(
+            Panel()(
+                Text('Static heading'),
+            ),
+            Panel()(
+                TextFilter(name='text_filter'),
+                SortSelector(value='name', is_default=True)('Name'),
+            ),
+            Summary(),
+        )
+
+    def test_static_subtrees_are_shared_between_requests(self):
+        compiled = CompiledListControls(self.build_tree())
+        static_panel, dynamic_panel, summary = compiled.list_controls.children
+
+        state = compiled.bind()
+        self.assertIsNot(state.list_controls, compiled.list_controls)
+        self.assertIs(state.list_controls.children[0], static_panel)
+        self.assertIsNot(state.list_controls.children[1], dynamic_panel)
+        self.assertIsNot(state.list_controls.children[2], summary)
+
+    def test_request_values_do_not_reach_the_compiled_tree(self):
+        compiled = CompiledListControls(self.build_tree())
+        compiled_filter = compiled.list_controls.children[1].children[0]
+        compiled_summary = compiled.list_controls.children[2]
+
+        state = compiled.bind()
+        text_filter = state.list_controls.children[1].children[0]
+        summary = state.list_controls.children[2]
+        text_filter.handle_request(self.factory.get('/?text_filter=foo'))
+        summary.derive_from_index(state.index)
+
+        self.assertEqual(text_filter.cleaned_value, 'foo')
+        self.assertEqual(len(summary.summary), 1)
+        self.assertIsNone(compiled_filter.cleaned_value)
+        self.assertEqual(compiled_summary.summary, [])
+        self.assertIsNone(compiled.bind().list_controls.children[1].children[0].cleaned_value)
+
+    def test_index_lookups(self):
+        index = CompiledListControls(self.build_tree()).bind().index
+        text_filter = index.get_by_name('text_filter')[0]
+        selector = index.get_by_name('sort')[0]
+        self.assertIsInstance(text_filter, TextFilter)
+        self.assertEqual(index.get_by_object_type('selector'), [selector])
+        self.assertEqual(index.get_by_class(SortSelector), [selector])
+        self.assertEqual(index.get_by_class(Panel), index.get_by_object_type('panel'))
+        self.assertEqual(index.get_by_capability('apply_to_queryset'), [text_filter, selector])
+        self.assertEqual(index.get_by_name('missing'), [])
+
+    def test_static_subtrees_are_serialized_once(self):
+        compiled = CompiledListControls(self.build_tree())
+        first_state = compiled.bind()
+        second_state = compiled.bind()
+        second_state.index.get_by_name('text_filter')[0].handle_request(
+            self.factory.get('/?text_filter=foo'))
+
+        first = first_state.serialize()
+        second = second_state.serialize()
+        self.assertIs(first['children'][0], second['children'][0])
+        self.assertEqual(first['children'][0]['children'][0]['content'], 'Static heading')
+        self.assertIsNot(first['children'][1], second['children'][1])
+        self.assertEqual(first['children'][1]['children'][0]['value'], None)
+        self.assertEqual(second['children'][1]['children'][0]['value'], 'foo')
+
+    def test_component_ids_are_deterministic(self):
+        request = self.factory.get('/?text_filter=foo')
+        serialized = []
+        for _ in range(2):
+            state = CompiledListControls(self.build_tree()).bind()
+            for obj in state.index.get_by_capability('handle_request'):
+                obj.handle_request(request)
+            for obj in state.index.get_by_capability('prepare_children'):
+                obj.prepare_children()
+            serialized.append(state.serialize())
+        self.assertEqual(serialized[0], serialized[1])
+
+        root = serialized[0]
+        self.assertEqual(root['component_id'], 'ListControls-0')
+        self.assertEqual(root['children'][0]['component_id'], 'Panel-1')
+        selector = root['children'][1]['children'][1]
+        self.assertEqual(selector['component_id'], 'SortSelector-5')
+        # Components added during the request derive their ids from their parent
+        self.assertEqual(selector['children'][0]['component_id'], 'Button-5:0')
+
+    def test_summary_only_serializes_controls_that_differ_from_their_defaults(self):
+        compiled = CompiledListControls(self.build_tree())
+        state = compiled.bind()
+        index = state.index
+        self.assertEqual(
+            [type(obj) for obj in index.summarized],
+            [TextFilter, SortSelector],
+        )
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(self.factory.get('/?sort=name'))
+        for obj in index.get_by_class(SortSelector):
+            obj.is_selected = True
+
+        with mock.patch.object(TextFilter, 'serialize_summary') as serialize_summary:
+            summary = index.get_by_object_type('summary')[0]
+            summary.derive_from_index(index)
+        serialize_summary.assert_not_called()
+        self.assertEqual(summary.summary, [])
+
+    def test_multiple_choice_values_matching_the_default_are_summarized(self):
+        compiled = CompiledListControls(ListControls()(
+            ChoiceFilter(
+                name='choice',
+                choices=(('a', 'Apple'), ('b', 'Banana')),
+                multiple=True,
+                default_value='a',
+            ),
+            Summary(),
+        ))
+        index = compiled.bind().index
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(self.factory.get('/'))
+        summary = index.get_by_object_type('summary')[0]
+        summary.derive_from_index(index)
+        self.assertEqual([obj['value'] for obj in summary.summary], ['a'])
+
+    def test_derive_from_components_is_a_deprecated_alias(self):
+        compiled = CompiledListControls(self.build_tree())
+        index = compiled.bind().index
+        for obj in index.get_by_capability('handle_request'):
+            obj.handle_request(self.factory.get('/?text_filter=foo'))
+        summary = index.get_by_object_type('summary')[0]
+
+        with self.assertWarns(DeprecationWarning):
+            summary.derive_from_components(index.components)
+        self.assertEqual([obj['value'] for obj in summary.summary], ['foo'])
@@ -1,8 +1,22 @@
+import json
+import time
+from unittest import mock
 from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.functions import Length
+from django.http import Http404
+from django.test.utils import CaptureQueriesContext
 from django.test import RequestFactory
+from django.utils import translation
 from django_webtest import WebTest
-from shop.models import Product
+from shop.models import Product, ProductVariant
+from admin_list_controls.exceptions import PayloadBudgetExceeded, PayloadBudgetWarning
+from admin_list_controls.components import Summary
 from admin_list_controls.views import ListControlsIndexView
+from admin_list_controls.filters import TextFilter, ChoiceFilter, BooleanFilter, RadioFilter
+from admin_list_controls.selectors import LayoutSelector, SortSelector
+from admin_list_controls.signals import list_controls_timed
+from admin_list_controls.tree import ListControlsIndex
 
 try:
     from wagtail.contrib.modeladmin.options import ModelAdmin
@@ -35,6 +49,725 @@ class TestViews(WebTest):
         self.assertIn('admin_list_controls', response.context_data)
         self.assertIsInstance(response.context_data['admin_list_controls'], dict)
 
+    def test_list_controls_are_compiled_once_per_view_class(self):
+        build_count = []
+
+        class TestView(ListControlsIndexView):
+            cache_list_controls = True
+
+            def build_list_controls(self):
+                build_count.append(1)
+                return [TextFilter(name='text_filter')]
+
+        view = self.list_view_class_to_view_function(TestView)
+        view(self.create_superuser_request('/?text_filter=foo'))
+        response = view(self.create_superuser_request('/'))
+        self.assertEqual(len(build_count), 1)
+        self.assertIn('"value":""', response.context_data['admin_list_controls']['initial_state'])
+
+        class UncachedTestView(TestView):
+            cache_list_controls = False
+
+        view = self.list_view_class_to_view_function(UncachedTestView)
+        view(self.create_superuser_request('/'))
+        view(self.create_superuser_request('/'))
+        self.assertEqual(len(build_count), 3)
+
+    def test_request_dependent_list_controls_are_not_shared_by_default(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [TextFilter(name='text_filter', label=self.request.user.username)]
+
+        other_user = User.objects.create_superuser(
+            username='other',
+            email='other@example.com',
+            password='test',
+        )
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/'))
+        self.assertIn('"label":"test"', response.context_data['admin_list_controls']['initial_state'])
+
+        request = self.factory.get('/')
+        request.user = other_user
+        response = view(request)
+        initial_state = response.context_data['admin_list_controls']['initial_state']
+        self.assertIn('"label":"other"', initial_state)
+        self.assertNotIn('"label":"test"', initial_state)
+        self.assertIsNone(TestView.__dict__.get('_compiled_list_controls'))
+
+    def test_compiled_list_controls_are_keyed_by_modeladmin_and_language(self):
+        class TestView(ListControlsIndexView):
+            cache_list_controls = True
+
+            def build_list_controls(self):
+                return [TextFilter(name='text_filter')]
+
+        first_view = self.list_view_class_to_view_function(TestView)
+        second_view = self.list_view_class_to_view_function(TestView)
+        first_view(self.create_superuser_request('/'))
+        first_view(self.create_superuser_request('/'))
+        second_view(self.create_superuser_request('/'))
+        with translation.override('fr'):
+            first_view(self.create_superuser_request('/'))
+        self.assertEqual(len(TestView._compiled_list_controls), 3)
+        self.assertEqual(
+            {(key[1], key[2]) for key in TestView._compiled_list_controls},
+            {(Product, 'en-us'), (Product, 'fr')},
+        )
+
+    def test_index_is_only_rebuilt_when_children_are_replaced(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name')]
+
+        class SelectorTestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    SortSelector(value='name', is_default=True)('Name'),
+                    SortSelector(value='-name')('Name (descending)'),
+                ]
+
+        with mock.patch.object(ListControlsIndex, '__init__', autospec=True,
+                               side_effect=ListControlsIndex.__init__) as build_index:
+            view = self.list_view_class_to_view_function(TestView)
+            view(self.create_superuser_request('/?name=foo'))
+            self.assertEqual(build_index.call_count, 1)
+
+            build_index.reset_mock()
+            view = self.list_view_class_to_view_function(SelectorTestView)
+            response = view(self.create_superuser_request('/?sort=-name'))
+            # The selectors wrap their children in buttons, so the index is rebuilt once
+            self.assertEqual(build_index.call_count, 2)
+
+        index = response.context_data['view'].get_list_controls_index()
+        self.assertEqual(len(index.get_by_object_type('button')), 2)
+        self.assertIn('is-selected', response.context_data['admin_list_controls']['initial_state'])
+
+    def test_summary_subclasses_overriding_derive_from_components_are_called(self):
+        class TestSummary(Summary):
+            def derive_from_components(self, components):
+                super().derive_from_components(components)
+                self.summary = self.summary + [{'name': 'extra'}]
+
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name'), TestSummary(), Summary()]
+
+        view = self.list_view_class_to_view_function(TestView)
+        with self.assertWarns(DeprecationWarning):
+            response = view(self.create_superuser_request('/?name=foo'))
+        index = response.context_data['view'].get_list_controls_index()
+        custom_summary, summary = index.get_by_object_type('summary')
+        self.assertEqual([obj['name'] for obj in custom_summary.summary], ['name', 'extra'])
+        self.assertEqual([obj['name'] for obj in summary.summary], ['name'])
+
+    def test_selected_layout(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    LayoutSelector(value='list', is_default=True)('List'),
+                    LayoutSelector(value='grid', template='grid.html')('Grid'),
+                ]
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/'))
+        self.assertIsNone(response.context_data['admin_list_controls']['selected_layout_template'])
+        response = view(self.create_superuser_request('/?layout=grid'))
+        self.assertEqual(
+            response.context_data['admin_list_controls']['selected_layout_template'],
+            'grid.html',
+        )
+
+    def test_declarative_filters_are_combined_into_one_query(self):
+        querysets = []
+
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    TextFilter(name='name_again', field='name'),
+                    ChoiceFilter(
+                        name='product_type',
+                        choices=Product.PRODUCT_TYPE_CHOICES,
+                        multiple=True,
+                        field='product_type',
+                    ),
+                    BooleanFilter(
+                        name='is_featured',
+                        apply_to_queryset=lambda queryset, value: queryset.exclude(name=''),
+                    ),
+                ]
+
+            def apply_list_controls_to_queryset(self, queryset):
+                queryset = super().apply_list_controls_to_queryset(queryset)
+                querysets.append(queryset)
+                return queryset
+
+        Product.objects.create(name='foo', product_type=Product.CAKE)
+        Product.objects.create(name='foo', product_type=Product.DRINK)
+        Product.objects.create(name='bar', product_type=Product.CAKE)
+
+        view = self.list_view_class_to_view_function(TestView)
+        view(self.create_superuser_request(
+            '/?name=foo&name_again=foo&product_type=cake&is_featured=1',
+        ))
+        queryset = querysets[-1]
+        where = str(queryset.query).split(' WHERE ')[1]
+        self.assertEqual(where.count('LIKE'), 1)
+        self.assertEqual([product.name for product in queryset], ['foo'])
+
+        view(self.create_superuser_request('/'))
+        self.assertNotIn(' WHERE ', str(querysets[-1].query))
+
+    def test_filters_across_reverse_foreign_keys_are_not_combined(self):
+        querysets = []
+
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='size', field='variants__size', lookup='exact'),
+                    TextFilter(name='colour', field='variants__colour', lookup='exact'),
+                    TextFilter(name='name', field='name'),
+                ]
+
+            def apply_list_controls_to_queryset(self, queryset):
+                queryset = super().apply_list_controls_to_queryset(queryset)
+                querysets.append(queryset)
+                return queryset
+
+        # Only `bread` has a single variant that is both large and red, but both products
+        # have a large variant and a red one
+        bread = Product.objects.create(name='bread')
+        ProductVariant.objects.create(product=bread, size='large', colour='red')
+        cake = Product.objects.create(name='cake')
+        ProductVariant.objects.create(product=cake, size='large', colour='blue')
+        ProductVariant.objects.create(product=cake, size='small', colour='red')
+
+        view = self.list_view_class_to_view_function(TestView)
+        view(self.create_superuser_request('/?size=large&colour=red'))
+        queryset = querysets[-1]
+        self.assertEqual(
+            sorted(product.name for product in queryset.distinct()),
+            sorted(product.name for product in Product.objects.filter(
+                variants__size='large',
+            ).filter(
+                variants__colour='red',
+            ).distinct()),
+        )
+        self.assertEqual(sorted(product.name for product in queryset.distinct()), ['bread', 'cake'])
+
+        view(self.create_superuser_request('/?size=large&colour=red&name=cake'))
+        self.assertEqual([product.name for product in querysets[-1].distinct()], ['cake'])
+
+    def test_facet_counts_are_serialized_and_cached(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    RadioFilter(
+                        name='product_type',
+                        choices=Product.PRODUCT_TYPE_CHOICES,
+                        field='product_type',
+                        facet_counts=True,
+                    ),
+                    BooleanFilter(name='is_featured', field='is_featured', facet_counts=True),
+                ]
+
+        Product.objects.create(name='foo', product_type=Product.CAKE, is_featured=True)
+        Product.objects.create(name='bar', product_type=Product.DRINK)
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?is_featured=1'))
+        initial_state = response.context_data['admin_list_controls']['initial_state']
+        self.assertIn('"counts":[["bread",0],["cake",1],["drink",0]]', initial_state)
+        self.assertIn('"counts":[[true,1]]', initial_state)
+
+        # Saving an instance invalidates the cached counts
+        Product.objects.create(name='woz', product_type=Product.BREAD, is_featured=True)
+        response = view(self.create_superuser_request('/?is_featured=1'))
+        initial_state = response.context_data['admin_list_controls']['initial_state']
+        self.assertIn('"counts":[["bread",1],["cake",1],["drink",0]]', initial_state)
+
+    def test_facets_are_counted_once_per_rendered_request(self):
+        class TestView(ListControlsIndexView):
+            list_controls_facet_cache_timeout = None
+
+            def build_list_controls(self):
+                return [
+                    BooleanFilter(name='is_featured', field='is_featured', facet_counts=True),
+                ]
+
+        Product.objects.create(name='foo', is_featured=True)
+
+        view = self.list_view_class_to_view_function(TestView)
+        with mock.patch('admin_list_controls.views.count_facets',
+                        return_value=[{True: 1}]) as count_facets:
+            response = view(self.create_superuser_request('/?is_featured=1'))
+            self.assertEqual(count_facets.call_count, 1)
+            self.assertIn(
+                '"counts":[[true,1]]',
+                response.context_data['admin_list_controls']['initial_state'],
+            )
+
+            # Deferred counts don't render the facets
+            count_facets.reset_mock()
+            response = view(self.create_superuser_request('/?is_featured=1&alc_count=1'))
+            self.assertEqual(json.loads(response.content)['count'], 1)
+            count_facets.assert_not_called()
+
+    def test_remote_choices(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    ChoiceFilter(
+                        name='product',
+                        choices_queryset=Product.objects.order_by('name'),
+                        choices_label_field='name',
+                        remote_choices=True,
+                        remote_choices_page_size=2,
+                    ),
+                ]
+
+        for name in ('Bread', 'Cake', 'Shortbread', 'Drink'):
+            Product.objects.create(name=name)
+        cake = Product.objects.get(name='Cake')
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?product=%s' % cake.pk))
+        initial_state = response.context_data['admin_list_controls']['initial_state']
+        self.assertIn('"choices":[["%s","Cake"]]' % cake.pk, initial_state)
+        self.assertIn('"remote_choices_url":"?alc_choices=product"', initial_state)
+
+        response = view(self.create_superuser_request('/?alc_choices=product&alc_term=bread'))
+        self.assertEqual(json.loads(response.content), {
+            'choices': [
+                [str(Product.objects.get(name='Bread').pk), 'Bread'],
+                [str(Product.objects.get(name='Shortbread').pk), 'Shortbread'],
+            ],
+            'page': 0,
+            'has_more': False,
+        })
+        response = view(self.create_superuser_request('/?alc_choices=product&alc_page=1'))
+        self.assertEqual(
+            [label for _, label in json.loads(response.content)['choices']],
+            ['Drink', 'Shortbread'],
+        )
+        self.assertFalse(json.loads(response.content)['has_more'])
+
+        with self.assertRaises(Http404):
+            view(self.create_superuser_request('/?alc_choices=unknown'))
+
+    def test_keyset_pagination(self):
+        class TestView(ListControlsIndexView):
+            list_controls_pagination = 'keyset'
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    SortSelector(value='name', ordering='name', is_default=True)('A-Z'),
+                    SortSelector(value='-name', ordering='-name')('Z-A'),
+                ]
+
+        class TestModelAdmin(ModelAdmin):
+            model = Product
+            index_view_class = TestView
+            list_per_page = 2
+
+        for name in ('a', 'b', 'c', 'd', 'e', 'xa'):
+            Product.objects.create(name=name)
+
+        view = TestModelAdmin().index_view
+        names = []
+        url = '/?name=a&sort=-name'
+        while url:
+            response = view(self.create_superuser_request(url))
+            names += [product.name for product in response.context_data['object_list']]
+            url = response.context_data['admin_list_controls']['keyset_pagination']['next_url']
+        self.assertEqual(names, ['xa', 'a'])
+
+        response = view(self.create_superuser_request('/'))
+        pagination = response.context_data['admin_list_controls']['keyset_pagination']
+        self.assertEqual(
+            [product.name for product in response.context_data['object_list']], ['a', 'b'],
+        )
+        self.assertIsNone(pagination['previous_url'])
+        response = view(self.create_superuser_request(pagination['next_url']))
+        self.assertEqual(
+            [product.name for product in response.context_data['object_list']], ['c', 'd'],
+        )
+        self.assertIn('class="prev"', response.rendered_content)
+
+    def test_count_strategies(self):
+        class TestView(ListControlsIndexView):
+            list_controls_count_strategy = 'capped'
+            list_controls_count_cap = 3
+
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name')]
+
+        for i in range(5):
+            Product.objects.create(name='product %s' % i)
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?name=product'))
+        self.assertEqual(str(response.context_data['result_count']), '3+')
+        self.assertIn('3+ out of 5', response.rendered_content)
+        response = view(self.create_superuser_request('/?name=product 1'))
+        self.assertEqual(str(response.context_data['result_count']), '1')
+
+        class DeferredTestView(TestView):
+            list_controls_count_strategy = 'deferred'
+
+        view = self.list_view_class_to_view_function(DeferredTestView)
+        response = view(self.create_superuser_request('/?name=product'))
+        self.assertIn(
+            'data-alc-deferred-count-url="?name=product&amp;alc_count=1"',
+            response.rendered_content,
+        )
+        response = view(self.create_superuser_request('/?name=product&alc_count=1'))
+        self.assertEqual(json.loads(response.content), {'count': 5, 'display': '5'})
+
+    def test_result_cache(self):
+        class TestView(ListControlsIndexView):
+            list_controls_result_cache_timeout = 60
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    BooleanFilter(name='is_featured', field='is_featured'),
+                ]
+
+        for i in range(3):
+            Product.objects.create(name='product %s' % i, is_featured=i > 0)
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?name=product&is_featured=true'))
+        names = [product.name for product in response.context_data['object_list']]
+        self.assertEqual(len(names), 2)
+
+        # Equivalent params share the cached page, which is fetched by primary key
+        # without being counted again
+        with CaptureQueriesContext(connection) as context:
+            response = view(self.create_superuser_request('/?is_featured=1&name=product&p=0'))
+        self.assertEqual([product.name for product in response.context_data['object_list']], names)
+        self.assertEqual(response.context_data['result_count'], 2)
+        filtered_counts = [
+            query for query in context.captured_queries
+            if 'COUNT' in query['sql'] and 'LIKE' in query['sql']
+        ]
+        self.assertEqual(filtered_counts, [])
+
+        # Saving an instance invalidates the cache
+        Product.objects.create(name='product 3', is_featured=True)
+        response = view(self.create_superuser_request('/?name=product&is_featured=true'))
+        self.assertEqual(response.context_data['result_count'], 3)
+        self.assertEqual(len(response.context_data['object_list']), 3)
+
+    def test_canonical_redirect(self):
+        class TestView(ListControlsIndexView):
+            list_controls_canonical_redirect = True
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    ChoiceFilter(
+                        name='product_type',
+                        field='product_type',
+                        choices=Product.PRODUCT_TYPE_CHOICES,
+                        multiple=True,
+                    ),
+                    SortSelector(value='name', is_default=True)('Name'),
+                    SortSelector(value='-name')('Name (descending)'),
+                ]
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request(
+            '/?sort=name&product_type=%s&name=foo&q=&product_type=%s&p=0' % (
+                Product.PRODUCT_TYPE_CHOICES[1][0], Product.PRODUCT_TYPE_CHOICES[0][0],
+            ),
+        ))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/?name=foo&product_type=%s&product_type=%s' % tuple(
+            sorted([Product.PRODUCT_TYPE_CHOICES[0][0], Product.PRODUCT_TYPE_CHOICES[1][0]]),
+        ))
+
+        response = view(self.create_superuser_request(response['Location']))
+        self.assertEqual(response.status_code, 200)
+        response = view(self.create_superuser_request('/'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_canonical_redirect_keeps_empty_values_that_differ_from_the_default(self):
+        class TestView(ListControlsIndexView):
+            list_controls_canonical_redirect = True
+
+            def build_list_controls(self):
+                return [
+                    RadioFilter(
+                        name='product_type',
+                        field='product_type',
+                        choices=(('', 'Any'),) + Product.PRODUCT_TYPE_CHOICES,
+                        default_value=Product.CAKE,
+                    ),
+                ]
+
+        Product.objects.create(name='bread', product_type=Product.BREAD)
+        Product.objects.create(name='cake', product_type=Product.CAKE)
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?product_type='))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context_data['result_count'], 2)
+
+        response = view(self.create_superuser_request('/?product_type=%s' % Product.CAKE))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], '/')
+
+    def test_conditional_get(self):
+        class TestView(ListControlsIndexView):
+            list_controls_conditional_get = True
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    SortSelector(value='name', is_default=True)('Name'),
+                ]
+
+        Product.objects.create(name='product')
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?name=product'))
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertNotIn('Last-Modified', response)
+
+        # Equivalent URLs share the ETag
+        request = self.create_superuser_request('/?sort=name&name=product')
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        response = view(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+        request = self.create_superuser_request('/?name=other')
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        self.assertEqual(view(request).status_code, 200)
+
+        # Changes to the model change the ETag
+        Product.objects.create(name='product 2')
+        request = self.create_superuser_request('/?name=product')
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        response = view(request)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_conditional_get_is_not_shared_between_users(self):
+        class TestView(ListControlsIndexView):
+            list_controls_conditional_get = True
+
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name')]
+
+        other_user = User.objects.create_superuser(
+            username='other',
+            email='other@example.com',
+            password='test',
+        )
+        Product.objects.create(name='product')
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?name=product'))
+        response.render()
+        etag = response['ETag']
+
+        request = self.create_superuser_request('/?name=product')
+        request.META['HTTP_IF_NONE_MATCH'] = etag
+        self.assertEqual(view(request).status_code, 304)
+
+        for headers in (
+            {'HTTP_IF_NONE_MATCH': etag},
+            {'HTTP_IF_MODIFIED_SINCE': 'Fri, 01 Jan 2100 00:00:00 GMT'},
+        ):
+            request = self.factory.get('/?name=product', **headers)
+            request.user = other_user
+            response = view(request)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotEqual(response['ETag'], etag)
+
+    def test_layout_queryset_shaping(self):
+        class TestView(ListControlsIndexView):
+            def build_list_controls(self):
+                return [
+                    RadioFilter(
+                        name='product_type',
+                        field='product_type',
+                        choices=Product.PRODUCT_TYPE_CHOICES,
+                        facet_counts=True,
+                    ),
+                    LayoutSelector(value='list', is_default=True)('List'),
+                    LayoutSelector(
+                        value='grid',
+                        template='grid.html',
+                        only=('name',),
+                        annotations={'name_length': Length('name')},
+                    )('Grid'),
+                ]
+
+        Product.objects.create(name='product')
+        view = self.list_view_class_to_view_function(TestView)
+
+        response = view(self.create_superuser_request('/?layout=grid'))
+        product = response.context_data['object_list'][0]
+        self.assertEqual(product.name_length, 7)
+        self.assertEqual(product.get_deferred_fields(), {'items_available', 'product_type', 'is_featured'})
+
+        response = view(self.create_superuser_request('/'))
+        product = response.context_data['object_list'][0]
+        self.assertFalse(hasattr(product, 'name_length'))
+        self.assertEqual(product.get_deferred_fields(), set())
+
+    def test_phase_timings(self):
+        class TestView(ListControlsIndexView):
+            cache_list_controls = True
+            list_controls_server_timing = True
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    SortSelector(value='name', is_default=True)('Name'),
+                ]
+
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        list_controls_timed.connect(receiver)
+        self.addCleanup(list_controls_timed.disconnect, receiver)
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?sort=name&name=foo'))
+        response.render()
+
+        phases = ['build', 'handle_request', 'prepare', 'queryset', 'context', 'serialize', 'encode', 'render']
+        server_timing = response['Server-Timing'].split(', ')
+        self.assertEqual(
+            [metric.split(';')[0] for metric in server_timing],
+            ['alc-' + phase.replace('_', '-') for phase in phases],
+        )
+        self.assertEqual(len(received), 1)
+        self.assertEqual(list(received[0]['timings']), phases)
+        self.assertEqual(received[0]['state'], 'name=foo')
+        self.assertEqual(
+            received[0]['payload_bytes'],
+            len(response.context_data['admin_list_controls']['initial_state']),
+        )
+
+        # The tree is only built once per view class
+        response = view(self.create_superuser_request('/'))
+        response.render()
+        self.assertNotIn('alc-build', response['Server-Timing'])
+        self.assertNotIn('build', received[1]['timings'])
+
+    def test_phase_timings_do_not_overlap(self):
+        class TestView(ListControlsIndexView):
+            list_controls_server_timing = True
+
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name')]
+
+            def apply_list_controls_to_queryset(self, queryset):
+                # The modeladmin builds the queryset again while building its context
+                time.sleep(0.05)
+                return super().apply_list_controls_to_queryset(queryset)
+
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        list_controls_timed.connect(receiver)
+        self.addCleanup(list_controls_timed.disconnect, receiver)
+
+        view = self.list_view_class_to_view_function(TestView)
+        start = time.perf_counter()
+        response = view(self.create_superuser_request('/?name=foo'))
+        response.render()
+        elapsed = time.perf_counter() - start
+
+        timings = received[0]['timings']
+        self.assertGreaterEqual(timings['queryset'], 0.1)
+        self.assertLess(timings['context'], 0.05)
+        self.assertLessEqual(sum(timings.values()), elapsed)
+
+    def test_phase_timings_of_redirects_and_not_modified_responses(self):
+        class TestView(ListControlsIndexView):
+            list_controls_server_timing = True
+            list_controls_canonical_redirect = True
+            list_controls_conditional_get = True
+
+            def build_list_controls(self):
+                return [TextFilter(name='name', field='name')]
+
+        received = []
+
+        def receiver(sender, **kwargs):
+            received.append(kwargs)
+
+        list_controls_timed.connect(receiver)
+        self.addCleanup(list_controls_timed.disconnect, receiver)
+
+        view = self.list_view_class_to_view_function(TestView)
+        response = view(self.create_superuser_request('/?name=foo&name='))
+        self.assertEqual(response.status_code, 302)
+        self.assertIn('alc-handle-request;dur=', response['Server-Timing'])
+        self.assertEqual(len(received), 1)
+
+        response = view(self.create_superuser_request('/?name=foo'))
+        response.render()
+        request = self.create_superuser_request('/?name=foo')
+        request.META['HTTP_IF_NONE_MATCH'] = response['ETag']
+        response = view(request)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('alc-handle-request;dur=', response['Server-Timing'])
+        self.assertEqual(len(received), 3)
+
+    def test_payload_budget(self):
+        class TestView(ListControlsIndexView):
+            list_controls_payload_budget = 2000
+
+            def build_list_controls(self):
+                return [
+                    TextFilter(name='name', field='name'),
+                    ChoiceFilter(
+                        name='choice',
+                        choices=[(str(i), 'Choice %s' % i) for i in range(200)],
+                    ),
+                ]
+
+        view = self.list_view_class_to_view_function(TestView)
+        with self.assertLogs('admin_list_controls.views', level='WARNING') as logs:
+            response = view(self.create_superuser_request('/'))
+        self.assertIn('over the budget of 2000 bytes', logs.output[0])
+        self.assertIn('ChoiceFilter-2 "choice"', logs.output[0])
+
+        context = response.context_data['admin_list_controls']
+        payload_size = context['payload_size']
+        self.assertEqual(context['payload_bytes'], len(context['initial_state']))
+        self.assertEqual(payload_size.total_bytes, len(context['initial_state']))
+        self.assertEqual(payload_size.get_largest(1)[0].label, 'choice')
+        self.assertGreater(payload_size.categories['choices'], 2000)
+
+        TestView.list_controls_payload_budget_action = 'warn'
+        with self.assertWarns(PayloadBudgetWarning):
+            view(self.create_superuser_request('/'))
+        TestView.list_controls_payload_budget_action = 'raise'
+        with self.assertRaises(PayloadBudgetExceeded):
+            view(self.create_superuser_request('/'))
+
+        # Payloads within the budget are not measured
+        TestView.list_controls_payload_budget = 100000
+        response = view(self.create_superuser_request('/'))
+        self.assertIsNone(response.context_data['admin_list_controls']['payload_size'])
+        TestView.list_controls_payload_breakdown = True
+        response = view(self.create_superuser_request('/'))
+        self.assertIsNotNone(response.context_data['admin_list_controls']['payload_size'])
+
     def create_superuser_request(self, url):
         request = self.factory.get(url)
         request.user = self.superuser
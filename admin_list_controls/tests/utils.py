@@ -1,7 +1,103 @@
+import json
+import os
+import re
+
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 
 class BaseTestCase(TestCase):
     def assertObjectSerializesTo(self, obj, subset):
         serialized = obj.serialize()
-        self.assertDictContainsSubset(subset, serialized)
\ No newline at end of file
+        self.assertDictContainsSubset(subset, serialized)
+
+
+def normalize_sql(sql):
+    """
+    Reduces a query to its shape, by replacing its literal values with placeholders
+    """
+    sql = re.sub(r"'(?:[^']|'')*'", '?', sql)
+    sql = re.sub(r'\b\d+(?:\.\d+)?\b', '?', sql)
+    sql = re.sub(r'IN \((?:\?, )*\?\)', 'IN (...)', sql)
+    return ' '.join(sql.split())
+
+
+class QueryBudgetMixin:
+    """
+    Compares the queries run by named scenarios to the budgets recorded in the JSON file
+    at `query_budget_path`. A scenario fails if it runs more queries, joins or subqueries
+    than its budget. The recorded SQL is included in the failure, so that the change in
+    shape can be seen.
+
+    Only the queries that touch the tables in `query_budget_tables` are measured, so that
+    the budgets are unaffected by the queries of Wagtail's admin (sessions, permissions,
+    the user's profile, etc), which vary between versions.
+
+    Run the tests with the `UPDATE_QUERY_BUDGETS` environment variable set to record the
+    current queries as the budgets
+    """
+    query_budget_path = None
+    query_budget_tables = ()
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.update_query_budgets = bool(os.environ.get('UPDATE_QUERY_BUDGETS'))
+        cls.query_budgets = {}
+        if os.path.exists(cls.query_budget_path):
+            with open(cls.query_budget_path) as f:
+                cls.query_budgets = json.load(f)
+
+    @classmethod
+    def tearDownClass(cls):
+        if cls.update_query_budgets:
+            with open(cls.query_budget_path, 'w') as f:
+                json.dump(cls.query_budgets, f, indent=2, sort_keys=True)
+                f.write('\n')
+        super().tearDownClass()
+
+    @staticmethod
+    def measure_queries(queries):
+        sql = [normalize_sql(query['sql']) for query in queries]
+        return {
+            'queries': len(sql),
+            'joins': sum(statement.count(' JOIN ') for statement in sql),
+            'subqueries': sum(statement.count('(SELECT ') for statement in sql),
+            'sql': sql,
+        }
+
+    def get_budgeted_queries(self, queries):
+        tables = [connection.ops.quote_name(table) for table in self.query_budget_tables]
+        return [
+            query for query in queries
+            if any(table in query['sql'] for table in tables)
+        ]
+
+    def assertWithinQueryBudget(self, name, func):
+        with CaptureQueriesContext(connection) as context:
+            func()
+        measurement = self.measure_queries(self.get_budgeted_queries(context.captured_queries))
+
+        if self.update_query_budgets:
+            self.query_budgets[name] = measurement
+            return
+
+        budget = self.query_budgets.get(name)
+        if budget is None:
+            self.fail(
+                'No query budget has been recorded for "%s". Run the tests with '
+                'UPDATE_QUERY_BUDGETS=1 to record it' % name
+            )
+        exceeded = [
+            '%s: %s > %s' % (key, measurement[key], budget[key])
+            for key in ('queries', 'joins', 'subqueries')
+            if measurement[key] > budget[key]
+        ]
+        if exceeded:
+            self.fail('"%s" exceeded its query budget (%s)\n\nBudget:\n%s\n\nActual:\n%s' % (
+                name,
+                ', '.join(exceeded),
+                '\n'.join(budget['sql']),
+                '\n'.join(measurement['sql']),
+            ))
@@ -0,0 +1,54 @@
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """
+    Accumulates the time spent in each phase of a request. Phases that are entered
+    more than once are summed, and the time spent in a phase that is entered within
+    another is only counted towards the inner one, so that the phases never overlap
+    """
+
+    def __init__(self):
+        # Seconds, in the order that the phases were first entered
+        self.durations = {}
+        self._started = {}
+        # The time spent in nested phases, for each of the phases that are running
+        self._nested = []
+
+    @contextmanager
+    def phase(self, name):
+        self.durations.setdefault(name, 0)
+        start = time.perf_counter()
+        self._nested.append(0)
+        try:
+            yield
+        finally:
+            nested = self._nested.pop()
+            seconds = time.perf_counter() - start
+            if self._nested:
+                self._nested[-1] += seconds
+            self.add(name, seconds - nested)
+
+    def start(self, name):
+        """
+        Starts a phase that ends in a different scope, such as rendering a response
+        """
+        self._started[name] = time.perf_counter()
+
+    def stop(self, name):
+        start = self._started.pop(name, None)
+        if start is not None:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        self.durations[name] = self.durations.get(name, 0) + seconds
+
+    def get_server_timing(self, prefix='alc-'):
+        """
+        Returns the durations as the value of a `Server-Timing` header, in milliseconds
+        """
+        return ', '.join(
+            '%s%s;dur=%.2f' % (prefix, name.replace('_', '-'), seconds * 1000)
+            for name, seconds in self.durations.items()
+        )
@@ -0,0 +1,200 @@
+import copy
+from collections.abc import Iterable
+
+from .components import serialize_component
+from .encoders import JSONFragment
+from .payloads import PayloadCompactor
+
+# Components defining any of these methods hold values that change between requests
+REQUEST_HOOKS = (
+    'handle_request',
+    'prepare_children',
+    'derive_from_components',
+    'derive_from_index',
+    'apply_to_queryset',
+)
+
+
+def has_request_hooks(component):
+    for hook in REQUEST_HOOKS:
+        if hasattr(component, hook):
+            return True
+    return False
+
+
+class CompiledListControls:
+    """
+    An immutable spec of a list controls tree. It may be shared between requests (and
+    threads) by views that cache their tree, so it must never be mutated once compiled. Per-request
+    values are held by the `ListControlsState` objects returned from `bind`
+    """
+
+    def __init__(self, list_controls):
+        self.list_controls = list_controls
+        # Ids are derived from each component's position, so that serialized trees
+        # are identical between processes
+        for position, component in enumerate(list_controls.iter_tree()):
+            component.component_id = '%s-%s' % (type(component).__name__, position)
+            # Allow components to precompute anything that doesn't depend on the request
+            if hasattr(component, 'compile'):
+                component.compile()
+        self.static_component_ids = self._find_static_subtrees(list_controls)
+        self.static_fragments = []
+        self._serialize_static_subtrees()
+        self._payload_compactor = None
+
+    def _find_static_subtrees(self, list_controls):
+        """
+        Returns the ids of the components that neither hold request-dependent values nor
+        contain any that do. These can be shared between requests as-is
+        """
+        static_component_ids = set()
+        # Walking the pre-order backwards visits every descendant before its ancestors
+        for component in reversed(list_controls.flatten_tree()):
+            if has_request_hooks(component):
+                continue
+            for child in iter_children(component):
+                if id(child) not in static_component_ids:
+                    break
+            else:
+                static_component_ids.add(id(component))
+        return static_component_ids
+
+    def _serialize_static_subtrees(self):
+        """
+        Precomputes the serialized representation of every static subtree, so that
+        serializing a request only needs to visit the components that hold its values
+        """
+        root = self.list_controls
+        if self.is_static(root):
+            root._serialized = JSONFragment(root.serialize())
+            self.static_fragments.append(root._serialized)
+            return
+        for component in root.iter_tree():
+            if self.is_static(component):
+                continue
+            for child in iter_children(component):
+                if self.is_static(child):
+                    child._serialized = JSONFragment(child.serialize())
+                    self.static_fragments.append(child._serialized)
+
+    def get_payload_compactor(self):
+        """
+        Returns a compactor whose tables already contain the actions and styles of
+        the static subtrees, so that their compacted forms are only computed once
+        """
+        if self._payload_compactor is None:
+            compactor = PayloadCompactor()
+            for fragment in self.static_fragments:
+                compactor.compact_fragment(fragment)
+            self._payload_compactor = compactor
+        return self._payload_compactor.copy()
+
+    def is_static(self, component):
+        return id(component) in self.static_component_ids
+
+    def bind(self):
+        return ListControlsState(self)
+
+
+class ListControlsState:
+    """
+    The per-request overlay of a compiled tree. Components that hold request-dependent
+    values are shallow-copied, so that anything assigned to them during the request
+    (`cleaned_value`, `is_selected`, `summary`, prepared children, etc) never reaches
+    the compiled tree. Static subtrees are shared rather than copied
+    """
+
+    def __init__(self, compiled):
+        self.compiled = compiled
+        self.list_controls = self.overlay(compiled.list_controls)
+        self._index = None
+
+    @property
+    def index(self):
+        if self._index is None:
+            self._index = ListControlsIndex(self.list_controls)
+        return self._index
+
+    def serialize(self):
+        return serialize_component(self.list_controls)
+
+    def serialize_compact(self):
+        """
+        Returns a payload where actions and styles are replaced by references to
+        lookup tables, which the front-end resolves
+        """
+        return self.compiled.get_payload_compactor().get_payload(self.serialize())
+
+    def invalidate_index(self):
+        """
+        Should be called whenever the shape of the tree changes
+        """
+        self._index = None
+
+    def overlay(self, component):
+        if self.compiled.is_static(component):
+            return component
+        overlaid = copy.copy(component)
+        if component.children:
+            overlaid.children = [
+                [self.overlay(nested_child) for nested_child in child]
+                if isinstance(child, Iterable) else self.overlay(child)
+                for child in component.children
+            ]
+        return overlaid
+
+
+class ListControlsIndex:
+    """
+    Lookups against a tree, built from a single flattening of it. A list of already
+    flattened `components` can be indexed instead
+    """
+
+    def __init__(self, list_controls, components=None):
+        if components is None:
+            components = list_controls.flatten_tree()
+        self.components = components
+        self.by_name = {}
+        self.by_object_type = {}
+        self.by_capability = {hook: [] for hook in REQUEST_HOOKS}
+        # The controls that can appear in a summary
+        self.summarized = []
+        self._by_class = {}
+
+        for component in self.components:
+            name = getattr(component, 'name', None)
+            if name:
+                self.by_name.setdefault(name, []).append(component)
+            self.by_object_type.setdefault(component.object_type, []).append(component)
+            for hook, components in self.by_capability.items():
+                if hasattr(component, hook):
+                    components.append(component)
+            if hasattr(component, 'serialize_summary'):
+                self.summarized.append(component)
+
+    def get_by_name(self, name):
+        return self.by_name.get(name, [])
+
+    def get_by_object_type(self, object_type):
+        return self.by_object_type.get(object_type, [])
+
+    def get_by_class(self, cls):
+        if cls not in self._by_class:
+            self._by_class[cls] = [
+                component for component in self.components
+                if isinstance(component, cls)
+            ]
+        return self._by_class[cls]
+
+    def get_by_capability(self, hook):
+        return self.by_capability[hook]
+
+
+def iter_children(component):
+    if component.children:
+        for child in component.children:
+            if isinstance(child, Iterable):
+                yield from child
+            else:
+                yield child
@@ -1,13 +1,40 @@
+import logging
 import os
-import json
+import warnings
 from collections.abc import Iterable
 
 from django.conf import settings
+from django.core.cache import caches
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import EmptyResultSet, PermissionDenied
+from django.http import Http404, HttpResponseRedirect, JsonResponse
+from django.utils.cache import get_conditional_response
+from django.utils.decorators import method_decorator
+from django.utils.translation import get_language
 from django.utils.safestring import mark_safe
 from .components import ListControls
+from .canonical import CanonicalState, get_canonical_control_params
+from .counts import (
+    CAPPED, COUNT_STRATEGIES, COUNT_VAR, DEFERRED, EXACT, ResultCount, with_count_strategy,
+    with_known_count,
+)
+from .encoders import get_encoder
+from .exceptions import ConfigurationError, PayloadBudgetExceeded, PayloadBudgetWarning
+from .filters import REMOTE_CHOICES_PAGE_VAR, REMOTE_CHOICES_TERM_VAR, REMOTE_CHOICES_VAR
+from .pagination import CURSOR_VAR, KeysetPaginator
+from .payloads import PayloadSize
+from .cache import get_model_version, make_key
+from .queries import count_facets, get_filter_queries
 from .selectors import LayoutSelector
+from .signals import list_controls_timed
+from .timing import PhaseTimer
+from .tree import CompiledListControls
 from .vendor import webpack_manifest
 
+logger = logging.getLogger(__name__)
+
+PAYLOAD_BUDGET_ACTIONS = ('log', 'warn', 'raise')
+
 try:
     from wagtail.contrib.modeladmin.views import IndexView
 except ImportError:
@@ -20,9 +47,84 @@ class ListControlsIndexViewMixin:
     Adds filtering, sorting and other controls to a modeladmin's list/index view
     """
 
-    _built_list_controls = None
+    # Compiles the tree returned by `build_list_controls` once per view class, modeladmin
+    # and language (see `get_list_controls_cache_key`), and shares it between requests.
+    # Only enable this if `build_list_controls` doesn't depend on the request (the user's
+    # permissions, choices queried from the database, etc), or add what it depends on to
+    # the cache key. Otherwise, the tree is built for every request
+    cache_list_controls = False
+
+    # The backend used to encode the initial state: `json`, `orjson`, `ujson` or `auto`
+    list_controls_json_encoder = 'json'
+
+    # Deduplicates the actions and styles in the initial state
+    compact_list_controls_payload = False
+
+    # The number of seconds that facet counts are cached for. Entries are also
+    # invalidated when an instance of the model is saved or deleted
+    list_controls_facet_cache_timeout = 60
+    list_controls_cache_alias = 'default'
+
+    # `offset` uses the modeladmin's numbered pages, while `keyset` seeks past the last
+    # result of the previous page, so that deep pages are as fast to fetch as the first
+    list_controls_pagination = 'offset'
+
+    # How the filtered results are counted: `exact`, `capped` (counts up to
+    # `list_controls_count_cap` results, displaying eg: "10,000+") or `deferred`
+    # (the count is fetched once the page has loaded)
+    list_controls_count_strategy = EXACT
+    list_controls_count_cap = 10000
+
+    # The number of seconds that each page of results is cached for, keyed by the
+    # canonical state of the request. Only the primary keys of the results and their
+    # count are cached, and entries are invalidated whenever an instance of the model is
+    # saved or deleted. Disabled by default
+    list_controls_result_cache_timeout = None
+
+    # Redirects requests to the canonical URL of their state, so that URLs with the same
+    # meaning (reordered params, default values, etc) are only ever served from one URL
+    list_controls_canonical_redirect = False
+
+    # Adds an ETag header to index responses, derived from the canonical state, the user
+    # and the model's version, and responds to matching conditional requests with a 304.
+    # Last-Modified is not sent, as a date can't identify the user that the response was
+    # rendered for. Changes to other models are not tracked
+    list_controls_conditional_get = False
+
+    # Adds a `Server-Timing` header to index responses, with the time spent in each
+    # phase of the request. The timings are also sent with the `list_controls_timed`
+    # signal, regardless of this setting
+    list_controls_server_timing = False
+
+    # The size, in bytes, that the encoded initial state should stay under. Payloads over
+    # the budget are handled by `list_controls_payload_budget_action`: `log` logs a
+    # warning, `warn` issues a PayloadBudgetWarning and `raise` raises a
+    # PayloadBudgetExceeded exception. Each includes a breakdown of the payload
+    list_controls_payload_budget = None
+    list_controls_payload_budget_action = 'log'
+
+    # Measures the size of each component in the initial state on every request, and
+    # adds the breakdown to the context and the debug log
+    list_controls_payload_breakdown = False
+
+    # GET params that are handled before the index is rendered, and so never affect
+    # the results
+    NON_CANONICAL_PARAMS = (
+        COUNT_VAR,
+        REMOTE_CHOICES_VAR,
+        REMOTE_CHOICES_TERM_VAR,
+        REMOTE_CHOICES_PAGE_VAR,
+    )
+
+    _list_controls_state = None
+    _list_controls_canonical_state = None
+    _list_controls_result_cache_key = None
+    _list_controls_result_cache_entry = None
+    _list_controls_timer = None
+    _list_controls_payload_bytes = None
     _items_per_page = None
     _has_prepared_list_controls = False
+    _has_counted_list_controls_facets = False
 
     def build_list_controls(self):
         """
@@ -30,27 +132,235 @@ class ListControlsIndexViewMixin:
         """
         return ListControls()
 
+    def dispatch(self, request, *args, **kwargs):
+        # Filters with remote choices fetch them from the index view, in the same way
+        # that the modeladmin's spreadsheet exports are handled
+        if REMOTE_CHOICES_VAR in request.GET:
+            return self.get_remote_choices_response(request)
+        return super().dispatch(request, *args, **kwargs)
+
+    def get(self, request, *args, **kwargs):
+        # Deferred counts are fetched from the index view once the page has loaded. By
+        # this point, the modeladmin has checked permissions and built the queryset
+        if COUNT_VAR in request.GET:
+            return self.get_deferred_count_response()
+
+        if self.list_controls_canonical_redirect:
+            canonical_url = self.get_list_controls_canonical_url()
+            if canonical_url is not None:
+                response = HttpResponseRedirect(canonical_url)
+                self.finish_list_controls_timing(response)
+                return response
+
+        if not self.list_controls_conditional_get:
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_list_controls_etag()
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        else:
+            # Only rendered responses are timed once they have been rendered
+            self.finish_list_controls_timing(response)
+        response['ETag'] = etag
+        return response
+
+    def get_list_controls_canonical_url(self):
+        """
+        Returns the URL of the request's canonical state, or None if the request is
+        already using it
+        """
+        state = self.get_list_controls_canonical_state()
+        # Compared by value, so that URLs which only differ in their encoding are not
+        # redirected
+        params = [(name, list(values)) for name, values in state.params]
+        if list(self.request.GET.lists()) == params:
+            return None
+        query_string = state.urlencode()
+        if query_string:
+            return '%s?%s' % (self.request.path, query_string)
+        return self.request.path
+
+    def get_list_controls_etag(self):
+        """
+        Returns a weak ETag for the response. Responses are only byte-for-byte equal
+        after they have been rendered (the CSRF token is masked differently each time),
+        so the tag identifies the results and the user they were rendered for
+        """
+        try:
+            sql = str(self.queryset.query)
+        except EmptyResultSet:
+            sql = None
+        key = make_key(
+            'etag',
+            self.model._meta.label_lower,
+            get_model_version(self.model, self.list_controls_cache_alias),
+            self.get_list_controls_canonical_state().urlencode(),
+            sql,
+            self.request.user.pk,
+            get_language(),
+            str(self.get_list_controls_widget_js()),
+        )
+        return 'W/"%s"' % key.rsplit(':', 1)[-1]
+
+    def get_deferred_count_response(self):
+        count = with_count_strategy(self.queryset, EXACT).count()
+        return JsonResponse({
+            'count': count,
+            'display': ResultCount(count).get_display_value(),
+        })
+
+    @method_decorator(login_required)
+    def get_remote_choices_response(self, request):
+        if not self.permission_helper.user_can_list(request.user):
+            raise PermissionDenied
+
+        name = request.GET[REMOTE_CHOICES_VAR]
+        for obj in self.get_list_controls_index().get_by_name(name):
+            if getattr(obj, 'remote_choices', False):
+                break
+        else:
+            raise Http404('No filter named "%s" uses remote choices' % name)
+
+        term = request.GET.get(REMOTE_CHOICES_TERM_VAR, '').strip()
+        try:
+            page = max(int(request.GET.get(REMOTE_CHOICES_PAGE_VAR, 0)), 0)
+        except ValueError:
+            page = 0
+        return JsonResponse(obj.get_remote_choices(term, page))
+
     def apply_list_controls_to_queryset(self, queryset):
         """
-        A hook provided to modify the queryset
+        A hook provided to modify the queryset. Declarative filters are combined into
+        a single query and applied first, followed by every other control. Filters that
+        span multi-valued relations are applied in their own `filter` calls
         """
-        for obj in self.get_list_controls().flatten_tree():
-            if hasattr(obj, 'apply_to_queryset'):
-                queryset = obj.apply_to_queryset(queryset)
+        queries = []
+        controls = []
+        facet_filters = []
+        for obj in self.get_list_controls_index().get_by_capability('apply_to_queryset'):
+            if getattr(obj, 'is_declarative', False):
+                query = obj.get_query()
+                if query is not None:
+                    queries.append((obj, query))
+                if obj.facet_counts:
+                    facet_filters.append(obj)
+            else:
+                controls.append(obj)
+
+        if facet_filters and self.should_count_list_controls_facets():
+            self._has_counted_list_controls_facets = True
+            facet_queryset = queryset
+            for obj in controls:
+                facet_queryset = obj.apply_to_queryset(facet_queryset)
+            facet_counts = self.get_list_controls_facet_counts(
+                facet_queryset, facet_filters, queries,
+            )
+            for obj, counts in zip(facet_filters, facet_counts):
+                obj.set_counts(counts)
+
+        for query in get_filter_queries(queryset.model, queries):
+            queryset = queryset.filter(query)
+        for obj in controls:
+            queryset = obj.apply_to_queryset(queryset)
+
+        # The selected layout's shaping only affects how the results are fetched, so it
+        # is not applied to the facet counts
+        selected_layout = self.get_selected_list_control_layout()
+        if selected_layout:
+            queryset = selected_layout.shape_queryset(queryset)
         return queryset
 
+    def should_count_list_controls_facets(self):
+        """
+        Facets are counted once per request, as the modeladmin builds its queryset more
+        than once, and never for the responses that don't render them
+        """
+        if self._has_counted_list_controls_facets:
+            return False
+        return COUNT_VAR not in self.request.GET and REMOTE_CHOICES_VAR not in self.request.GET
+
+    def get_list_controls_facet_counts(self, queryset, facet_filters, queries):
+        """
+        Returns the counts for each facet filter, which are cached for each distinct
+        combination of the queryset and the filters' values
+        """
+        timeout = self.list_controls_facet_cache_timeout
+        if not timeout:
+            return count_facets(queryset, facet_filters, queries)
+
+        try:
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return count_facets(queryset, facet_filters, queries)
+
+        cache = caches[self.list_controls_cache_alias]
+        key = make_key(
+            'facet_counts',
+            queryset.model._meta.label_lower,
+            get_model_version(queryset.model, self.list_controls_cache_alias),
+            sql,
+            [(obj.name, [value for value, _ in obj.get_facet_queries()]) for obj in facet_filters],
+            [(obj.name, repr(query)) for obj, query in queries],
+        )
+        facet_counts = cache.get(key)
+        if facet_counts is None:
+            facet_counts = count_facets(queryset, facet_filters, queries)
+            cache.set(key, facet_counts, timeout)
+        return facet_counts
+
     def get_list_controls(self):
-        if not self._built_list_controls:
+        return self.get_list_controls_state().list_controls
+
+    def get_list_controls_state(self):
+        if not self._list_controls_state:
+            self._list_controls_state = self.get_compiled_list_controls().bind()
+        return self._list_controls_state
+
+    def get_list_controls_index(self):
+        return self.get_list_controls_state().index
+
+    def get_list_controls_cache_key(self):
+        """
+        Returns the key that compiled trees are shared under. Trees hold translated labels
+        and pre-encoded JSON, and may be built from the model's metadata, so they are
+        compiled separately for each modeladmin, model and language
+        """
+        model_admin = getattr(self, 'model_admin', None)
+        return (
+            type(model_admin),
+            getattr(self, 'model', None),
+            get_language(),
+        )
+
+    def get_compiled_list_controls(self):
+        view_class = type(self)
+        key = None
+        if self.cache_list_controls:
+            key = self.get_list_controls_cache_key()
+            # Read from the class's own namespace, so that subclasses compile their own trees
+            compiled_trees = view_class.__dict__.get('_compiled_list_controls')
+            if compiled_trees is None:
+                compiled_trees = {}
+                view_class._compiled_list_controls = compiled_trees
+            compiled = compiled_trees.get(key)
+            if compiled:
+                return compiled
+
+        with self.get_list_controls_timer().phase('build'):
             list_controls = self.build_list_controls()
             # Allow the controls to be defined in a list
             if isinstance(list_controls, Iterable):
                 list_controls = ListControls()(*list_controls)
-            self._built_list_controls = list_controls
-        return self._built_list_controls
+            compiled = CompiledListControls(list_controls)
+
+        if self.cache_list_controls:
+            compiled_trees[key] = compiled
+        return compiled
 
     def get_selected_list_control_layout(self):
-        for obj in self.get_list_controls().flatten_tree():
-            if isinstance(obj, LayoutSelector) and obj.is_selected:
+        for obj in self.get_list_controls_index().get_by_class(LayoutSelector):
+            if obj.is_selected:
                 return obj
 
     def get_template_names(self):
@@ -63,9 +373,11 @@ class ListControlsIndexViewMixin:
         """
         params = super().get_filters_params(params)
 
-        for obj in self.get_list_controls().flatten_tree():
-            name = getattr(obj, 'name', None)
-            if name and name in params:
+        for name in self.get_list_controls_index().by_name:
+            if name in params:
+                del params[name]
+        for name in (CURSOR_VAR, COUNT_VAR):
+            if name in params:
                 del params[name]
         return params
 
@@ -73,9 +385,170 @@ class ListControlsIndexViewMixin:
         queryset = super().get_search_results(*args, **kwargs)
 
         self.prepare_list_controls()
-        return self.apply_list_controls_to_queryset(queryset)
+        with self.get_list_controls_timer().phase('queryset'):
+            queryset = self.apply_list_controls_to_queryset(queryset)
+            queryset = self.apply_list_controls_count_strategy(queryset)
+            return self.apply_list_controls_result_cache(queryset)
+
+    def get_list_controls_canonical_state(self):
+        """
+        Returns the canonical state of the request's GET params, where the params of the
+        controls are normalized to their cleaned values, and defaults are omitted
+        """
+        if self._list_controls_canonical_state is None:
+            self.prepare_list_controls()
+            index = self.get_list_controls_index()
+
+            params = get_canonical_control_params(index)
+            for name, values in self.request.GET.lists():
+                if name in index.by_name or name in self.NON_CANONICAL_PARAMS:
+                    continue
+                values = [value for value in values if value != '']
+                if name == self.PAGE_VAR and values == ['0']:
+                    continue
+                params[name] = values
+            self._list_controls_canonical_state = CanonicalState(params)
+        return self._list_controls_canonical_state
+
+    def apply_list_controls_result_cache(self, queryset):
+        """
+        If the request's page of results has been cached, the cached count is used
+        rather than counting the results again
+        """
+        if not self.list_controls_result_cache_timeout:
+            return queryset
+
+        if self._list_controls_result_cache_key is None:
+            self._list_controls_result_cache_key = self.get_list_controls_result_cache_key(
+                queryset,
+            )
+            if self._list_controls_result_cache_key:
+                cache = caches[self.list_controls_cache_alias]
+                self._list_controls_result_cache_entry = cache.get(
+                    self._list_controls_result_cache_key,
+                )
+
+        entry = self._list_controls_result_cache_entry
+        if entry is not None:
+            return with_known_count(queryset, entry['count'])
+        return queryset
+
+    def get_list_controls_result_cache_key(self, queryset):
+        try:
+            # Querysets can vary by more than their params (eg: the user's permissions),
+            # so the query is also part of the key
+            sql = str(queryset.query)
+        except EmptyResultSet:
+            return ''
+        return make_key(
+            'results',
+            queryset.model._meta.label_lower,
+            get_model_version(queryset.model, self.list_controls_cache_alias),
+            self.get_list_controls_canonical_state().urlencode(),
+            sql,
+        )
+
+    def cache_list_controls_results(self, context_data):
+        """
+        Replaces the page of results with the cached results, or caches them. Keyset
+        pages are already cheap to fetch, so only their count is cached
+        """
+        key = self._list_controls_result_cache_key
+        page = context_data.get('page_obj')
+        if not key or page is None:
+            return
+
+        entry = self._list_controls_result_cache_entry
+        cache_page = self.list_controls_pagination != 'keyset'
+        if entry is None:
+            pks = None
+            if cache_page:
+                page.object_list = list(page.object_list)
+                pks = [obj.pk for obj in page.object_list]
+            caches[self.list_controls_cache_alias].set(key, {
+                'count': context_data['result_count'],
+                'pks': pks,
+            }, self.list_controls_result_cache_timeout)
+        elif cache_page and entry['pks'] is not None:
+            objects = {obj.pk: obj for obj in self.queryset.filter(pk__in=entry['pks'])}
+            page.object_list = [objects[pk] for pk in entry['pks'] if pk in objects]
+        context_data['object_list'] = page.object_list
+
+    def apply_list_controls_count_strategy(self, queryset):
+        """
+        Limits the number of results that the modeladmin counts for its result count and
+        paginator, according to the count strategy
+        """
+        count_strategy = self.list_controls_count_strategy
+        if count_strategy not in COUNT_STRATEGIES:
+            raise ConfigurationError('Unknown count strategy "%s"' % count_strategy)
+        if count_strategy == CAPPED:
+            # Counting one more than the cap indicates if it has been exceeded
+            return with_count_strategy(queryset, CAPPED, self.list_controls_count_cap + 1)
+        if count_strategy == DEFERRED:
+            # Only enough results are counted to paginate the current and next pages
+            limit = (self.page_num + 1) * self.items_per_page + 1
+            return with_count_strategy(queryset, DEFERRED, limit)
+        return queryset
 
     def get_context_data(self, **kwargs):
+        timer = self.get_list_controls_timer()
+        with timer.phase('context'):
+            context_data = self.get_list_controls_context_data(**kwargs)
+
+        with timer.phase('serialize'):
+            initial_state = self.get_list_controls_initial_state()
+        encoder = self.get_list_controls_json_encoder()
+        with timer.phase('encode'):
+            encoded_initial_state = encoder.encode(initial_state)
+        self._list_controls_payload_bytes = len(encoded_initial_state)
+
+        budget = self.list_controls_payload_budget
+        is_over_budget = budget is not None and self._list_controls_payload_bytes > budget
+        payload_size = None
+        if self.list_controls_payload_breakdown or is_over_budget:
+            payload_size = PayloadSize(initial_state, encoder)
+            logger.debug(
+                'List controls payload of %s: %s', type(self).__name__, payload_size.format(),
+            )
+        if is_over_budget:
+            self.handle_list_controls_payload_over_budget(payload_size)
+
+        context_data['admin_list_controls'].update({
+            # Consumed by the front-end code to build the UI
+            'initial_state': encoded_initial_state,
+            'payload_bytes': self._list_controls_payload_bytes,
+            'payload_size': payload_size,
+        })
+        return context_data
+
+    def handle_list_controls_payload_over_budget(self, payload_size):
+        action = self.list_controls_payload_budget_action
+        if action not in PAYLOAD_BUDGET_ACTIONS:
+            raise ConfigurationError(
+                '`list_controls_payload_budget_action` must be one of %s, not "%s"' % (
+                    ', '.join(PAYLOAD_BUDGET_ACTIONS), action,
+                )
+            )
+
+        message = 'The list controls of %s encode to %s bytes, over the budget of %s bytes. %s' % (
+            type(self).__name__,
+            self._list_controls_payload_bytes,
+            self.list_controls_payload_budget,
+            payload_size.format(),
+        )
+        if action == 'raise':
+            raise PayloadBudgetExceeded(message)
+        if action == 'warn':
+            warnings.warn(message, PayloadBudgetWarning)
+        else:
+            logger.warning(message)
+
+    def get_list_controls_context_data(self, **kwargs):
+        """
+        Returns the modeladmin's context with the results, pagination and count replaced
+        as configured, along with the list controls' context (except the initial state)
+        """
         context_data = super().get_context_data(**kwargs)
 
         selected_layout = self.get_selected_list_control_layout()
@@ -84,18 +557,115 @@ class ListControlsIndexViewMixin:
         else:
             selected_layout_template = None
 
+        if self.list_controls_result_cache_timeout:
+            self.cache_list_controls_results(context_data)
+
+        keyset_pagination = None
+        if self.list_controls_pagination == 'keyset':
+            keyset_pagination = self.paginate_list_controls_keyset(context_data)
+
+        if self.list_controls_count_strategy != EXACT and 'result_count' in context_data:
+            context_data['result_count'] = self.get_list_controls_result_count(
+                context_data['result_count'],
+            )
+
         context_data['admin_list_controls'] = {
             'index_template': self.get_list_controls_index_template(),
-            # Consumed by the front-end code to build the UI
-            'initial_state': json.dumps({
-                'admin_list_controls': self.get_list_controls().serialize(),
-            }),
+            'keyset_pagination': keyset_pagination,
+            'initial_state': None,
+            'payload_bytes': None,
+            'payload_size': None,
             'selected_layout_template': selected_layout_template,
             'widget_js': self.get_list_controls_widget_js(),
         }
 
         return context_data
 
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        # Template responses are rendered after the view has returned
+        self.get_list_controls_timer().start('render')
+        response.add_post_render_callback(self.finish_list_controls_timing)
+        return response
+
+    def finish_list_controls_timing(self, response):
+        timer = self.get_list_controls_timer()
+        timer.stop('render')
+        if self.list_controls_server_timing:
+            server_timing = timer.get_server_timing()
+            if response.has_header('Server-Timing'):
+                server_timing = '%s, %s' % (response['Server-Timing'], server_timing)
+            response['Server-Timing'] = server_timing
+        self.report_list_controls_timings(dict(timer.durations))
+
+    def report_list_controls_timings(self, timings):
+        """
+        A hook provided to record the time spent in each phase of the request, which sends
+        the `list_controls_timed` signal by default
+        """
+        list_controls_timed.send(
+            sender=type(self),
+            view=self,
+            request=self.request,
+            timings=timings,
+            state=self.get_list_controls_canonical_state().urlencode(),
+            payload_bytes=self._list_controls_payload_bytes,
+        )
+
+    def get_list_controls_timer(self):
+        if self._list_controls_timer is None:
+            self._list_controls_timer = PhaseTimer()
+        return self._list_controls_timer
+
+    def get_list_controls_result_count(self, count):
+        if self.list_controls_count_strategy == CAPPED:
+            cap = self.list_controls_count_cap
+            return ResultCount(min(count, cap), is_capped=count > cap)
+
+        params = self.request.GET.copy()
+        params[COUNT_VAR] = '1'
+        return ResultCount(count, is_deferred=True, url='?' + params.urlencode())
+
+    def paginate_list_controls_keyset(self, context_data):
+        """
+        Replaces the modeladmin's page of results with a keyset page. Querysets that are
+        not ordered by field names continue to use numbered pages
+        """
+        queryset = self.queryset
+        if KeysetPaginator.get_ordering(queryset) is None:
+            return None
+
+        paginator = KeysetPaginator(queryset, self.items_per_page)
+        page = paginator.page(self.request.GET.get(CURSOR_VAR))
+        context_data['page_obj'] = page
+        context_data['object_list'] = page.object_list
+        return {
+            'page': page,
+            'next_url': self.get_keyset_page_url(page.next_cursor),
+            'previous_url': self.get_keyset_page_url(page.previous_cursor),
+        }
+
+    def get_keyset_page_url(self, cursor):
+        if cursor is None:
+            return None
+        # Unlike the modeladmin's `params`, the request's QueryDict retains every value
+        # of the multiple choice filters
+        params = self.request.GET.copy()
+        params.pop(self.PAGE_VAR, None)
+        params[CURSOR_VAR] = cursor
+        return '?' + params.urlencode()
+
+    def get_list_controls_initial_state(self):
+        state = self.get_list_controls_state()
+        if self.compact_list_controls_payload:
+            return state.serialize_compact()
+        return {
+            'admin_list_controls': state.serialize(),
+        }
+
+    def get_list_controls_json_encoder(self):
+        return get_encoder(self.list_controls_json_encoder)
+
     def get_list_controls_index_template(self):
         return 'modeladmin/index.html'
 
@@ -120,48 +690,55 @@ class ListControlsIndexViewMixin:
             return
         self._has_prepared_list_controls = True
 
-        list_controls = self.get_list_controls()
+        index = self.get_list_controls_index()
+        timer = self.get_list_controls_timer()
 
-        controls_by_name = {}
-        for obj in list_controls.flatten_tree():
-            # Allow objects
-            if hasattr(obj, 'handle_request'):
+        with timer.phase('handle_request'):
+            for obj in index.get_by_capability('handle_request'):
                 obj.handle_request(self.request)
-            name = getattr(obj, 'name', None)
-            if name:
-                if name not in controls_by_name:
-                    controls_by_name[name] = []
-                controls_by_name[name].append(obj)
-
-        # If no selectors have been selected for a particular param,
-        # indicate the default selectors should be used
-        for name, controls in controls_by_name.items():
-            selector_controls = [
-                control for control in controls
-                if control.object_type == 'selector'
-            ]
-            has_selected = False
-            for control in selector_controls:
-                if control.object_type == 'selector' and control.is_selected:
-                    has_selected = True
-                    break
-            if not has_selected:
+
+        with timer.phase('prepare'):
+            # If no selectors have been selected for a particular param,
+            # indicate the default selectors should be used
+            for name, controls in index.by_name.items():
+                selector_controls = [
+                    control for control in controls
+                    if control.object_type == 'selector'
+                ]
+                has_selected = False
                 for control in selector_controls:
-                    if control.is_default:
-                        control.is_selected = True
+                    if control.is_selected:
+                        has_selected = True
                         break
+                if not has_selected:
+                    for control in selector_controls:
+                        if control.is_default:
+                            control.is_selected = True
+                            break
 
-        # Some objects wrap their children in other components
-        for obj in list_controls.flatten_tree():
-            if hasattr(obj, 'prepare_children'):
+            # Some objects wrap their children in other components. The index only needs to
+            # be rebuilt if one of them has changed the shape of the tree
+            tree_has_changed = False
+            for obj in index.get_by_capability('prepare_children'):
+                children = list(obj.children or [])
                 obj.prepare_children()
+                if list(obj.children or []) != children:
+                    tree_has_changed = True
+            if tree_has_changed:
+                self.get_list_controls_state().invalidate_index()
+                index = self.get_list_controls_index()
 
-        # Some objects are derived from the final state of the tree
-
-        flattened_tree = list_controls.flatten_tree()
-        for obj in flattened_tree:
-            if hasattr(obj, 'derive_from_components'):
-                obj.derive_from_components(flattened_tree)
+            # Some objects are derived from the final state of the tree
+            derived_ids = set()
+            for obj in index.get_by_capability('derive_from_components'):
+                # Deprecated aliases are skipped in favour of `derive_from_index`, unless
+                # a subclass has overridden them
+                if not getattr(obj.derive_from_components, 'is_deprecated_alias', False):
+                    obj.derive_from_components(index.components)
+                    derived_ids.add(id(obj))
+            for obj in index.get_by_capability('derive_from_index'):
+                if id(obj) not in derived_ids:
+                    obj.derive_from_index(index)
 
 
 class ListControlsIndexView(ListControlsIndexViewMixin, IndexView):
@@ -0,0 +1,5 @@
+"""
+Micro-benchmarks for the list controls engine. Run a module from the project's root, eg:
+
+    python -m benchmarks.flatten_tree
+"""
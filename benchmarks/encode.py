@@ -0,0 +1,51 @@
+"""
+Times the encoding of a request's initial state with each available backend, for
+trees containing large choice filters
+"""
+import json
+
+from .utils import setup, best_of
+
+setup()
+
+from django.test import RequestFactory  # noqa: E402
+from admin_list_controls.components import ListControls, Panel  # noqa: E402
+from admin_list_controls.encoders import get_encoder, AVAILABLE_BACKENDS  # noqa: E402
+from admin_list_controls.filters import ChoiceFilter  # noqa: E402
+from admin_list_controls.tree import CompiledListControls  # noqa: E402
+
+CHOICE_COUNTS = (100, 1000, 10000, 100000)
+
+
+def build_tree(choice_count):
+    return ListControls()(
+        Panel()(
+            ChoiceFilter(
+                name='choice',
+                label='Choice',
+                choices=[('value_%s' % i, 'Label %s' % i) for i in range(choice_count)],
+            ),
+        ),
+    )
+
+
+def main():
+    request = RequestFactory().get('/?choice=value_1')
+    for choice_count in CHOICE_COUNTS:
+        state = CompiledListControls(build_tree(choice_count)).bind()
+        for obj in state.index.get_by_capability('handle_request'):
+            obj.handle_request(request)
+        payload = {'admin_list_controls': state.serialize()}
+
+        timings = ['json.dumps %8.2fms' % (best_of(lambda: json.dumps(payload)) * 1000)]
+        for backend, is_available in AVAILABLE_BACKENDS.items():
+            if is_available:
+                encoder = get_encoder(backend)
+                timings.append('%s %8.2fms' % (
+                    backend, best_of(lambda: encoder.encode(payload)) * 1000,
+                ))
+        print('%6d choices: %s' % (choice_count, ', '.join(timings)))
+
+
+if __name__ == '__main__':
+    main()
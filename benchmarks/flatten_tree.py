@@ -0,0 +1,55 @@
+"""
+Times `flatten_tree` and `iter_tree` against deep and wide trees. Per-node timings
+should stay roughly constant as the trees grow, as traversal is linear
+"""
+from .utils import setup, best_of
+
+setup()
+
+from admin_list_controls.components import ListControls, Panel, Columns, Block, Text  # noqa: E402
+
+SIZES = (1000, 5000, 10000, 50000)
+
+
+def build_deep_tree(node_count):
+    root = ListControls()
+    parent = root
+    for i in range(node_count - 1):
+        child = Block()
+        parent.set_children(child)
+        parent = child
+    return root
+
+
+def build_wide_tree(node_count):
+    # Panels of columns of blocks of text, 10 nodes per panel
+    panels = []
+    for i in range((node_count - 1) // 10):
+        panels.append(
+            Panel()(
+                Columns()(
+                    Block()(Text('a'), Text('b')),
+                    Block()(Text('c'), Text('d')),
+                    Block()(Text('e')),
+                ),
+            )
+        )
+    return ListControls()(*panels)
+
+
+def main():
+    for name, build in (('deep', build_deep_tree), ('wide', build_wide_tree)):
+        for size in SIZES:
+            tree = build(size)
+            node_count = len(tree.flatten_tree())
+            flatten = best_of(tree.flatten_tree)
+            iterate = best_of(lambda: next(tree.iter_tree()))
+            print(
+                '%s tree, %6d nodes: flatten_tree %8.2fms (%5.0fns/node), first item from iter_tree %.4fms' % (
+                    name, node_count, flatten * 1000, flatten / node_count * 1e9, iterate * 1000,
+                )
+            )
+
+
+if __name__ == '__main__':
+    main()
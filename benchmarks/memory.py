@@ -0,0 +1,71 @@
+"""
+Measures the memory allocated to build a large tree, and the peak allocations of
+binding, preparing and serializing it for a single request
+"""
+import tracemalloc
+
+from .utils import setup
+
+setup()
+
+from django.test import RequestFactory  # noqa: E402
+from admin_list_controls.actions import SubmitForm  # noqa: E402
+from admin_list_controls.components import ListControls, Panel, Button, Text, Summary  # noqa: E402
+from admin_list_controls.filters import TextFilter, ChoiceFilter  # noqa: E402
+from admin_list_controls.selectors import SortSelector  # noqa: E402
+from admin_list_controls.tree import CompiledListControls  # noqa: E402
+
+PANEL_COUNT = 1000
+
+
+def build_tree():
+    panels = []
+    for i in range(PANEL_COUNT):
+        panels.append(
+            Panel(ref='panel_%s' % i)(
+                Text('Panel %s' % i, style={'font-weight': 'bold'}),
+                TextFilter(name='text_%s' % i, label='Text %s' % i),
+                ChoiceFilter(
+                    name='choice_%s' % i,
+                    label='Choice %s' % i,
+                    choices=(('a', 'A'), ('b', 'B')),
+                    multiple=True,
+                ),
+                SortSelector(value='sort_%s' % i)('Sort %s' % i),
+                Button(action=SubmitForm())('Apply'),
+            )
+        )
+    return ListControls()(*panels, Summary())
+
+
+def handle_request(compiled, request):
+    index = compiled.bind().index
+    for obj in index.get_by_capability('handle_request'):
+        obj.handle_request(request)
+    for obj in index.get_by_capability('prepare_children'):
+        obj.prepare_children()
+    return index.components[0].serialize()
+
+
+def main():
+    request = RequestFactory().get('/?sort=sort_1&choice_2=a')
+
+    tracemalloc.start()
+    list_controls = build_tree()
+    built, _ = tracemalloc.get_traced_memory()
+    compiled = CompiledListControls(list_controls)
+    node_count = len(list_controls.flatten_tree())
+
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    handle_request(compiled, request)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print('%d nodes' % node_count)
+    print('build: %.1fKB (%.0f bytes/node)' % (built / 1024, built / node_count))
+    print('request peak: %.1fKB' % ((peak - before) / 1024))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Times the serialization of a request's tree as the amount of static content grows.
+The dynamic part of the tree is fixed, so the cached serialization should stay flat
+while a full serialization grows with the tree
+"""
+from .utils import setup, best_of
+
+setup()
+
+from django.test import RequestFactory  # noqa: E402
+from admin_list_controls.components import ListControls, Panel, Text, Divider  # noqa: E402
+from admin_list_controls.filters import TextFilter  # noqa: E402
+from admin_list_controls.tree import CompiledListControls  # noqa: E402
+
+STATIC_PANEL_COUNTS = (10, 100, 1000, 10000)
+
+
+def build_tree(static_panel_count):
+    static_panels = [
+        Panel()(
+            Text('Heading %s' % i, style={'font-weight': 'bold'}),
+            Divider(),
+            'Some static content',
+        )
+        for i in range(static_panel_count)
+    ]
+    dynamic_panel = Panel()(*[
+        TextFilter(name='filter_%s' % i, label='Filter %s' % i)
+        for i in range(10)
+    ])
+    return ListControls()(dynamic_panel, *static_panels)
+
+
+def main():
+    request = RequestFactory().get('/?filter_1=foo')
+    for static_panel_count in STATIC_PANEL_COUNTS:
+        compiled = CompiledListControls(build_tree(static_panel_count))
+
+        state = compiled.bind()
+        for obj in state.index.get_by_capability('handle_request'):
+            obj.handle_request(request)
+
+        uncompiled = build_tree(static_panel_count)
+        cached = best_of(state.serialize)
+        full = best_of(uncompiled.serialize)
+        print('%5d static panels: cached %8.3fms, full %8.3fms' % (
+            static_panel_count, cached * 1000, full * 1000,
+        ))
+
+
+if __name__ == '__main__':
+    main()
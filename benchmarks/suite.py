@@ -0,0 +1,267 @@
+"""
+Times each phase of a request against synthetic trees of increasing size, and records
+the memory they allocate. Results are written as JSON, and can be compared against a
+stored baseline to catch regressions:
+
+    python -m benchmarks.suite --output baseline.json
+    python -m benchmarks.suite --baseline baseline.json
+
+The phases are:
+ - build: `build_list_controls`
+ - compile: compiling the tree, which is shared between requests
+ - prepare: binding the tree to a request and `prepare_list_controls`
+ - apply: `apply_list_controls_to_queryset`, including compiling the SQL
+ - serialize: building the initial state
+ - encode: encoding the initial state as JSON
+"""
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+
+from .utils import setup_project, best_of
+
+setup_project()
+
+import django  # noqa: E402
+from django.test import RequestFactory  # noqa: E402
+from admin_list_controls.components import (  # noqa: E402
+    Block, Button, Columns, ListControls, Panel, Summary, Text,
+)
+from admin_list_controls.actions import SubmitForm  # noqa: E402
+from admin_list_controls.filters import BooleanFilter, ChoiceFilter, TextFilter  # noqa: E402
+from admin_list_controls.selectors import LayoutSelector, SortSelector  # noqa: E402
+from admin_list_controls.tree import CompiledListControls  # noqa: E402
+from admin_list_controls.views import ListControlsIndexViewMixin  # noqa: E402
+from shop.models import Product  # noqa: E402
+
+PHASES = ('build', 'compile', 'prepare', 'apply', 'serialize', 'encode')
+
+# The proportional increase, over the baseline, that is reported as a regression
+DEFAULT_THRESHOLD = 0.25
+# Timings that have grown by less than this (in seconds) are treated as noise
+MIN_SECONDS_INCREASE = 0.001
+
+
+def build_components(component_count):
+    # Panels of 10 components, each holding a filter and a selector
+    panels = []
+    for i in range(max(component_count // 10, 1)):
+        panels.append(
+            Panel(ref='panel_%s' % i)(
+                Text('Panel %s' % i, style={'font-weight': 'bold'}),
+                TextFilter(name='text_%s' % i, label='Text %s' % i, field='name'),
+                BooleanFilter(name='boolean_%s' % i, label='Boolean %s' % i, field='is_featured'),
+                SortSelector(value='sort_%s' % i, ordering='name')('Sort %s' % i),
+                Block()(Text('Help text'), Text('More help text')),
+                Button(action=SubmitForm())('Apply'),
+            )
+        )
+    return ListControls()(
+        *panels,
+        LayoutSelector(value='list', is_default=True)('List'),
+        LayoutSelector(value='grid', only=('name',))('Grid'),
+        Summary(),
+    )
+
+
+def build_choices(choice_count):
+    return ListControls()(
+        Panel()(
+            ChoiceFilter(
+                name='choice',
+                label='Choice',
+                field='name',
+                choices=[('value_%s' % i, 'Label %s' % i) for i in range(choice_count)],
+                multiple=True,
+            ),
+            Summary(),
+        ),
+    )
+
+
+def build_nested(depth):
+    # Alternates between panels and columns, with a filter at every level
+    root = ListControls()
+    parent = root
+    for i in range(depth):
+        container = Panel() if i % 2 else Columns()
+        parent.set_children(
+            TextFilter(name='text_%s' % i, field='name'),
+            Text('Level %s' % i),
+            container,
+        )
+        parent = container
+    return root
+
+
+SCENARIOS = {}
+for count in (10, 100, 1000, 10000, 50000):
+    SCENARIOS['components_%s' % count] = (build_components, count)
+for count in (10, 1000, 10000, 100000):
+    SCENARIOS['choices_%s' % count] = (build_choices, count)
+for count in (10, 50, 200):
+    SCENARIOS['nested_%s' % count] = (build_nested, count)
+
+REQUEST_URL = '/?text_1=foo&boolean_2=1&sort=sort_3&choice=value_1&choice=value_5&layout=grid'
+
+
+class BenchmarkView(ListControlsIndexViewMixin):
+    """
+    The list controls of an index view, without the modeladmin
+    """
+    cache_list_controls = False
+
+    def __init__(self, request, builder, count, compiled=None):
+        self.request = request
+        self.builder = builder
+        self.count = count
+        self.compiled = compiled
+
+    def build_list_controls(self):
+        return self.builder(self.count)
+
+    def get_compiled_list_controls(self):
+        return self.compiled
+
+
+def run_scenario(name, builder, count, repeat):
+    request = RequestFactory().get(REQUEST_URL)
+    compiled = CompiledListControls(builder(count))
+
+    def get_view():
+        return BenchmarkView(request, builder, count, compiled)
+
+    def get_prepared_view():
+        view = get_view()
+        view.prepare_list_controls()
+        return view
+
+    def apply(view):
+        str(view.apply_list_controls_to_queryset(Product.objects.all()).query)
+
+    def get_initial_state():
+        return get_prepared_view().get_list_controls_initial_state()
+
+    encoder = get_view().get_list_controls_json_encoder()
+    timings = {
+        'build': best_of(lambda view: view.build_list_controls(), repeat, setup=get_view),
+        'compile': best_of(CompiledListControls, repeat, setup=lambda: builder(count)),
+        'prepare': best_of(lambda view: view.prepare_list_controls(), repeat, setup=get_view),
+        'apply': best_of(apply, repeat, setup=get_prepared_view),
+        'serialize': best_of(
+            lambda view: view.get_list_controls_initial_state(), repeat, setup=get_prepared_view,
+        ),
+        'encode': best_of(encoder.encode, repeat, setup=get_initial_state),
+    }
+
+    # Measured separately, as tracing allocations slows everything down
+    tracemalloc.start()
+    tree = builder(count)
+    built, _ = tracemalloc.get_traced_memory()
+    compiled = CompiledListControls(tree)
+    compiled_size, _ = tracemalloc.get_traced_memory()
+
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    view = BenchmarkView(request, builder, count, compiled)
+    view.prepare_list_controls()
+    apply(view)
+    payload = encoder.encode(view.get_list_controls_initial_state())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        'node_count': len(tree.flatten_tree()),
+        'payload_bytes': len(payload),
+        'seconds': timings,
+        'memory': {
+            'build_bytes': built,
+            'compiled_bytes': compiled_size,
+            'request_peak_bytes': peak - before,
+        },
+    }
+
+
+def compare(results, baseline, threshold):
+    """
+    Returns a list of (scenario, metric, baseline value, current value) for every metric
+    that has grown by more than `threshold`
+    """
+    regressions = []
+    for name, result in results['scenarios'].items():
+        base = baseline.get('scenarios', {}).get(name)
+        if base is None:
+            continue
+        metrics = [('seconds.%s' % phase, result['seconds'][phase], base['seconds'].get(phase))
+                   for phase in PHASES]
+        metrics += [('memory.%s' % key, value, base['memory'].get(key))
+                    for key, value in result['memory'].items()]
+        metrics.append(('payload_bytes', result['payload_bytes'], base.get('payload_bytes')))
+        for metric, value, base_value in metrics:
+            if not base_value or value <= base_value * (1 + threshold):
+                continue
+            if metric.startswith('seconds.') and value - base_value < MIN_SECONDS_INCREASE:
+                continue
+            regressions.append((name, metric, base_value, value))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--output', help='Write the results to a file rather than stdout')
+    parser.add_argument('--baseline', help='Compare the results to a previous run')
+    parser.add_argument(
+        '--threshold', type=float, default=DEFAULT_THRESHOLD,
+        help='The proportional increase over the baseline that fails the comparison',
+    )
+    parser.add_argument(
+        '--scenario', action='append',
+        help='Only run a scenario (eg: choices_1000) or a group of scenarios (eg: choices)',
+    )
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    results = {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'platform': platform.platform(),
+        },
+        'scenarios': {},
+    }
+    for name, (builder, count) in SCENARIOS.items():
+        if args.scenario and not any(
+            name == scenario or name.startswith(scenario + '_') for scenario in args.scenario
+        ):
+            continue
+        result = run_scenario(name, builder, count, args.repeat)
+        results['scenarios'][name] = result
+        print('%-18s %s' % (name, ', '.join(
+            '%s %.2fms' % (phase, result['seconds'][phase] * 1000) for phase in PHASES
+        )), file=sys.stderr)
+
+    output = json.dumps(results, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        for name, metric, base_value, value in regressions:
+            print('Regression: %s %s %.6g -> %.6g (%+.0f%%)' % (
+                name, metric, base_value, value, (value / base_value - 1) * 100,
+            ), file=sys.stderr)
+        if regressions:
+            return 1
+        print('No regressions over %.0f%%' % (args.threshold * 100), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,45 @@
+import os
+import sys
+import time
+
+import django
+from django.conf import settings
+
+TEST_PROJECT_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'test_project',
+)
+
+
+def setup():
+    """
+    Configures just enough of django for the components to be imported without a project
+    """
+    if not settings.configured:
+        settings.configure(USE_I18N=False)
+        django.setup()
+
+
+def setup_project():
+    """
+    Configures django with the test project's settings, for benchmarks that use its
+    models and views. Queries are built but never executed, so no database is required
+    """
+    if not settings.configured:
+        sys.path.insert(0, TEST_PROJECT_DIR)
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'djangosite.settings')
+        django.setup()
+
+
+def best_of(func, repeat=5, setup=None):
+    """
+    Returns the fastest of several runs of `func`, in seconds. If `setup` is defined,
+    it is called before each run (and excluded from the timing), and its return value
+    is passed to `func`
+    """
+    timings = []
+    for _ in range(repeat):
+        args = () if setup is None else (setup(),)
+        start = time.perf_counter()
+        func(*args)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
@@ -10,6 +10,6 @@ setuptools.setup(
     description='A UI toolkit to build custom filtering and other functionalities into wagtail\'s admin list views.',
     long_description='Documentation at https://github.com/ixc/wagtail-admin-list-controls',
     license='MIT',
-    packages=setuptools.find_packages(),
+    packages=setuptools.find_packages(exclude=('benchmarks', 'benchmarks.*', 'test_project*')),
     include_package_data=True,
 )
@@ -0,0 +1,165 @@
+import json
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from admin_list_controls.filters import BaseChoiceFilter, BooleanFilter, TextFilter
+from shop.wagtail_hooks import ProductAdmin
+from .seed_products import ADJECTIVES, NOUNS
+
+PERCENTILES = (50, 90, 95, 99)
+
+# The chance of each control being set in a request
+CONTROL_RATE = 0.4
+SEARCH_RATE = 0.1
+MAX_PAGE = 5
+
+
+def percentile(sorted_values, percent):
+    """
+    Returns the nearest-rank percentile of a sorted list
+    """
+    rank = max(math.ceil(percent / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+class Command(BaseCommand):
+    help = (
+        "Requests the product index from many threads with random combinations of its "
+        "filters, sorts and layouts, and reports the throughput and latency percentiles"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--requests', type=int, default=200, help='The number of requests per thread')
+        parser.add_argument('--seed', type=int, default=0, help='Seeds the random combinations')
+        parser.add_argument(
+            '--user', help='The username to log in as. Defaults to the first superuser',
+        )
+        parser.add_argument(
+            '--host', default='localhost', help='The host of the requests, which must be allowed',
+        )
+        parser.add_argument('--json', action='store_true', help='Output the results as JSON')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        if options['user']:
+            user = User._default_manager.filter(**{
+                User.USERNAME_FIELD: options['user'],
+            }).first()
+        else:
+            user = User._default_manager.filter(is_superuser=True).first()
+        if user is None:
+            raise CommandError('No user found to log in as')
+
+        model_admin = ProductAdmin()
+        url = model_admin.url_helper.index_url
+        param_values = self.get_param_values(model_admin)
+
+        # Every thread starts at once, so that the requests are concurrent
+        barrier = threading.Barrier(options['threads'])
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as executor:
+            futures = [
+                executor.submit(
+                    self.run_worker, barrier, url, user, param_values,
+                    random.Random(options['seed'] + i), options,
+                )
+                for i in range(options['threads'])
+            ]
+            results = [result for future in futures for result in future.result()]
+        elapsed = time.perf_counter() - start
+
+        report = self.build_report(results, elapsed, options['threads'])
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+        else:
+            self.stdout.write(self.format_report(report))
+
+    def get_param_values(self, model_admin):
+        """
+        Returns the values that can be requested for each of the index's controls
+        """
+        view = model_admin.index_view_class(model_admin=model_admin)
+        search_terms = [word.lower() for word in ADJECTIVES]
+        for nouns in NOUNS.values():
+            search_terms.extend(noun.lower() for noun in nouns)
+
+        param_values = {}
+        for component in view.get_compiled_list_controls().list_controls.iter_tree():
+            if isinstance(component, BaseChoiceFilter):
+                values = [value for value, _ in component.get_choices() if value]
+            elif isinstance(component, BooleanFilter):
+                values = ['1']
+            elif isinstance(component, TextFilter):
+                values = search_terms
+            elif component.object_type == 'selector':
+                values = [component.value]
+            else:
+                continue
+            param_values.setdefault(component.name, []).extend(values)
+        param_values[view.SEARCH_VAR] = search_terms
+        return param_values
+
+    def get_random_params(self, rng, param_values):
+        params = {}
+        for name, values in param_values.items():
+            rate = SEARCH_RATE if name == ProductAdmin.index_view_class.SEARCH_VAR else CONTROL_RATE
+            if values and rng.random() < rate:
+                params[name] = rng.choice(values)
+        page = rng.randrange(MAX_PAGE)
+        if page:
+            params[ProductAdmin.index_view_class.PAGE_VAR] = page
+        return params
+
+    def run_worker(self, barrier, url, user, param_values, rng, options):
+        client = Client(HTTP_HOST=options['host'], raise_request_exception=False)
+        client.force_login(user)
+        results = []
+        try:
+            barrier.wait()
+            for _ in range(options['requests']):
+                params = self.get_random_params(rng, param_values)
+                start = time.perf_counter()
+                response = client.get(url, params)
+                results.append((time.perf_counter() - start, response.status_code))
+        finally:
+            # Each thread has its own connection
+            connection.close()
+        return results
+
+    def build_report(self, results, elapsed, thread_count):
+        latencies = sorted(latency for latency, _ in results)
+        status_codes = {}
+        for _, status_code in results:
+            status_codes[status_code] = status_codes.get(status_code, 0) + 1
+        return {
+            'threads': thread_count,
+            'requests': len(results),
+            'errors': sum(count for status_code, count in status_codes.items() if status_code >= 400),
+            'status_codes': status_codes,
+            'seconds': elapsed,
+            'requests_per_second': len(results) / elapsed,
+            'latency_ms': dict(
+                [('mean', sum(latencies) / len(latencies) * 1000)]
+                + [('p%s' % percent, percentile(latencies, percent) * 1000) for percent in PERCENTILES]
+                + [('max', latencies[-1] * 1000)]
+            ),
+        }
+
+    def format_report(self, report):
+        return '\n'.join([
+            '%s requests from %s threads in %.2fs (%s errors)' % (
+                report['requests'], report['threads'], report['seconds'], report['errors'],
+            ),
+            'Throughput: %.1f requests/s' % report['requests_per_second'],
+            'Latency: %s' % ', '.join(
+                '%s %.1fms' % (name, value) for name, value in report['latency_ms'].items()
+            ),
+        ])
@@ -0,0 +1,74 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from shop.models import Product
+
+ADJECTIVES = (
+    'Crusty', 'Golden', 'Rustic', 'Sourdough', 'Toasted', 'Spiced', 'Iced', 'Sparkling',
+    'Chilled', 'Classic', 'Seeded', 'Wholemeal', 'Glazed', 'Honey', 'Lemon', 'Dark',
+)
+NOUNS = {
+    Product.BREAD: ('Loaf', 'Baguette', 'Roll', 'Bagel', 'Focaccia', 'Rye', 'Brioche'),
+    Product.CAKE: ('Sponge', 'Tart', 'Muffin', 'Brownie', 'Cheesecake', 'Eclair', 'Scone'),
+    Product.DRINK: ('Lemonade', 'Cola', 'Espresso', 'Latte', 'Juice', 'Tea', 'Smoothie'),
+}
+# Most products are bread, and few are drinks
+PRODUCT_TYPE_WEIGHTS = {
+    Product.BREAD: 6,
+    Product.CAKE: 3,
+    Product.DRINK: 1,
+}
+FEATURED_RATE = 0.05
+UNKNOWN_STOCK_RATE = 0.1
+MEAN_ITEMS_AVAILABLE = 25
+
+
+class Command(BaseCommand):
+    help = 'Bulk creates products with realistic distributions of their fields, for scale testing'
+
+    def add_arguments(self, parser):
+        parser.add_argument('count', nargs='?', type=int, default=1000000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--seed', type=int, help='Seeds the random generator, for repeatable data')
+        parser.add_argument('--clear', action='store_true', help='Delete the existing products first')
+
+    def handle(self, *args, **options):
+        count = options['count']
+        batch_size = options['batch_size']
+        rng = random.Random(options['seed'])
+
+        if options['clear']:
+            # Deleted with SQL, rather than loading every product to send signals
+            connection = connections[Product.objects.db]
+            with connection.cursor() as cursor:
+                cursor.execute('DELETE FROM %s' % connection.ops.quote_name(Product._meta.db_table))
+
+        product_types = list(PRODUCT_TYPE_WEIGHTS)
+        weights = list(PRODUCT_TYPE_WEIGHTS.values())
+        start = time.perf_counter()
+        created = 0
+        while created < count:
+            batch = []
+            for product_type in rng.choices(product_types, weights, k=min(batch_size, count - created)):
+                batch.append(self.build_product(rng, product_type, created + len(batch)))
+            with transaction.atomic():
+                Product.objects.bulk_create(batch, batch_size=batch_size)
+            created += len(batch)
+            self.stdout.write('Created %s/%s products (%.0f/s)' % (
+                created, count, created / (time.perf_counter() - start),
+            ))
+
+    def build_product(self, rng, product_type, number):
+        if rng.random() < UNKNOWN_STOCK_RATE:
+            items_available = None
+        else:
+            # Most products have a little stock, and a few have a lot
+            items_available = int(rng.expovariate(1 / MEAN_ITEMS_AVAILABLE))
+        return Product(
+            name='%s %s %s' % (rng.choice(ADJECTIVES), rng.choice(NOUNS[product_type]), number),
+            items_available=items_available,
+            product_type=product_type,
+            is_featured=rng.random() < FEATURED_RATE,
+        )
@@ -22,3 +22,12 @@ class Product(models.Model):
 
     def __str__(self):
         return self.name
+
+
+class ProductVariant(models.Model):
+    product = models.ForeignKey(Product, related_name='variants', on_delete=models.CASCADE)
+    size = models.CharField(blank=True, max_length=100)
+    colour = models.CharField(blank=True, max_length=100)
+
+    def __str__(self):
+        return '%s %s' % (self.size, self.colour)
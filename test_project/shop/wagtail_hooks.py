@@ -1,4 +1,4 @@
-from admin_list_controls.selectors import LayoutSelector
+from admin_list_controls.selectors import LayoutSelector, SortSelector
 from admin_list_controls.views import ListControlsIndexView
 from admin_list_controls.components import Button, Icon, Text, Panel, Divider, Block, Spacer, \
     Columns, Summary
@@ -14,6 +14,8 @@ except ImportError:
 
 
 class IndexView(ListControlsIndexView):
+    cache_list_controls = True
+
     def build_list_controls(self):
         return [
             Button(action=[
@@ -34,7 +36,15 @@ class IndexView(ListControlsIndexView):
                 'Export'
             ),
             Block(style={'float': 'right'})(
-                LayoutSelector(value='grid')('Grid view'),
+                SortSelector(value='name', ordering='name', is_default=True)('Name'),
+                SortSelector(
+                    value='-items_available',
+                    ordering='-items_available',
+                    style={'margin-left': '5px'},
+                )('Most available'),
+                LayoutSelector(value='grid', only=('name', 'product_type'), style={'margin-left': '5px'})(
+                    'Grid view'
+                ),
                 LayoutSelector(value='list', is_default=True, style={'margin-left': '5px'})(
                     'List view'
                 ),
@@ -46,6 +56,7 @@ class IndexView(ListControlsIndexView):
                     TextFilter(
                         name='text_filter',
                         label='A text filter',
+                        field='name',
                     ),
                     BooleanFilter(
                         name='bool_filter',
@@ -99,6 +110,25 @@ class IndexView(ListControlsIndexView):
             Panel(ref='panel_2', collapsed=True)(
                 Text('medium text ', size=Text.MEDIUM),
                 Text('large text', size=Text.LARGE),
+                Spacer(),
+                Columns()(
+                    RadioFilter(
+                        name='product_type',
+                        label='Product type',
+                        choices=(('', 'Any type'),) + Product.PRODUCT_TYPE_CHOICES,
+                        default_value='',
+                        field='product_type',
+                        facet_counts=True,
+                    ),
+                    BooleanFilter(
+                        name='is_featured',
+                        label='Featured',
+                        field='is_featured',
+                        facet_counts=True,
+                    ),
+                ),
+                Spacer(),
+                Button(action=SubmitForm())('Apply filters'),
             ),
             Summary(),
         ]